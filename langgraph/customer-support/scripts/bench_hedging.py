@@ -0,0 +1,153 @@
+"""Compare single-provider and hedged LLM calls against local fake providers.
+
+Both fakes answer after a log-normal delay. The primary also has occasional latency spikes
+and errors, like a provider having a bad day. Each scenario runs the same calls against the
+primary alone and through ``HedgedChatModel``, which hedges to the secondary at the primary's
+observed p95 and fails over on errors. No network or API keys are needed.
+
+Usage:
+    uv run python scripts/bench_hedging.py --calls 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from customer_support.llm import HedgedChatModel
+from customer_support.utils.latency import LLM_LATENCY
+
+
+class FakeProvider(BaseChatModel):
+    """Answers after a random delay; ``spike_rate`` of calls take ``spike_seconds`` instead."""
+
+    name: str
+    median_seconds: float
+    spike_rate: float = 0.0
+    spike_seconds: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+    calls: int = 0
+    _lock: Any = None
+    _random: Any = None
+
+    def model_post_init(self, __context: Any) -> None:
+        self._lock = threading.Lock()
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-provider"
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            self.calls += 1
+            if self._random.random() < self.error_rate:
+                return self.median_seconds / 2, True
+            if self._random.random() < self.spike_rate:
+                return self.spike_seconds, False
+            return self._random.lognormvariate(0, 0.25) * self.median_seconds, False
+
+    def _stream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        delay, fails = self._draw()
+        time.sleep(delay)
+        if fails:
+            raise RuntimeError(f"{self.name}: 529 overloaded")
+        yield ChatGenerationChunk(message=AIMessageChunk(content=f"answer from {self.name}"))
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> ChatResult:
+        chunk = next(self._stream(messages, stop, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=chunk.text))])
+
+
+def run(model: BaseChatModel, calls: int, workers: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    failures = 0
+
+    def one(_: int) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            model.invoke("Where is my flight?")
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(workers) as pool:
+        for latency in pool.map(one, range(calls)):
+            if latency is None:
+                failures += 1
+            else:
+                latencies.append(latency)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "failed": failures,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--median-ms", type=float, default=50)
+    parser.add_argument("--spike-rate", type=float, default=0.05)
+    parser.add_argument("--spike-ms", type=float, default=1000)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args(argv)
+    # Failovers are expected here; keep their warnings out of the table.
+    logging.getLogger("customer_support.llm").setLevel(logging.ERROR)
+
+    median = args.median_ms / 1000
+    print(
+        f"{'mode':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>7} "
+        f"{'primary':>8} {'secondary':>10}"
+    )
+    for mode in ("single", "hedged"):
+        LLM_LATENCY.reset()
+        primary = FakeProvider(
+            name="primary",
+            median_seconds=median,
+            spike_rate=args.spike_rate,
+            spike_seconds=args.spike_ms / 1000,
+            error_rate=args.error_rate,
+            seed=1,
+        )
+        secondary = FakeProvider(name="secondary", median_seconds=median * 1.5, seed=2)
+        model: BaseChatModel = primary
+        if mode == "hedged":
+            model = HedgedChatModel(
+                primary=primary,
+                secondary=secondary,
+                primary_name="primary",
+                secondary_name="secondary",
+                min_hedge_delay=median,
+                default_hedge_delay=median * 4,
+            )
+        result = run(model, args.calls, args.workers)
+        print(
+            f"{mode:<8} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+            f"{result['p99_ms']:>8.1f} {result['failed']:>7} {primary.calls:>8} "
+            f"{secondary.calls:>10}"
+        )
+    print("primary histogram:", LLM_LATENCY.snapshot().get("primary"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
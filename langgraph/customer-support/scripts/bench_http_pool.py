@@ -0,0 +1,139 @@
+"""Measure connection reuse of the shared HTTP client against a local HTTP stand-in.
+
+Starts a keep-alive HTTP/1.1 server that answers OpenAI-style embedding requests and
+Tavily-style searches, and delays each new connection to mimic a TLS handshake. It then
+issues the same calls with a fresh client per session (the old behaviour) and through
+``get_http_client()``, and reports latency and the connections the server accepted.
+
+Usage:
+    uv run python scripts/bench_http_pool.py --sessions 20 --calls 5 --handshake-ms 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+import httpx
+import openai
+
+from customer_support.utils.http import CONNECTION_STATS, get_http_client
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handshake_seconds: float):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.handshake_seconds = handshake_seconds
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake_seconds)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+        if self.path.endswith("/embeddings"):
+            inputs = request.get("input") or [""]
+            body = {
+                "object": "list",
+                "model": request.get("model", ""),
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [0.1, 0.2, 0.3]}
+                    for i in range(len(inputs))
+                ],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }
+        else:
+            body = {"query": request.get("query", ""), "results": []}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def run_sessions(
+    server: StandIn,
+    sessions: int,
+    calls: int,
+    http_client: Callable[[], httpx.Client],
+) -> List[float]:
+    latencies = []
+    for _ in range(sessions):
+        client = http_client()
+        embeddings = openai.Client(
+            api_key="stand-in", base_url=f"{server.base_url}/v1", http_client=client
+        )
+        for _ in range(calls):
+            start = time.perf_counter()
+            embeddings.embeddings.create(model="text-embedding-3-small", input=["baggage"])
+            client.post(f"{server.base_url}/search", json={"query": "Basel"}).raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument(
+        "--calls", type=int, default=5, help="Embedding + search pairs per session."
+    )
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    server = StandIn(args.handshake_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    modes: Dict[str, Callable[[], httpx.Client]] = {
+        "fresh clients": httpx.Client,
+        "shared pool": get_http_client,
+    }
+    print(
+        f"{'mode':<14} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'requests':>9} "
+        f"{'connections':>12}"
+    )
+    try:
+        for name, factory in modes.items():
+            connections, requests = server.connections, server.requests
+            latencies = run_sessions(server, args.sessions, args.calls, factory)
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(
+                f"{name:<14} {statistics.fmean(latencies):>8.2f} "
+                f"{statistics.median(latencies):>8.2f} {p95:>8.2f} "
+                f"{server.requests - requests:>9} {server.connections - connections:>12}"
+            )
+        print("shared pool stats:", CONNECTION_STATS.snapshot())
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""Benchmark ``fetch_user_flight_information`` against a scaled synthetic database.
+
+Compares the four-table join the tool used to run on every call with the lookup on the
+trigger-maintained ``passenger_itinerary`` table, across many passenger IDs, and checks that
+both return the same rows after a round of ticket and flight writes.
+
+Usage:
+    uv run python scripts/bench_itinerary.py --passengers 200000 --lookups 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List
+
+from customer_support.data.travel_db import (
+    ITINERARY_COLUMNS,
+    ITINERARY_SOURCE,
+    build_passenger_itinerary,
+)
+
+FLIGHTS_PER_PASSENGER = 2
+FLIGHT_ROWS = 20_000
+# The join scans ``tickets`` on every call, so it is timed on a smaller sample.
+JOIN_LOOKUPS = 50
+
+JOIN_QUERY = (
+    f"SELECT {', '.join(ITINERARY_COLUMNS[1:])} FROM ({ITINERARY_SOURCE}) WHERE passenger_id = ?"
+)
+ITINERARY_QUERY = (
+    f"SELECT {', '.join(ITINERARY_COLUMNS[1:])} FROM passenger_itinerary WHERE passenger_id = ?"
+)
+
+
+def create_database(path: Path, passengers: int, seed: int) -> None:
+    rng = random.Random(seed)
+    with closing(sqlite3.connect(path)) as conn:
+        # Same shape as the published database: no primary keys or indexes.
+        conn.executescript(
+            """
+            CREATE TABLE flights (
+                flight_id INTEGER, flight_no TEXT, scheduled_departure TEXT,
+                scheduled_arrival TEXT, departure_airport TEXT, arrival_airport TEXT
+            );
+            CREATE TABLE tickets (ticket_no TEXT, book_ref TEXT, passenger_id TEXT);
+            CREATE TABLE ticket_flights (
+                ticket_no TEXT, flight_id INTEGER, fare_conditions TEXT, amount INTEGER
+            );
+            CREATE TABLE boarding_passes (
+                ticket_no TEXT, flight_id INTEGER, boarding_no INTEGER, seat_no TEXT
+            );
+            """
+        )
+        conn.executemany(
+            "INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    flight_id,
+                    f"LX{flight_id:04d}",
+                    f"2030-01-{1 + flight_id % 28:02d} 08:00:00+00:00",
+                    f"2030-01-{1 + flight_id % 28:02d} 10:00:00+00:00",
+                    "BSL",
+                    "ZRH",
+                )
+                for flight_id in range(FLIGHT_ROWS)
+            ),
+        )
+        tickets, ticket_flights, passes = [], [], []
+        for idx in range(passengers):
+            ticket_no = f"{idx:013d}"
+            tickets.append((ticket_no, f"B{idx:06d}", f"{idx:04d} {idx:06d}"))
+            for leg in range(FLIGHTS_PER_PASSENGER):
+                flight_id = rng.randrange(FLIGHT_ROWS)
+                ticket_flights.append((ticket_no, flight_id, "Economy", 100))
+                passes.append((ticket_no, flight_id, leg + 1, f"{leg + 1}A"))
+        conn.executemany("INSERT INTO tickets VALUES (?, ?, ?)", tickets)
+        conn.executemany("INSERT INTO ticket_flights VALUES (?, ?, ?, ?)", ticket_flights)
+        conn.executemany("INSERT INTO boarding_passes VALUES (?, ?, ?, ?)", passes)
+        conn.commit()
+
+
+def time_lookups(conn: sqlite3.Connection, query: str, passenger_ids: List[str]) -> float:
+    started = time.perf_counter()
+    for passenger_id in passenger_ids:
+        conn.execute(query, (passenger_id,)).fetchall()
+    return (time.perf_counter() - started) / len(passenger_ids) * 1000
+
+
+def _ticket_of(conn: sqlite3.Connection, passenger_id: str) -> str:
+    return conn.execute(
+        "SELECT ticket_no FROM tickets WHERE passenger_id = ?", (passenger_id,)
+    ).fetchone()[0]
+
+
+def check_triggers(conn: sqlite3.Connection, passenger_ids: List[str]) -> None:
+    ticket_no = _ticket_of(conn, passenger_ids[0])
+    flight_id = conn.execute(
+        "SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (ticket_no,)
+    ).fetchone()[0]
+    conn.execute(
+        "UPDATE flights SET scheduled_departure = '2030-02-01 08:00:00+00:00' WHERE flight_id = ?",
+        (flight_id,),
+    )
+    conn.execute("UPDATE boarding_passes SET seat_no = '9C' WHERE ticket_no = ?", (ticket_no,))
+    conn.execute(
+        "DELETE FROM ticket_flights WHERE ticket_no = ?", (_ticket_of(conn, passenger_ids[1]),)
+    )
+    conn.execute(
+        "INSERT INTO tickets VALUES ('9999999999999', 'BNEW', ?)", (passenger_ids[2],)
+    )
+    conn.execute(
+        "INSERT INTO ticket_flights VALUES ('9999999999999', ?, 'Business', 900)", (flight_id,)
+    )
+    conn.execute(
+        "INSERT INTO boarding_passes VALUES ('9999999999999', ?, 1, '1A')", (flight_id,)
+    )
+    conn.commit()
+    for passenger_id in passenger_ids[:50]:
+        joined = sorted(conn.execute(JOIN_QUERY, (passenger_id,)).fetchall())
+        materialized = sorted(conn.execute(ITINERARY_QUERY, (passenger_id,)).fetchall())
+        if joined != materialized:
+            raise AssertionError(f"Itinerary out of sync for {passenger_id}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passengers", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    passenger_ids = [
+        f"{idx:04d} {idx:06d}" for idx in rng.sample(range(args.passengers), args.lookups)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        create_database(db_path, args.passengers, args.seed)
+        with closing(sqlite3.connect(db_path)) as conn:
+            # The published database has no indexes, so the old join scanned every table.
+            unindexed_ms = time_lookups(conn, JOIN_QUERY, passenger_ids[:JOIN_LOOKUPS])
+
+            started = time.perf_counter()
+            build_passenger_itinerary(conn)
+            conn.commit()
+            build_s = time.perf_counter() - started
+
+            join_ms = time_lookups(conn, JOIN_QUERY, passenger_ids[:JOIN_LOOKUPS])
+            itinerary_ms = time_lookups(conn, ITINERARY_QUERY, passenger_ids)
+            check_triggers(conn, passenger_ids)
+
+    print(f"passengers: {args.passengers}, lookups: {args.lookups}, build: {build_s:.2f}s")
+    print(f"{'join, as published':<22} {unindexed_ms:>9.3f} ms/lookup")
+    print(f"{'join, with triggers':<22} {join_ms:>9.3f} ms/lookup")
+    print(f"{'passenger_itinerary':<22} {itinerary_ms:>9.3f} ms/lookup")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
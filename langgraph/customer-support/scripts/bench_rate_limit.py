@@ -0,0 +1,163 @@
+"""Compare provider 429s and throughput with and without the adaptive rate limiter.
+
+Starts a local HTTP stand-in that serves at most ``--provider-concurrency`` requests at a time
+and ``--provider-rpm`` per minute, answering anything beyond that with 429 and Retry-After,
+like a provider at its limit. Worker threads stand in for concurrent sessions: each sends
+requests through ``get_http_client()`` and retries 429s with exponential backoff, as the SDKs
+do. The run is repeated with the limiter off and on.
+
+Usage:
+    uv run python scripts/bench_rate_limit.py --workers 32 --requests 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import socket
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from customer_support.utils.http import get_http_client
+from customer_support.utils.rate_limit import LimitConfig, configure_rate_limit, rate_limit_stats
+
+PROVIDER = "stand-in"
+MAX_RETRIES = 6
+BACKOFF_SECONDS = 0.05
+
+
+class ThrottlingStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, concurrency: int, rpm: float, service_seconds: float):
+        super().__init__(("127.0.0.1", 0), ThrottlingHandler)
+        self.concurrency = concurrency
+        self.rpm = rpm
+        self.service_seconds = service_seconds
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.accepted: deque = deque()
+        self.counts = {"ok": 0, "throttled": 0}
+
+    def admit(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            while self.accepted and now - self.accepted[0] > 60:
+                self.accepted.popleft()
+            if self.in_flight >= self.concurrency or len(self.accepted) >= self.rpm:
+                self.counts["throttled"] += 1
+                return False
+            self.in_flight += 1
+            self.accepted.append(now)
+            self.counts["ok"] += 1
+            return True
+
+    def done(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.server.admit():
+            self._reply(429, b'{"error": "rate_limited"}', retry_after="0.2")
+            return
+        try:
+            time.sleep(self.server.service_seconds)
+            self._reply(200, b'{"ok": true}')
+        finally:
+            self.server.done()
+
+    def _reply(self, status: int, payload: bytes, retry_after: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if retry_after:
+            self.send_header("Retry-After", retry_after)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def worker(url: str, requests: int, results: List[Dict[str, int]]) -> None:
+    client = get_http_client()
+    counts = {"completed": 0, "attempts": 0, "failed": 0}
+    for _ in range(requests):
+        for attempt in range(MAX_RETRIES + 1):
+            counts["attempts"] += 1
+            response = client.post(url, json={})
+            if response.status_code != 429:
+                counts["completed"] += 1
+                break
+            time.sleep(BACKOFF_SECONDS * 2**attempt)
+        else:
+            counts["failed"] += 1
+    results.append(counts)
+
+
+def run(server: ThrottlingStandIn, workers: int, requests: int) -> Dict[str, float]:
+    before = dict(server.counts)
+    results: List[Dict[str, int]] = []
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat"
+    threads = [
+        threading.Thread(target=worker, args=(url, requests, results)) for _ in range(workers)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    completed = sum(r["completed"] for r in results)
+    return {
+        "completed": completed,
+        "failed": sum(r["failed"] for r in results),
+        "attempts": sum(r["attempts"] for r in results),
+        "429s": server.counts["throttled"] - before["throttled"],
+        "req/s": completed / elapsed,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10, help="Requests per worker.")
+    parser.add_argument("--provider-concurrency", type=int, default=6)
+    parser.add_argument("--provider-rpm", type=float, default=3000)
+    parser.add_argument("--service-ms", type=float, default=50)
+    args = parser.parse_args(argv)
+
+    server = ThrottlingStandIn(
+        args.provider_concurrency, args.provider_rpm, args.service_ms / 1000
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"{'limiter':<8} {'completed':>9} {'failed':>7} {'attempts':>9} {'429s':>6} {'req/s':>7}")
+    try:
+        for enabled in (False, True):
+            config = LimitConfig(args.provider_rpm, initial_concurrency=16) if enabled else None
+            configure_rate_limit(PROVIDER, config, hosts=["127.0.0.1"])
+            result = run(server, args.workers, args.requests)
+            print(
+                f"{'on' if enabled else 'off':<8} {result['completed']:>9} {result['failed']:>7} "
+                f"{result['attempts']:>9} {result['429s']:>6} {result['req/s']:>7.1f}"
+            )
+        print("limiter state:", rate_limit_stats())
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
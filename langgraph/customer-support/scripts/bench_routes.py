@@ -0,0 +1,121 @@
+"""Benchmark ``search_connecting_flights`` on a scaled synthetic schedule.
+
+Builds a hub-and-spoke network whose every route is flown ``--scale`` times a day, then times
+the route index build and one-/two-stop searches between random airport pairs.
+
+Usage:
+    uv run python scripts/bench_routes.py --scale 100 --searches 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+from customer_support.data.travel_db import add_epoch_columns
+from customer_support.tools import search_connecting_flights, set_db_path
+from customer_support.tools.routes import get_route_index
+
+AIRPORTS = 60
+HUBS = 6
+DAYS = 14
+START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def create_database(path: Path, scale: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    airports = [f"A{idx:02d}" for idx in range(AIRPORTS)]
+    hubs, spokes = airports[:HUBS], airports[HUBS:]
+    routes = {(a, b) for a in hubs for b in hubs if a != b}
+    for spoke in spokes:
+        for hub in rng.sample(hubs, 2):
+            routes.update({(spoke, hub), (hub, spoke)})
+
+    def flights():
+        flight_id = 0
+        for origin, destination in sorted(routes):
+            minutes = rng.randint(50, 240)
+            offset = rng.randrange(1440)
+            for day in range(DAYS):
+                for slot in range(scale):
+                    minute = (offset + slot * 1440 // scale + rng.randint(0, 20)) % 1440
+                    departs = START + timedelta(days=day, minutes=minute)
+                    arrives = departs + timedelta(minutes=minutes)
+                    flight_id += 1
+                    yield (
+                        flight_id,
+                        f"SY{flight_id:07d}",
+                        departs.isoformat(sep=" "),
+                        arrives.isoformat(sep=" "),
+                        origin,
+                        destination,
+                    )
+
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute(
+            "CREATE TABLE flights (flight_id INTEGER, flight_no TEXT, scheduled_departure TEXT,"
+            " scheduled_arrival TEXT, departure_airport TEXT, arrival_airport TEXT)"
+        )
+        conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?)", flights())
+        add_epoch_columns(conn)
+        conn.execute("CREATE INDEX ix_flights_flight_id ON flights (flight_id)")
+        conn.commit()
+    return spokes
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100, help="Departures per route per day.")
+    parser.add_argument("--searches", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        spokes = create_database(db_path, args.scale, args.seed)
+        set_db_path(db_path)
+        with closing(sqlite3.connect(db_path)) as conn:
+            flights = conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0]
+
+        started = time.perf_counter()
+        get_route_index()
+        build_s = time.perf_counter() - started
+
+        latencies, found = [], 0
+        for _ in range(args.searches):
+            origin, destination = rng.sample(spokes, 2)
+            day = START + timedelta(days=rng.randrange(DAYS - 2))
+            started = time.perf_counter()
+            results = search_connecting_flights.invoke(
+                {
+                    "departure_airport": origin,
+                    "arrival_airport": destination,
+                    "start_time": day.isoformat(),
+                    "end_time": (day + timedelta(hours=6)).isoformat(),
+                }
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            found += bool(results)
+
+    latencies.sort()
+    print(f"flights: {flights}, index build: {build_s:.2f}s")
+    print(
+        f"searches: {args.searches}, with results: {found}, "
+        f"p50: {statistics.median(latencies):.2f} ms, "
+        f"p95: {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms, "
+        f"max: {latencies[-1]:.2f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
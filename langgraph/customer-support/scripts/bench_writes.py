@@ -0,0 +1,91 @@
+"""Benchmark booking write throughput with concurrent sessions.
+
+Compares the group-commit writer used by the booking tools (``execute_write``) against the
+previous connect-update-commit-per-call approach on a scratch hotels table.
+
+Usage:
+    uv run python scripts/bench_writes.py --sessions 1 8 64 --writes 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from customer_support.tools import set_db_path
+from customer_support.tools.writer import close_writer, execute_write
+
+HOTEL_ROWS = 10_000
+
+
+def create_database(path: Path) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT, booked INTEGER)")
+        conn.executemany(
+            "INSERT INTO hotels VALUES (?, ?, 0)",
+            ((idx, f"Hotel {idx}") for idx in range(HOTEL_ROWS)),
+        )
+    conn.close()
+
+
+def direct_book(db_path: Path, hotel_id: int) -> None:
+    with sqlite3.connect(db_path, timeout=5) as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE hotels SET booked = 1 WHERE id = ?", (hotel_id,))
+        conn.commit()
+    conn.close()
+
+
+def writer_book(hotel_id: int) -> None:
+    execute_write(("UPDATE hotels SET booked = 1 WHERE id = ?", (hotel_id,)))
+
+
+def run(sessions: int, writes: int, book: Callable[[int], None]) -> Tuple[float, int]:
+    errors: List[BaseException] = []
+
+    def session(offset: int) -> None:
+        for idx in range(writes):
+            try:
+                book((offset * writes + idx) % HOTEL_ROWS)
+            except Exception as exc:
+                errors.append(exc)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return (sessions * writes - len(errors)) / elapsed, len(errors)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--writes", type=int, default=200, help="Bookings per session.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        create_database(db_path)
+        set_db_path(db_path)
+
+        print(f"{'sessions':>8}  {'writer/s':>10}  {'direct/s':>10}  {'direct errors':>13}")
+        for sessions in args.sessions:
+            writer_rate, _ = run(sessions, args.writes, writer_book)
+            direct_rate, direct_errors = run(
+                sessions, args.writes, lambda hotel_id: direct_book(db_path, hotel_id)
+            )
+            print(f"{sessions:>8}  {writer_rate:>10.0f}  {direct_rate:>10.0f}  {direct_errors:>13}")
+        close_writer(str(db_path))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
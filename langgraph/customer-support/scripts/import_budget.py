@@ -0,0 +1,60 @@
+"""Report `python -X importtime` totals for the CLI entry point and enforce a budget.
+
+Usage:
+    uv run python scripts/import_budget.py --budget-ms 150
+    uv run python scripts/import_budget.py --part part4 --budget-ms 2500
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+CLI_PROBE = "import customer_support.main"
+PART_PROBE = "from customer_support.graphs import get_graph_builder; get_graph_builder({part!r})"
+
+
+def measure(code: str) -> List[Tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` for every module imported by ``code``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--part", help="Also import this part's graph builder (e.g. part4).")
+    parser.add_argument(
+        "--budget-ms", type=float, default=None, help="Fail if the total exceeds this."
+    )
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list.")
+    args = parser.parse_args(argv)
+
+    code = PART_PROBE.format(part=args.part) if args.part else CLI_PROBE
+    rows = measure(code)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    target = f"graph builder for {args.part}" if args.part else "customer_support.main"
+    print(f"{target}: {len(rows)} modules, {total_ms:.1f} ms total import time")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"Import budget exceeded: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+"""Measure LLM round trips saved by server-side search broadening.
+
+Runs the tutorial questions and the FluxLoop simulation's scripted questions through
+``run_customer_support_session`` with ``broaden_searches`` off and on, and compares the number
+of LLM calls each run needed. Requires the provider API key, like any live session, and
+PyYAML from the ``dev`` extra to read the simulation config.
+
+Usage:
+    uv run --extra dev python scripts/measure_broadening.py --provider openai --repeats 3
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+from customer_support import run_customer_support_session
+from customer_support.graphs import PART1_TUTORIAL_QUESTIONS
+
+SIMULATION_CONFIG = (
+    Path(__file__).resolve().parents[1] / "fluxloop_projects/tutorial/configs/simulation.yaml"
+)
+
+
+def simulation_questions(path: Path = SIMULATION_CONFIG) -> List[str]:
+    config = yaml.safe_load(path.read_text(encoding="utf-8"))
+    metadata = config["multi_turn"]["supervisor"]["metadata"]
+    return list(metadata["scripted_questions"])
+
+
+def llm_calls(questions: List[str], *, broaden: bool, args: argparse.Namespace) -> int:
+    result = run_customer_support_session(
+        questions,
+        part=args.part,
+        provider=args.provider,
+        data_dir=args.data_dir,
+        broaden_searches=broaden,
+    )
+    return sum(turn["usage"]["llm_calls"] for turn in result["transcript"])
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--part", default="part4")
+    parser.add_argument("--provider", default=None)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per question set and mode.")
+    args = parser.parse_args(argv)
+
+    question_sets: Dict[str, List[str]] = {
+        "tutorial": list(PART1_TUTORIAL_QUESTIONS),
+        "simulation": simulation_questions(),
+    }
+    print(f"{'questions':<12} {'turns':>6} {'calls (off)':>12} {'calls (on)':>11} {'saved':>7}")
+    for name, questions in question_sets.items():
+        off = sum(llm_calls(questions, broaden=False, args=args) for _ in range(args.repeats))
+        on = sum(llm_calls(questions, broaden=True, args=args) for _ in range(args.repeats))
+        saved = (off - on) / off if off else 0.0
+        print(
+            f"{name:<12} {len(questions) * args.repeats:>6} {off:>12} {on:>11} {saved:>7.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+"""Measure the part 4 intent router against recorded FluxLoop experiments.
+
+Reads every turn the primary assistant handled in ``experiments/*/observations.jsonl`` and
+classifies the user's message with ``IntentRouter``. Each prediction is compared with a hand
+label for the recorded inputs and with what the LLM actually delegated, if it delegated.
+For routed turns where the LLM also delegated, the script sums the recorded time the primary
+assistant's LLM calls spent before handing over, which the router saves. Routed turns the
+LLM answered itself are reported apart: there the router adds a specialised assistant
+instead of saving anything. No API keys are needed.
+
+Usage:
+    uv run python scripts/measure_intent_router.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from customer_support.utils.intent import IntentRouter
+
+EXPERIMENTS = Path(__file__).resolve().parents[1] / "fluxloop_projects/tutorial/experiments"
+DELEGATIONS = {
+    "ToFlightBookingAssistant": "update_flight",
+    "ToBookCarRental": "book_car_rental",
+    "ToHotelBookingAssistant": "book_hotel",
+    "ToBookExcursion": "book_excursion",
+}
+# The workflow each recorded input should reach; None means the primary assistant should
+# answer (information and policy questions, ambiguous or context-dependent follow-ups).
+EXPECTED_INTENTS: Dict[str, Optional[str]] = {
+    "Update my flight to sometime next week then": "update_flight",
+    "OK could you place a reservation for your recommended hotel? It sounds nice.": "book_hotel",
+    "Am i allowed to update my flight to something sooner? I want to leave later today.": None,
+    "The next available option is great": None,
+    "what about lodging and transportation?": None,
+    "Yeah i think i'd like an affordable hotel for my week-long stay (7 days). "
+    "And I'll want to rent a car.": None,
+    "yes go ahead and book anything that's moderate expense and has availability.": None,
+    "OK great pick one and book it for my second day there.": None,
+}
+
+
+def _seconds(observation: dict) -> float:
+    start = datetime.fromisoformat(observation["start_time"])
+    return (datetime.fromisoformat(observation["end_time"]) - start).total_seconds()
+
+
+def recorded_turns(root: Path = EXPERIMENTS) -> List[dict]:
+    """One entry per user turn that started at the primary assistant."""
+    turns: "OrderedDict[tuple, dict]" = OrderedDict()
+    for path in sorted(root.glob("*/observations.jsonl")):
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                observation = json.loads(line)
+                if observation.get("name") != "assistant_turn":
+                    continue
+                inputs = observation["input"]
+                node = inputs["config"]["metadata"].get("langgraph_node")
+                humans = [m for m in inputs["state"]["messages"] if m["type"] == "human"]
+                key = (observation["trace_id"], humans[-1]["id"])
+                if key not in turns:
+                    if node != "primary_assistant":
+                        continue
+                    turns[key] = {
+                        "text": humans[-1]["content"],
+                        "delegated": None,
+                        "primary_seconds": 0.0,
+                    }
+                turn = turns[key]
+                if node != "primary_assistant" or turn["delegated"]:
+                    continue
+                turn["primary_seconds"] += _seconds(observation)
+                for call in observation["output"]["messages"].get("tool_calls", []):
+                    if call["name"] in DELEGATIONS:
+                        turn["delegated"] = DELEGATIONS[call["name"]]
+                        break
+    return list(turns.values())
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=Path, default=EXPERIMENTS)
+    args = parser.parse_args(argv)
+
+    router = IntentRouter()
+    turns = recorded_turns(args.experiments)
+    routed = correct = false_routes = 0
+    delegated = agreed = 0
+    skipped_seconds = 0.0
+    routed_handovers = 0
+    routed_answered = 0
+    start = time.perf_counter()
+    predictions = [router.classify(turn["text"]).intent for turn in turns]
+    classify_us = (time.perf_counter() - start) / max(len(turns), 1) * 1e6
+    for turn, intent in zip(turns, predictions):
+        expected = EXPECTED_INTENTS.get(turn["text"])
+        if turn["delegated"]:
+            delegated += 1
+            agreed += intent == turn["delegated"]
+        if intent is None:
+            continue
+        routed += 1
+        correct += intent == expected
+        false_routes += expected is None
+        if turn["delegated"]:
+            routed_handovers += 1
+            skipped_seconds += turn["primary_seconds"]
+        else:
+            routed_answered += 1
+
+    print(f"recorded turns:            {len(turns)}")
+    print(f"routed locally:            {routed} ({routed / max(len(turns), 1):.1%})")
+    print(f"routed to expected intent: {correct}/{routed}")
+    print(f"routed but expected LLM:   {false_routes}")
+    print(f"agrees with LLM handover:  {agreed}/{delegated}")
+    print(f"routed, LLM handed over:   {routed_handovers}")
+    print(f"routed, LLM answered:      {routed_answered} (no primary time saved)")
+    print(
+        f"primary LLM time skipped:  {skipped_seconds:.1f}s "
+        f"({skipped_seconds / max(routed_handovers, 1):.1f}s per routed handover)"
+    )
+    print(f"classify time:             {classify_us:.0f}us per message")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
-from .assistant import Assistant
-from .data.travel_db import download_database, prepare_database, update_dates
-from .main import run_customer_support_session
-from .utils.environment import ensure_env_vars
+import importlib
+from typing import Any
 
-__all__ = [
-    "Assistant",
-    "download_database",
-    "prepare_database",
-    "update_dates",
-    "run_customer_support_session",
-    "ensure_env_vars",
-]
+_EXPORTS = {
+    "Assistant": "customer_support.assistant",
+    "download_database": "customer_support.data.travel_db",
+    "prepare_database": "customer_support.data.travel_db",
+    "update_dates": "customer_support.data.travel_db",
+    "run_customer_support_session": "customer_support.main",
+    "stream_turn": "customer_support.utils.console",
+    "iter_tokens": "customer_support.utils.console",
+    "ensure_env_vars": "customer_support.utils.environment",
+}
 
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    # Exports resolve on first access so `python -m customer_support.main --help`
+    # does not pay for LangChain, pandas and the provider SDKs.
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
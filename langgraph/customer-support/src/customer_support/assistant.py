@@ -1,21 +1,80 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Union
 
 import fluxloop
 
 from langchain_core.runnables import Runnable, RunnableConfig
 
+from .deadline import DeadlineExceeded, deadline_from_config, with_request_timeout
+from .utils.latency import ROLE_LATENCY
+from .utils.usage import ROLE_METADATA_KEY, USAGE_KEYS, message_usage
+
+logger = logging.getLogger(__name__)
+
 
 class Assistant:
-    def __init__(self, runnable: Runnable):
-        self.runnable = runnable
+    """Graph node that calls ``runnable`` until it returns a usable message.
+
+    ``runnable`` may also be a factory, called on the node's first turn. With a ``role``, the
+    time spent in LLM calls is recorded under that name in ``ROLE_LATENCY``, and the time and
+    token usage of every call, retries included, on the returned message's
+    ``response_metadata``.
+    """
+
+    def __init__(
+        self, runnable: Union[Runnable, Callable[[], Runnable]], role: Optional[str] = None
+    ):
+        self._runnable = runnable
+        self.role = role
+
+    @property
+    def runnable(self) -> Runnable:
+        if not isinstance(self._runnable, Runnable):
+            self._runnable = self._runnable()
+        return self._runnable
 
     @fluxloop.trace(name="assistant_turn")
     def __call__(self, state: Dict[str, Any], config: RunnableConfig):
         current_state = dict(state)
+        deadline = deadline_from_config(config)
+        llm_seconds = 0.0
+        llm_calls = 0
+        usage_totals = dict.fromkeys(USAGE_KEYS, 0)
         while True:
-            result = self.runnable.invoke(current_state)
+            runnable = self.runnable
+            if deadline is not None:
+                deadline.check()
+                remaining = deadline.remaining()
+                if remaining is not None:
+                    runnable = with_request_timeout(runnable, remaining)
+            start = time.monotonic()
+            try:
+                result = runnable.invoke(current_state)
+            except Exception as exc:
+                if self.role is not None:
+                    ROLE_LATENCY.get(self.role).record_error()
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded("The deadline passed during an LLM call.") from exc
+                raise
+            elapsed = time.monotonic() - start
+            llm_seconds += elapsed
+            llm_calls += 1
+            if self.role is not None:
+                ROLE_LATENCY.get(self.role).record(elapsed)
+            if getattr(result, "usage_metadata", None):
+                usage = message_usage(result)
+                for key, value in usage.items():
+                    usage_totals[key] += value
+                logger.info(
+                    "llm call: %d input tokens (%d cached, %d cache write, %d uncached)",
+                    usage["input_tokens"],
+                    usage["cached_input_tokens"],
+                    usage["cache_creation_input_tokens"],
+                    usage["uncached_input_tokens"],
+                )
             tool_calls = getattr(result, "tool_calls", None)
             if tool_calls and len(tool_calls) > 1:
                 messages = current_state["messages"] + [
@@ -38,5 +97,12 @@ class Assistant:
                 current_state = {**current_state, "messages": messages}
                 continue
             break
+        if self.role is not None:
+            result.response_metadata[ROLE_METADATA_KEY] = {
+                "role": self.role,
+                "llm_calls": llm_calls,
+                "latency_ms": round(llm_seconds * 1000, 1),
+                "usage": usage_totals,
+            }
         return {"messages": result}
 
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import logging
 import os
 import shutil
 import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing, contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional
 
-import fluxloop
-import pandas as pd
-import requests
+from customer_support.utils.tracing import lazy_trace
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 TRAVEL_DB_URL = (
     "https://storage.googleapis.com/benchmarks-artifacts/travel-db/travel2.sqlite"
@@ -17,6 +26,80 @@ DEFAULT_DB_NAME = "travel2.sqlite"
 DEFAULT_BACKUP_NAME = "travel2.backup.sqlite"
 DEFAULT_ENV_VAR = "CUSTOMER_SUPPORT_DATA_DIR"
 DEFAULT_STORAGE_SUBPATH = ".cache/customer_support"
+# Optional pinned digest of the published database; set to enable checksum verification.
+TRAVEL_DB_SHA256: Optional[str] = os.environ.get("CUSTOMER_SUPPORT_DB_SHA256")
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_ATTEMPTS = 3
+PARTIAL_SUFFIX = ".part"
+# Sidecar holding the ETag or Last-Modified of the response a partial download came from.
+VALIDATOR_SUFFIX = ".validator"
+SQLITE_HEADER = b"SQLite format 3\x00"
+# Text timestamp columns that get an integer epoch twin (``<column>_ts``) for range scans.
+EPOCH_COLUMNS = {
+    "flights": ("scheduled_departure", "scheduled_arrival", "actual_departure", "actual_arrival"),
+    "hotels": ("checkin_date", "checkout_date"),
+    "car_rentals": ("start_date", "end_date"),
+}
+EPOCH_INDEXES = {
+    "ix_flights_route_departure": (
+        "flights",
+        ("departure_airport", "arrival_airport", "scheduled_departure_ts"),
+    ),
+    "ix_flights_departure": ("flights", ("scheduled_departure_ts",)),
+    "ix_hotels_checkin": ("hotels", ("checkin_date_ts",)),
+    "ix_car_rentals_start": ("car_rentals", ("start_date_ts",)),
+}
+# Denormalised copy of the join behind ``fetch_user_flight_information``, kept in sync by
+# triggers so the tool is a single indexed lookup on ``passenger_id``.
+ITINERARY_TABLE = "passenger_itinerary"
+ITINERARY_COLUMNS = (
+    "passenger_id",
+    "ticket_no",
+    "book_ref",
+    "flight_id",
+    "flight_no",
+    "departure_airport",
+    "arrival_airport",
+    "scheduled_departure",
+    "scheduled_arrival",
+    "seat_no",
+    "fare_conditions",
+)
+ITINERARY_SOURCE = """
+    SELECT
+        t.passenger_id, t.ticket_no, t.book_ref,
+        f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport,
+        f.scheduled_departure, f.scheduled_arrival,
+        bp.seat_no, tf.fare_conditions
+    FROM
+        tickets t
+        JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
+        JOIN flights f ON tf.flight_id = f.flight_id
+        JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
+"""
+ITINERARY_INDEXES = {
+    "ix_passenger_itinerary_passenger": (ITINERARY_TABLE, ("passenger_id",)),
+    "ix_passenger_itinerary_ticket": (ITINERARY_TABLE, ("ticket_no",)),
+    "ix_passenger_itinerary_flight": (ITINERARY_TABLE, ("flight_id",)),
+    # Keep the per-ticket refreshes in the triggers off full table scans.
+    "ix_tickets_ticket_no": ("tickets", ("ticket_no",)),
+    "ix_ticket_flights_ticket": ("ticket_flights", ("ticket_no", "flight_id")),
+    "ix_ticket_flights_flight": ("ticket_flights", ("flight_id",)),
+    "ix_boarding_passes_ticket": ("boarding_passes", ("ticket_no", "flight_id")),
+    "ix_flights_flight_id": ("flights", ("flight_id",)),
+}
+# Tables whose writes can change a passenger's itinerary, with the key each one refreshes.
+ITINERARY_TRIGGER_KEYS = {
+    "tickets": "ticket_no",
+    "ticket_flights": "ticket_no",
+    "boarding_passes": "ticket_no",
+    "flights": "flight_id",
+}
+SESSION_DIR_PREFIX = "customer_support_session_"
+# Linux ioctl that clones a file's extents (btrfs, xfs, overlayfs on those).
+FICLONE = 0x40049409
+
+logger = logging.getLogger(__name__)
 
 
 def _default_dir() -> Path:
@@ -36,11 +119,161 @@ def _data_dir(path: Optional[Path | str] = None) -> Path:
     return _default_dir()
 
 
-@fluxloop.trace(name="download_travel_database")
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verify_download(
+    path: Path,
+    *,
+    expected_size: Optional[int],
+    expected_sha256: Optional[str],
+) -> None:
+    size = path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise IOError(f"Incomplete download at {path}: {size} of {expected_size} bytes.")
+    with open(path, "rb") as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            raise IOError(f"Downloaded file at {path} is not a SQLite database.")
+    if expected_sha256 and _sha256(path) != expected_sha256.lower():
+        raise IOError(f"Checksum mismatch for downloaded database at {path}.")
+
+
+def _expected_size(response, resumed_from: int) -> Optional[int]:
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return resumed_from + int(length)
+    return None
+
+
+def _validator(response) -> Optional[str]:
+    """The response's strong ETag, else its Last-Modified date, for a later ``If-Range``."""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _discard_partial(partial: Path) -> None:
+    partial.unlink(missing_ok=True)
+    partial.with_name(partial.name + VALIDATOR_SUFFIX).unlink(missing_ok=True)
+
+
+def _fetch_to_partial(url: str, partial: Path, *, timeout: float) -> Optional[int]:
+    """Append the remainder of ``url`` to ``partial`` and return the expected total size.
+
+    A partial file is only resumed under ``If-Range`` with the validator saved when it was
+    started, so a changed remote file is downloaded again instead of spliced onto old bytes.
+    """
+    import requests
+
+    validator_path = partial.with_name(partial.name + VALIDATOR_SUFFIX)
+    validator = validator_path.read_text().strip() if validator_path.exists() else None
+    if partial.exists() and not validator:
+        _discard_partial(partial)
+    resume_from = partial.stat().st_size if partial.exists() else 0
+    headers = {"Range": f"bytes={resume_from}-", "If-Range": validator} if resume_from else {}
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if resume_from and response.status_code == 416:
+            expected_size = _expected_size(response, resume_from)
+            if expected_size == resume_from:
+                # The partial file already holds every byte the server has.
+                return expected_size
+            _discard_partial(partial)
+            return _fetch_to_partial(url, partial, timeout=timeout)
+        response.raise_for_status()
+        if resume_from and response.status_code != 206:
+            # The file changed (or ranges are unsupported): the server sent all of it.
+            resume_from = 0
+        if not resume_from:
+            validator = _validator(response)
+            if validator:
+                validator_path.write_text(validator)
+            else:
+                validator_path.unlink(missing_ok=True)
+        expected_size = _expected_size(response, resume_from)
+        with open(partial, "ab" if resume_from else "wb") as f:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    return expected_size
+
+
+def _stream_download(
+    url: str,
+    destination: Path,
+    *,
+    expected_sha256: Optional[str] = None,
+    timeout: float = 60,
+    attempts: int = DOWNLOAD_ATTEMPTS,
+    restart: bool = False,
+) -> Path:
+    """Download ``url`` to ``destination``, resuming a ``.part`` file left by an earlier run.
+
+    ``restart`` discards that file first, e.g. when the caller asked for a fresh copy.
+    """
+    import requests
+
+    partial = destination.with_name(destination.name + PARTIAL_SUFFIX)
+    if restart:
+        _discard_partial(partial)
+    for attempt in range(1, attempts + 1):
+        try:
+            expected_size = _fetch_to_partial(url, partial, timeout=timeout)
+            break
+        except (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ):
+            if attempt == attempts:
+                raise
+            logger.warning("Download interrupted (attempt %d/%d); resuming.", attempt, attempts)
+
+    try:
+        _verify_download(partial, expected_size=expected_size, expected_sha256=expected_sha256)
+    except IOError:
+        _discard_partial(partial)
+        raise
+    os.replace(partial, destination)
+    _discard_partial(partial)
+    return destination
+
+
+def _clone_file(source: Path, target: Path) -> None:
+    """Copy ``source`` to ``target`` atomically, using a reflink when the filesystem allows.
+
+    Hardlinks are not an option: SQLite rewrites the database in place, which would
+    silently modify a hardlinked backup as well.
+    """
+    staging = target.with_name(target.name + PARTIAL_SUFFIX)
+    try:
+        if fcntl is None:
+            raise OSError("reflinks are not supported on this platform")
+        with open(source, "rb") as src, open(staging, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        shutil.copyfile(source, staging)
+    os.replace(staging, target)
+
+
+@lazy_trace(name="download_travel_database")
 def download_database(
     *,
     overwrite: bool = False,
     target_dir: Optional[Path] = None,
+    url: str = TRAVEL_DB_URL,
+    expected_sha256: Optional[str] = TRAVEL_DB_SHA256,
 ) -> Path:
     directory = _data_dir(target_dir)
     directory.mkdir(parents=True, exist_ok=True)
@@ -48,18 +281,25 @@ def download_database(
     backup_path = directory / DEFAULT_BACKUP_NAME
 
     if overwrite or not db_path.exists():
-        response = requests.get(TRAVEL_DB_URL, timeout=60)
-        response.raise_for_status()
-        with open(db_path, "wb") as f:
-            f.write(response.content)
-        shutil.copy(db_path, backup_path)
+        _stream_download(url, db_path, expected_sha256=expected_sha256, restart=overwrite)
+        _clone_file(db_path, backup_path)
     elif not backup_path.exists():
-        shutil.copy(db_path, backup_path)
+        _clone_file(db_path, backup_path)
 
     return db_path
 
 
-@fluxloop.trace(name="refresh_travel_dates")
+def _stored_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """``table``'s columns without the epoch columns, generated or (from older builds) not."""
+    epoch = {f"{column}_ts" for column in EPOCH_COLUMNS.get(table, ())}
+    return [
+        f'"{name}"'
+        for _, name, _, _, _, _, hidden in conn.execute(f"PRAGMA table_xinfo({table})")
+        if hidden == 0 and name not in epoch
+    ]
+
+
+@lazy_trace(name="refresh_travel_dates")
 def update_dates(
     db_path: Path,
     *,
@@ -72,16 +312,24 @@ def update_dates(
             f"Backup database not found at {backup}. Run download_database first."
         )
 
+    import pandas as pd
+
     # shutil.copy(backup, database)
     conn = sqlite3.connect(database)
 
     try:
+        # Derived tables are rebuilt from the shifted data below rather than shifted themselves.
+        conn.execute(f"DROP TABLE IF EXISTS {ITINERARY_TABLE}")
         tables = pd.read_sql(
             "SELECT name FROM sqlite_master WHERE type='table';", conn
         ).name.tolist()
 
+        # Only stored columns: ``to_sql`` would write generated ``_ts`` columns back as plain
+        # integers, which would then go stale. ``add_epoch_columns`` recreates them below.
         table_frames = {
-            table_name: pd.read_sql(f"SELECT * FROM {table_name}", conn)
+            table_name: pd.read_sql(
+                f"SELECT {', '.join(_stored_columns(conn, table_name))} FROM {table_name}", conn
+            )
             for table_name in tables
         }
 
@@ -112,6 +360,8 @@ def update_dates(
 
         for table_name, df in table_frames.items():
             df.to_sql(table_name, conn, if_exists="replace", index=False)
+        add_epoch_columns(conn)
+        build_passenger_itinerary(conn)
     finally:
         conn.commit()
         conn.close()
@@ -119,7 +369,71 @@ def update_dates(
     return database
 
 
-@fluxloop.trace(name="prepare_travel_database")
+def add_epoch_columns(conn: sqlite3.Connection) -> None:
+    """Add indexed ``<column>_ts`` epoch-second columns next to the text timestamps.
+
+    They are virtual generated columns, so bookings that rewrite the text value keep them in
+    sync. Unparseable values (including the ``\\N`` placeholder) become NULL.
+    """
+    for table, columns in EPOCH_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+        if not existing:
+            continue
+        for column in columns:
+            if column not in existing or f"{column}_ts" in existing:
+                continue
+            conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN {column}_ts INTEGER "
+                f"GENERATED ALWAYS AS (CAST(strftime('%s', {column}) AS INTEGER)) VIRTUAL"
+            )
+    for index, (table, columns) in EPOCH_INDEXES.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+        if existing.issuperset(columns):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({', '.join(columns)})")
+
+
+def _itinerary_refresh(key: str, row: str) -> str:
+    return (
+        f"DELETE FROM {ITINERARY_TABLE} WHERE {key} = {row}.{key};\n"
+        f"INSERT INTO {ITINERARY_TABLE} ({', '.join(ITINERARY_COLUMNS)})"
+        f"{ITINERARY_SOURCE} WHERE {'t' if key == 'ticket_no' else 'f'}.{key} = {row}.{key};"
+    )
+
+
+def build_passenger_itinerary(conn: sqlite3.Connection) -> None:
+    """(Re)build ``passenger_itinerary`` and the triggers that keep it current.
+
+    Inserts, deletes and updates on the source tables refresh the affected ticket (or, for
+    ``flights``, every ticket on the flight), so bookings made through the tools show up in
+    the next ``fetch_user_flight_information`` call without rebuilding the table.
+    """
+    existing = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    }
+    if not existing.issuperset(ITINERARY_TRIGGER_KEYS):
+        return
+
+    conn.execute(f"DROP TABLE IF EXISTS {ITINERARY_TABLE}")
+    conn.execute(
+        f"CREATE TABLE {ITINERARY_TABLE} AS SELECT * FROM ({ITINERARY_SOURCE}) WHERE 0"
+    )
+    conn.execute(
+        f"INSERT INTO {ITINERARY_TABLE} ({', '.join(ITINERARY_COLUMNS)}){ITINERARY_SOURCE}"
+    )
+    for index, (table, columns) in ITINERARY_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({', '.join(columns)})")
+
+    for table, key in ITINERARY_TRIGGER_KEYS.items():
+        for event, rows in (("INSERT", ("NEW",)), ("DELETE", ("OLD",)), ("UPDATE", ("OLD", "NEW"))):
+            name = f"trg_{table}_{event.lower()}_itinerary"
+            body = "\n".join(_itinerary_refresh(key, row) for row in rows)
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            conn.execute(
+                f"CREATE TRIGGER {name} AFTER {event} ON {table}\nBEGIN\n{body}\nEND"
+            )
+
+
+@lazy_trace(name="prepare_travel_database")
 def prepare_database(
     *,
     overwrite: bool = False,
@@ -128,3 +442,62 @@ def prepare_database(
     db_path = download_database(overwrite=overwrite, target_dir=target_dir)
     return update_dates(db_path)
 
+
+
+class SessionDatabase(NamedTuple):
+    path: Path
+    restore_ms: float
+
+
+class DatabaseSnapshot:
+    """Pristine in-memory copy of a prepared database that sessions restore from."""
+
+    def __init__(self, db_path: Path | str):
+        self.source_path = Path(db_path)
+        self._pristine = sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        with closing(sqlite3.connect(self.source_path)) as source:
+            source.backup(self._pristine)
+
+    def restore(self, target: sqlite3.Connection) -> float:
+        """Overwrite ``target`` with the pristine pages and return the elapsed milliseconds."""
+        started = time.perf_counter()
+        with self._lock:
+            self._pristine.backup(target)
+        return (time.perf_counter() - started) * 1000
+
+    @contextmanager
+    def session(self) -> Iterator[SessionDatabase]:
+        """Yield a private temporary database file that is deleted on exit.
+
+        The file is in WAL mode, so the session's search tools and its booking writer work
+        on separate connections without locking each other out (a shared-cache in-memory
+        database fails such readers and writers with ``SQLITE_LOCKED`` instead of waiting).
+        """
+        with tempfile.TemporaryDirectory(prefix=SESSION_DIR_PREFIX) as directory:
+            path = Path(directory) / DEFAULT_DB_NAME
+            with closing(sqlite3.connect(path)) as target:
+                restore_ms = self.restore(target)
+                target.execute("PRAGMA journal_mode=WAL")
+            logger.info("Restored session database in %.1f ms", restore_ms)
+            yield SessionDatabase(path=path, restore_ms=restore_ms)
+
+
+_SNAPSHOTS: Dict[Path, DatabaseSnapshot] = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+
+
+def get_snapshot(
+    *,
+    overwrite: bool = False,
+    target_dir: Optional[Path] = None,
+) -> DatabaseSnapshot:
+    """Prepare the database once per process and return its pristine snapshot."""
+    directory = _data_dir(target_dir)
+    with _SNAPSHOTS_LOCK:
+        snapshot = _SNAPSHOTS.get(directory)
+        if snapshot is None or overwrite:
+            db_path = prepare_database(overwrite=overwrite, target_dir=directory)
+            snapshot = DatabaseSnapshot(db_path)
+            _SNAPSHOTS[directory] = snapshot
+    return snapshot
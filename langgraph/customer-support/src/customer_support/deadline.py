@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Mapping, Optional
+
+from langchain_core.runnables import Runnable, RunnableSequence
+
+# ``configurable`` key carrying the session's ``Deadline`` to assistants and tools.
+DEADLINE_CONFIG_KEY = "deadline"
+# SQLite virtual machine steps between deadline checks while a query runs.
+SQLITE_PROGRESS_STEPS = 10_000
+
+_CURRENT: ContextVar[Optional["Deadline"]] = ContextVar(
+    "customer_support_deadline", default=None
+)
+
+
+class DeadlineExceeded(BaseException):
+    """A session ran out of time or was cancelled; raised at the next checkpoint.
+
+    Like ``asyncio.CancelledError`` this is not an ``Exception``, so the provider SDKs' retry
+    loops and the tool nodes' error handlers let it through instead of retrying or reporting
+    it to the model.
+    """
+
+
+class Deadline:
+    """Time budget and cancellation flag shared by everything working on one session.
+
+    Checks are cooperative: the assistant checks before each LLM call and caps the request
+    timeout to the time left, tool nodes check before each tool, and SQLite read queries
+    abort through a progress handler.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a time limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.cancelled or self.remaining() == 0.0
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise DeadlineExceeded("The session was cancelled.")
+        if self.remaining() == 0.0:
+            raise DeadlineExceeded("The session deadline has passed.")
+
+    def sqlite_progress(self) -> int:
+        """``set_progress_handler`` callback: a non-zero return aborts the running query."""
+        return int(self.expired())
+
+
+@contextmanager
+def use_deadline(deadline: Deadline) -> Iterator[Deadline]:
+    """Make ``deadline`` visible to code that has no config at hand (e.g. SQLite connections)."""
+    token = _CURRENT.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _CURRENT.get()
+
+
+def deadline_from_config(config: Optional[Mapping[str, Any]]) -> Optional[Deadline]:
+    deadline = ((config or {}).get("configurable") or {}).get(DEADLINE_CONFIG_KEY)
+    if isinstance(deadline, Deadline):
+        return deadline
+    return current_deadline()
+
+
+def check_deadline(config: Optional[Mapping[str, Any]] = None) -> None:
+    deadline = deadline_from_config(config)
+    if deadline is not None:
+        deadline.check()
+
+
+def with_request_timeout(runnable: Runnable, seconds: float) -> Runnable:
+    """Cap the request timeout of the chat model ending a ``prompt | llm`` pipeline.
+
+    Both provider SDKs accept ``timeout`` per request; runnables of any other shape are
+    returned unchanged.
+    """
+    if not isinstance(runnable, RunnableSequence):
+        return runnable
+    return RunnableSequence(
+        runnable.first, *runnable.middle, runnable.last.bind(timeout=max(seconds, 0.001))
+    )
@@ -1,16 +1,36 @@
 from __future__ import annotations
 
-from .part1 import TUTORIAL_QUESTIONS as PART1_TUTORIAL_QUESTIONS
-from .part1 import build_graph as build_part1_graph
-from .part2 import build_graph as build_part2_graph
-from .part3 import build_graph as build_part3_graph
-from .part4 import build_graph as build_part4_graph
+import importlib
+from typing import Any, Callable
+
+from .questions import TUTORIAL_QUESTIONS as PART1_TUTORIAL_QUESTIONS
+
+PART_MODULES = {
+    "part1": "customer_support.graphs.part1",
+    "part2": "customer_support.graphs.part2",
+    "part3": "customer_support.graphs.part3",
+    "part4": "customer_support.graphs.part4",
+}
 
 __all__ = [
     "build_part1_graph",
     "build_part2_graph",
     "build_part3_graph",
     "build_part4_graph",
+    "get_graph_builder",
+    "PART_MODULES",
     "PART1_TUTORIAL_QUESTIONS",
 ]
 
+
+def get_graph_builder(part: str) -> Callable[..., Any]:
+    """Import only the requested part module and return its ``build_graph``."""
+    return importlib.import_module(PART_MODULES[part]).build_graph
+
+
+def __getattr__(name: str) -> Any:
+    if name.startswith("build_") and name.endswith("_graph"):
+        part = name[len("build_") : -len("_graph")]
+        if part in PART_MODULES:
+            return get_graph_builder(part)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,8 +3,6 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Annotated, Iterable, List, Optional
 
-from langchain_anthropic import ChatAnthropic
-from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.language_models.chat_models import BaseChatModel
 from typing_extensions import TypedDict
@@ -24,8 +22,11 @@ from customer_support.tools import (
     cancel_hotel,
     cancel_ticket,
     fetch_user_flight_information,
+    get_web_search_tool,
     lookup_policy,
+    resolve_location,
     search_car_rentals,
+    search_connecting_flights,
     search_flights,
     search_hotels,
     search_trip_recommendations,
@@ -39,23 +40,6 @@ from customer_support.utils.langgraph import create_tool_node_with_fallback
 
 DEFAULT_MODEL = "claude-haiku-4-5-20251001"
 
-TUTORIAL_QUESTIONS: List[str] = [
-    "Hi there, what time is my flight?",
-    "Am i allowed to update my flight to something sooner? I want to leave later today.",
-    "Update my flight to sometime next week then",
-    "The next available option is great",
-    "what about lodging and transportation?",
-    "Yeah i think i'd like an affordable hotel for my week-long stay (7 days). And I'll want to rent a car.",
-    "OK could you place a reservation for your recommended hotel? It sounds nice.",
-    "yes go ahead and book anything that's moderate expense and has availability.",
-    "Now for a car, what are my options?",
-    "Awesome let's just get the cheapest option. Go ahead and book for 7 days",
-    "Cool so now what recommendations do you have on excursions?",
-    "Are they available while I'm there?",
-    "interesting - i like the museums, what options are there? ",
-    "OK great pick one and book it for my second day there.",
-]
-
 
 class State(TypedDict):
     messages: Annotated[List[AnyMessage], add_messages]
@@ -72,10 +56,12 @@ def build_graph(
     set_db_path(db_path)
 
     part_1_tools = [
-        TavilySearchResults(max_results=1),
+        get_web_search_tool(),
         fetch_user_flight_information,
         search_flights,
+        search_connecting_flights,
         lookup_policy,
+        resolve_location,
         update_ticket_to_new_flight,
         cancel_ticket,
         search_car_rentals,
@@ -94,6 +80,8 @@ def build_graph(
     ]
 
     if llm is None:
+        from langchain_anthropic import ChatAnthropic
+
         llm = ChatAnthropic(model=DEFAULT_MODEL, temperature=1)
 
     prompt = ChatPromptTemplate.from_messages(
@@ -3,8 +3,6 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Annotated, Iterable, List, Optional
 
-from langchain_anthropic import ChatAnthropic
-from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -25,8 +23,11 @@ from customer_support.tools import (
     cancel_hotel,
     cancel_ticket,
     fetch_user_flight_information,
+    get_web_search_tool,
     lookup_policy,
+    resolve_location,
     search_car_rentals,
+    search_connecting_flights,
     search_flights,
     search_hotels,
     search_trip_recommendations,
@@ -57,10 +58,12 @@ def build_graph(
     set_db_path(db_path)
 
     tools = [
-        TavilySearchResults(max_results=1),
+        get_web_search_tool(),
         fetch_user_flight_information,
         search_flights,
+        search_connecting_flights,
         lookup_policy,
+        resolve_location,
         update_ticket_to_new_flight,
         cancel_ticket,
         search_car_rentals,
@@ -79,6 +82,8 @@ def build_graph(
     ]
 
     if llm is None:
+        from langchain_anthropic import ChatAnthropic
+
         llm = ChatAnthropic(model=DEFAULT_MODEL, temperature=1)
 
     prompt = ChatPromptTemplate.from_messages(
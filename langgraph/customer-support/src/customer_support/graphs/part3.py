@@ -3,8 +3,6 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Annotated, Iterable, List, Optional
 
-from langchain_anthropic import ChatAnthropic
-from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -25,8 +23,12 @@ from customer_support.tools import (
     cancel_hotel,
     cancel_ticket,
     fetch_user_flight_information,
+    get_web_search_tool,
     lookup_policy,
+    make_write_plan_tool,
+    resolve_location,
     search_car_rentals,
+    search_connecting_flights,
     search_flights,
     search_hotels,
     search_trip_recommendations,
@@ -58,10 +60,12 @@ def build_graph(
     set_db_path(db_path)
 
     safe_tools = [
-        TavilySearchResults(max_results=1),
+        get_web_search_tool(),
         fetch_user_flight_information,
         search_flights,
+        search_connecting_flights,
         lookup_policy,
+        resolve_location,
         search_car_rentals,
         search_hotels,
         search_trip_recommendations,
@@ -81,10 +85,13 @@ def build_graph(
         cancel_excursion,
         *extra_sensitive_tools,
     ]
+    sensitive_tools.append(make_write_plan_tool(sensitive_tools))
     sensitive_tool_names = {tool.name for tool in sensitive_tools}
     safe_tool_names = {tool.name for tool in safe_tools}
 
     if llm is None:
+        from langchain_anthropic import ChatAnthropic
+
         llm = ChatAnthropic(model=DEFAULT_MODEL, temperature=1)
 
     prompt = ChatPromptTemplate.from_messages(
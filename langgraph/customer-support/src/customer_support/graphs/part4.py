@@ -1,13 +1,32 @@
 from __future__ import annotations
 
+import re
+import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Annotated, Callable, List, Literal, Optional
+from functools import partial
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
-from langchain_anthropic import ChatAnthropic
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableLambda, RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
 from langchain_core.language_models.chat_models import BaseChatModel
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
@@ -27,8 +46,12 @@ from customer_support.tools import (
     cancel_hotel,
     cancel_ticket,
     fetch_user_flight_information,
+    get_web_search_tool,
     lookup_policy,
+    make_write_plan_tool,
+    resolve_location,
     search_car_rentals,
+    search_connecting_flights,
     search_flights,
     search_hotels,
     search_trip_recommendations,
@@ -38,9 +61,39 @@ from customer_support.tools import (
     update_ticket_to_new_flight,
     set_db_path,
 )
+from customer_support.tools.prefetch import speculate, use_prefetched
+from customer_support.tools.resolver import get_resolver
+from customer_support.utils.intent import LOCAL_ROUTE_KEY, IntentRouter
 from customer_support.utils.langgraph import create_tool_node_with_fallback
 
 DEFAULT_MODEL = "claude-haiku-4-5-20251001"
+_ISO_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+# Each assistant's node name, which is also its dialog state.
+ASSISTANT_ROLES = (
+    "primary_assistant",
+    "update_flight",
+    "book_car_rental",
+    "book_hotel",
+    "book_excursion",
+)
+ROLE_ALIASES = {
+    "primary": "primary_assistant",
+    "flight": "update_flight",
+    "car_rental": "book_car_rental",
+    "hotel": "book_hotel",
+    "excursion": "book_excursion",
+}
+
+
+def resolve_role(name: str) -> str:
+    """The assistant role for ``name``, which may be a short alias such as ``"hotel"``."""
+    key = name.strip().lower().replace("-", "_")
+    role = ROLE_ALIASES.get(key, key)
+    if role not in ASSISTANT_ROLES:
+        raise ValueError(
+            f"Unknown assistant role '{name}'. Choose from: {', '.join(ASSISTANT_ROLES)}."
+        )
+    return role
 
 
 def update_dialog_stack(left: List[str], right: Optional[str]) -> List[str]:
@@ -108,18 +161,66 @@ class ToBookExcursion(BaseModel):
     request: str
 
 
-def _build_assistant_prompt(system_template: str) -> ChatPromptTemplate:
+def _build_assistant_prompt(
+    instructions: str,
+    context_template: str,
+    *,
+    prompt_cache: bool = False,
+) -> ChatPromptTemplate:
+    """Static instructions first so they (and the bound tools) form a cacheable prefix."""
+    static_block = {"type": "text", "text": instructions}
+    if prompt_cache:
+        static_block["cache_control"] = {"type": "ephemeral"}
     return ChatPromptTemplate.from_messages(
         [
-            ("system", system_template),
+            ("system", [static_block, {"type": "text", "text": context_template}]),
             ("placeholder", "{messages}"),
         ]
     ).partial(time=datetime.now)
 
 
-def create_entry_node(assistant_name: str, new_dialog_state: str) -> Callable:
-    def entry_node(state: State) -> dict:
-        tool_call_id = state["messages"][-1].tool_calls[0]["id"]
+def local_delegation(delegation: Type[BaseModel], text: str, match) -> AIMessage:
+    """The primary assistant's ``delegation`` call, written by the intent router instead.
+
+    Only arguments the text states are filled in: a stored location named word for word and
+    ISO dates in order. The rest are left out for the specialised assistant to ask about.
+    """
+    fields = delegation.model_fields
+    args = {"request": text}
+    if "location" in fields:
+        location = get_resolver().mentioned_location(text)
+        if location is not None:
+            args["location"] = location
+    date_fields = [name for name in fields if name.endswith("_date")]
+    args.update(zip(date_fields, _ISO_DATE.findall(text)))
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {"name": delegation.__name__, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}"}
+        ],
+        response_metadata={
+            LOCAL_ROUTE_KEY: {"intent": match.intent, "confidence": round(match.confidence, 2)}
+        },
+    )
+
+
+def create_entry_node(
+    assistant_name: str,
+    new_dialog_state: str,
+    prefetch: Optional[Tuple[object, Sequence[str]]] = None,
+) -> Callable:
+    """Node that hands the dialog to ``assistant_name``.
+
+    ``prefetch`` is ``(search_tool, argument_names)``: the search is started from the
+    delegation's arguments while the new assistant's first LLM call is still running.
+    """
+
+    def entry_node(state: State, config: RunnableConfig) -> dict:
+        tool_call = state["messages"][-1].tool_calls[0]
+        tool_call_id = tool_call["id"]
+        if prefetch is not None:
+            search, arg_names = prefetch
+            speculate(search, tool_call["args"], arg_names, config)
         return {
             "messages": [
                 ToolMessage(
@@ -154,118 +255,265 @@ def pop_dialog_state(state: State) -> dict:
     return {"dialog_state": "pop", "messages": messages}
 
 
+class Skill(NamedTuple):
+    """A specialised workflow the primary assistant can hand the dialog over to."""
+
+    # Node name and dialog state.
+    name: str
+    assistant_name: str
+    delegation: Type[BaseModel]
+    instructions: str
+    safe_tools: Tuple[BaseTool, ...]
+    sensitive_tools: Tuple[BaseTool, ...]
+    context_template: str = "Current time: {time}."
+    # ``(search_tool, argument_names)`` started from the delegation, see ``create_entry_node``.
+    prefetch: Optional[Tuple[BaseTool, Tuple[str, ...]]] = None
+
+    @property
+    def entry_node(self) -> str:
+        return f"enter_{self.name}"
+
+    @property
+    def safe_node(self) -> str:
+        return f"{self.name}_safe_tools"
+
+    @property
+    def sensitive_node(self) -> str:
+        return f"{self.name}_sensitive_tools"
+
+
+SKILLS: Tuple[Skill, ...] = (
+    Skill(
+        name="update_flight",
+        assistant_name="Flight Updates & Booking Assistant",
+        delegation=ToFlightBookingAssistant,
+        instructions=(
+            "You are a specialized assistant for handling flight updates. "
+            "The primary assistant delegates work to you whenever the user needs help updating their bookings. "
+            "Confirm the updated flight details with the customer and inform them of any additional fees. "
+            "When searching, be persistent. Expand your query bounds if the first search returns no results. "
+            "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
+            "Remember that a booking isn't completed until after the relevant tool has successfully been used."
+            '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
+            " Do not waste the user's time. Do not make up invalid tools or functions."
+        ),
+        context_template=(
+            "Current user flight information:\n<Flights>\n{user_info}\n</Flights>"
+            "\nCurrent time: {time}."
+        ),
+        safe_tools=(search_flights, search_connecting_flights, resolve_location),
+        sensitive_tools=(update_ticket_to_new_flight, cancel_ticket),
+    ),
+    Skill(
+        name="book_car_rental",
+        assistant_name="Car Rental Assistant",
+        delegation=ToBookCarRental,
+        instructions=(
+            "You are a specialized assistant for handling car rental bookings. "
+            "The primary assistant delegates work to you whenever the user needs help booking a car rental. "
+            "Search for available car rentals based on the user's preferences and confirm the booking details with the customer. "
+            "When searching, be persistent. Expand your query bounds if the first search returns no results. "
+            "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
+            "Remember that a booking isn't completed until after the relevant tool has successfully been used."
+            '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
+            " Do not waste the user's time. Do not make up invalid tools or functions."
+        ),
+        safe_tools=(search_car_rentals, resolve_location),
+        sensitive_tools=(book_car_rental, update_car_rental, cancel_car_rental),
+        prefetch=(search_car_rentals, ("location", "start_date", "end_date")),
+    ),
+    Skill(
+        name="book_hotel",
+        assistant_name="Hotel Booking Assistant",
+        delegation=ToHotelBookingAssistant,
+        instructions=(
+            "You are a specialized assistant for handling hotel bookings. "
+            "The primary assistant delegates work to you whenever the user needs help booking a hotel. "
+            "Search for available hotels based on the user's preferences and confirm the booking details with the customer. "
+            "When searching, be persistent. Expand your query bounds if the first search returns no results. "
+            "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
+            "Remember that a booking isn't completed until after the relevant tool has successfully been used."
+            '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
+            " Do not waste the user's time. Do not make up invalid tools or functions."
+        ),
+        safe_tools=(search_hotels, resolve_location),
+        sensitive_tools=(book_hotel, update_hotel, cancel_hotel),
+        prefetch=(search_hotels, ("location", "checkin_date", "checkout_date")),
+    ),
+    Skill(
+        name="book_excursion",
+        assistant_name="Trip Recommendation Assistant",
+        delegation=ToBookExcursion,
+        instructions=(
+            "You are a specialized assistant for handling trip recommendations. "
+            "The primary assistant delegates work to you whenever the user needs help booking a recommended trip. "
+            "Search for available trip recommendations based on the user's preferences and confirm the booking details with the customer. "
+            "When searching, be persistent. Expand your query bounds if the first search returns no results. "
+            "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
+            "Remember that a booking isn't completed until after the relevant tool has successfully been used."
+            '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
+            " Do not waste the user's time. Do not make up invalid tools or functions."
+        ),
+        safe_tools=(search_trip_recommendations, resolve_location),
+        sensitive_tools=(book_excursion, update_excursion, cancel_excursion),
+        prefetch=(search_trip_recommendations, ("location",)),
+    ),
+)
+SKILLS_BY_NAME = {skill.name: skill for skill in SKILLS}
+# The primary assistant's next node for each delegation tool.
+DELEGATION_ROUTES = {skill.delegation.__name__: skill.entry_node for skill in SKILLS}
+
+PRIMARY_INSTRUCTIONS = (
+    "You are a helpful customer support assistant for Swiss Airlines. "
+    "Your primary role is to search for flight information and company policies to answer customer queries. "
+    "If a customer requests to update or cancel a flight, book a car rental, book a hotel, or get trip recommendations, "
+    "delegate the task to the appropriate specialized assistant by invoking the corresponding tool. You are not able to make these types of changes yourself. "
+    "Never delegate to more than one specialized assistant in the same response. "
+    "Complete one delegation at a time and wait for the specialized assistant to return control before invoking another assistant. "
+    "Only the specialized assistants are given permission to do this for the user."
+    "The user is not aware of the different specialized assistants, so do not mention them; just quietly delegate through function calls. "
+    "Provide detailed information to the customer, and always double-check the database before concluding that information is unavailable. "
+    "When searching, be persistent. Expand your query bounds if the first search returns no results. "
+    "If a search comes up empty, expand your search before giving up."
+)
+PRIMARY_CONTEXT = (
+    "Current user flight information:\n<Flights>\n{user_info}\n</Flights>"
+    "\nCurrent time: {time}."
+)
+
+# Bound assistants are kept for this many (role, model, prompt cache) combinations.
+MAX_CACHED_RUNNABLES = 64
+_runnables: "OrderedDict[Tuple[str, int, bool], Tuple[BaseChatModel, Runnable]]" = OrderedDict()
+_sensitive_tools: Dict[str, List[BaseTool]] = {}
+_tool_nodes: Dict[str, Any] = {}
+_cache_lock = threading.Lock()
+
+
+def _primary_tools() -> List[BaseTool]:
+    return [
+        get_web_search_tool(),
+        search_flights,
+        search_connecting_flights,
+        lookup_policy,
+        resolve_location,
+    ]
+
+
+def _skill_tools(skill: Skill) -> Tuple[List[BaseTool], List[BaseTool]]:
+    """``skill``'s safe and sensitive tools; the latter end with its write-plan tool."""
+    with _cache_lock:
+        sensitive = _sensitive_tools.get(skill.name)
+        if sensitive is None:
+            sensitive = list(skill.sensitive_tools)
+            sensitive.append(make_write_plan_tool(sensitive))
+            _sensitive_tools[skill.name] = sensitive
+    return list(skill.safe_tools), sensitive
+
+
+def _tool_node(name: str, tools: Sequence[BaseTool]):
+    """The tool node called ``name``, shared by every graph build in the process.
+
+    The first call after a handover may be answered by the search the entry node prefetched.
+    """
+    with _cache_lock:
+        node = _tool_nodes.get(name)
+    if node is None:
+        node = create_tool_node_with_fallback(tools, wrap=use_prefetched)
+        with _cache_lock:
+            node = _tool_nodes.setdefault(name, node)
+    return node
+
+
+def assistant_runnable(role: str, llm: BaseChatModel, prompt_cache: bool = False) -> Runnable:
+    """``role``'s prompt piped into ``llm`` with its tools bound.
+
+    Built the first time the role runs, then shared by every graph using the same ``llm``
+    object, so a session that never leaves the primary assistant binds no other tools.
+    """
+    key = (role, id(llm), prompt_cache)
+    with _cache_lock:
+        cached = _runnables.get(key)
+        # The entry keeps ``llm`` alive, so a matching id is the same model.
+        if cached is not None and cached[0] is llm:
+            _runnables.move_to_end(key)
+            return cached[1]
+    if role == "primary_assistant":
+        instructions, context_template = PRIMARY_INSTRUCTIONS, PRIMARY_CONTEXT
+        tools = _primary_tools() + [skill.delegation for skill in SKILLS]
+    else:
+        skill = SKILLS_BY_NAME[role]
+        instructions, context_template = skill.instructions, skill.context_template
+        safe_tools, sensitive_tools = _skill_tools(skill)
+        tools = safe_tools + sensitive_tools + [CompleteOrEscalate]
+    prompt = _build_assistant_prompt(instructions, context_template, prompt_cache=prompt_cache)
+    runnable = prompt | llm.bind_tools(tools)
+    with _cache_lock:
+        _runnables[key] = (llm, runnable)
+        while len(_runnables) > MAX_CACHED_RUNNABLES:
+            _runnables.popitem(last=False)
+    return runnable
+
+
+def route_primary_assistant(state: State):
+    if tools_condition(state) == END:
+        return END
+    first_call = state["messages"][-1].tool_calls[0]["name"]
+    return DELEGATION_ROUTES.get(first_call, "primary_assistant_tools")
+
+
+def _skill_router(skill: Skill) -> Callable[[State], str]:
+    safe_names = frozenset(tool.name for tool in skill.safe_tools)
+
+    def route(state: State) -> str:
+        if tools_condition(state) == END:
+            return END
+        names = {tool_call["name"] for tool_call in state["messages"][-1].tool_calls}
+        if CompleteOrEscalate.__name__ in names:
+            return "leave_skill"
+        return skill.safe_node if names <= safe_names else skill.sensitive_node
+
+    route.__name__ = f"route_{skill.name}"
+    return route
+
+
 def build_graph(
     db_path: str,
     *,
     llm: Optional[BaseChatModel] = None,
+    role_llms: Optional[Mapping[str, BaseChatModel]] = None,
     checkpointer=None,
+    prompt_cache: Union[bool, Collection[str]] = False,
+    intent_router: Union[bool, IntentRouter] = False,
+    prefetch_searches: bool = True,
 ):
-    """Build the Part 4 specialized workflow graph."""
-    set_db_path(db_path)
+    """Build the Part 4 specialized workflow graph from ``SKILLS``.
 
-    if llm is None:
-        llm = ChatAnthropic(model=DEFAULT_MODEL, temperature=1)
-
-    flight_prompt = _build_assistant_prompt(
-        "You are a specialized assistant for handling flight updates. "
-        "The primary assistant delegates work to you whenever the user needs help updating their bookings. "
-        "Confirm the updated flight details with the customer and inform them of any additional fees. "
-        "When searching, be persistent. Expand your query bounds if the first search returns no results. "
-        "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
-        "Remember that a booking isn't completed until after the relevant tool has successfully been used."
-        "\n\nCurrent user flight information:\n<Flights>\n{user_info}\n</Flights>"
-        "\nCurrent time: {time}."
-        '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
-        " Do not waste the user's time. Do not make up invalid tools or functions."
-    )
-    update_flight_safe_tools = [search_flights]
-    update_flight_sensitive_tools = [update_ticket_to_new_flight, cancel_ticket]
-    update_flight_runnable = flight_prompt | llm.bind_tools(
-        update_flight_safe_tools + update_flight_sensitive_tools + [CompleteOrEscalate]
-    )
+    Each assistant's prompt and tool-bound model are created on its first turn (see
+    ``assistant_runnable``); tool nodes are shared between builds.
 
-    hotel_prompt = _build_assistant_prompt(
-        "You are a specialized assistant for handling hotel bookings. "
-        "The primary assistant delegates work to you whenever the user needs help booking a hotel. "
-        "Search for available hotels based on the user's preferences and confirm the booking details with the customer. "
-        "When searching, be persistent. Expand your query bounds if the first search returns no results. "
-        "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
-        "Remember that a booking isn't completed until after the relevant tool has successfully been used."
-        "\nCurrent time: {time}."
-        '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
-        " Do not waste the user's time. Do not make up invalid tools or functions."
-    )
-    book_hotel_safe_tools = [search_hotels]
-    book_hotel_sensitive_tools = [book_hotel, update_hotel, cancel_hotel]
-    book_hotel_runnable = hotel_prompt | llm.bind_tools(
-        book_hotel_safe_tools + book_hotel_sensitive_tools + [CompleteOrEscalate]
-    )
+    ``role_llms`` gives individual assistants (keyed by role or alias, see ``resolve_role``)
+    their own model; the others use ``llm``. ``prompt_cache`` may name the roles whose prompts
+    get cache breakpoints when only some of the models support them.
 
-    car_prompt = _build_assistant_prompt(
-        "You are a specialized assistant for handling car rental bookings. "
-        "The primary assistant delegates work to you whenever the user needs help booking a car rental. "
-        "Search for available car rentals based on the user's preferences and confirm the booking details with the customer. "
-        "When searching, be persistent. Expand your query bounds if the first search returns no results. "
-        "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
-        "Remember that a booking isn't completed until after the relevant tool has successfully been used."
-        "\nCurrent time: {time}."
-        '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
-        " Do not waste the user's time. Do not make up invalid tools or functions."
-    )
-    book_car_rental_safe_tools = [search_car_rentals]
-    book_car_rental_sensitive_tools = [
-        book_car_rental,
-        update_car_rental,
-        cancel_car_rental,
-    ]
-    book_car_rental_runnable = car_prompt | llm.bind_tools(
-        book_car_rental_safe_tools + book_car_rental_sensitive_tools + [CompleteOrEscalate]
-    )
+    With ``intent_router``, unambiguous booking requests skip the primary assistant's LLM
+    call and enter the matching workflow directly; everything else still goes to the LLM.
+    ``prefetch_searches`` starts the hotel, car rental or excursion search a handover asks
+    for alongside the specialised assistant's first LLM call.
+    """
+    set_db_path(db_path)
 
-    excursion_prompt = _build_assistant_prompt(
-        "You are a specialized assistant for handling trip recommendations. "
-        "The primary assistant delegates work to you whenever the user needs help booking a recommended trip. "
-        "Search for available trip recommendations based on the user's preferences and confirm the booking details with the customer. "
-        "When searching, be persistent. Expand your query bounds if the first search returns no results. "
-        "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
-        "Remember that a booking isn't completed until after the relevant tool has successfully been used."
-        "\nCurrent time: {time}."
-        '\n\nIf the user needs help, and none of your tools are appropriate for it, then "CompleteOrEscalate" the dialog to the host assistant.'
-        " Do not waste the user's time. Do not make up invalid tools or functions."
-    )
-    book_excursion_safe_tools = [search_trip_recommendations]
-    book_excursion_sensitive_tools = [book_excursion, update_excursion, cancel_excursion]
-    book_excursion_runnable = excursion_prompt | llm.bind_tools(
-        book_excursion_safe_tools + book_excursion_sensitive_tools + [CompleteOrEscalate]
-    )
+    if llm is None:
+        from customer_support.llm import create_chat_model
 
-    primary_prompt = _build_assistant_prompt(
-        "You are a helpful customer support assistant for Swiss Airlines. "
-        "Your primary role is to search for flight information and company policies to answer customer queries. "
-        "If a customer requests to update or cancel a flight, book a car rental, book a hotel, or get trip recommendations, "
-        "delegate the task to the appropriate specialized assistant by invoking the corresponding tool. You are not able to make these types of changes yourself. "
-        "Never delegate to more than one specialized assistant in the same response. "
-        "Complete one delegation at a time and wait for the specialized assistant to return control before invoking another assistant. "
-        "Only the specialized assistants are given permission to do this for the user."
-        "The user is not aware of the different specialized assistants, so do not mention them; just quietly delegate through function calls. "
-        "Provide detailed information to the customer, and always double-check the database before concluding that information is unavailable. "
-        "When searching, be persistent. Expand your query bounds if the first search returns no results. "
-        "If a search comes up empty, expand your search before giving up."
-        "\n\nCurrent user flight information:\n<Flights>\n{user_info}\n</Flights>"
-        "\nCurrent time: {time}."
-    )
-    primary_safe_tools = [
-        TavilySearchResults(max_results=1),
-        search_flights,
-        lookup_policy,
-    ]
-    primary_binding_tools = primary_safe_tools + [
-        ToFlightBookingAssistant,
-        ToBookCarRental,
-        ToHotelBookingAssistant,
-        ToBookExcursion,
-    ]
-    primary_runnable = primary_prompt | llm.bind_tools(primary_binding_tools)
+        # The shared instance, so rebuilt graphs reuse the bound assistants cached for it.
+        llm = create_chat_model("anthropic", DEFAULT_MODEL)
+    role_models = {resolve_role(role): model for role, model in (role_llms or {}).items()}
+
+    def create_assistant(role: str) -> Assistant:
+        cache = prompt_cache if isinstance(prompt_cache, bool) else role in prompt_cache
+        return Assistant(
+            partial(assistant_runnable, role, role_models.get(role, llm), cache), role=role
+        )
 
     builder = StateGraph(State)
 
@@ -279,226 +527,87 @@ def build_graph(
     builder.add_node("fetch_user_info", RunnableLambda(fetch_user_info))
     builder.add_edge(START, "fetch_user_info")
 
-    builder.add_node(
-        "enter_update_flight",
-        create_entry_node("Flight Updates & Booking Assistant", "update_flight"),
-    )
-    builder.add_node("update_flight", Assistant(update_flight_runnable))
-    builder.add_edge("enter_update_flight", "update_flight")
-    builder.add_node(
-        "update_flight_safe_tools",
-        create_tool_node_with_fallback(update_flight_safe_tools),
-    )
-    builder.add_node(
-        "update_flight_sensitive_tools",
-        create_tool_node_with_fallback(update_flight_sensitive_tools),
-    )
-
-    def route_update_flight(state: State):
-        next_node = tools_condition(state)
-        if next_node == END:
-            return END
-        tool_calls = state["messages"][-1].tool_calls
-        if any(tc["name"] == CompleteOrEscalate.__name__ for tc in tool_calls):
-            return "leave_skill"
-        safe_names = {tool.name for tool in update_flight_safe_tools}
-        if all(tc["name"] in safe_names for tc in tool_calls):
-            return "update_flight_safe_tools"
-        return "update_flight_sensitive_tools"
-
-    builder.add_edge("update_flight_safe_tools", "update_flight")
-    builder.add_edge("update_flight_sensitive_tools", "update_flight")
-    builder.add_conditional_edges(
-        "update_flight",
-        route_update_flight,
-        ["update_flight_safe_tools", "update_flight_sensitive_tools", "leave_skill", END],
-    )
-
-    builder.add_node(
-        "enter_book_car_rental",
-        create_entry_node("Car Rental Assistant", "book_car_rental"),
-    )
-    builder.add_node("book_car_rental", Assistant(book_car_rental_runnable))
-    builder.add_edge("enter_book_car_rental", "book_car_rental")
-    builder.add_node(
-        "book_car_rental_safe_tools",
-        create_tool_node_with_fallback(book_car_rental_safe_tools),
-    )
-    builder.add_node(
-        "book_car_rental_sensitive_tools",
-        create_tool_node_with_fallback(book_car_rental_sensitive_tools),
-    )
-
-    def route_book_car_rental(state: State):
-        next_node = tools_condition(state)
-        if next_node == END:
-            return END
-        tool_calls = state["messages"][-1].tool_calls
-        if any(tc["name"] == CompleteOrEscalate.__name__ for tc in tool_calls):
-            return "leave_skill"
-        safe_names = {tool.name for tool in book_car_rental_safe_tools}
-        if all(tc["name"] in safe_names for tc in tool_calls):
-            return "book_car_rental_safe_tools"
-        return "book_car_rental_sensitive_tools"
-
-    builder.add_edge("book_car_rental_safe_tools", "book_car_rental")
-    builder.add_edge("book_car_rental_sensitive_tools", "book_car_rental")
-    builder.add_conditional_edges(
-        "book_car_rental",
-        route_book_car_rental,
-        [
-            "book_car_rental_safe_tools",
-            "book_car_rental_sensitive_tools",
-            "leave_skill",
-            END,
-        ],
-    )
-
-    builder.add_node(
-        "enter_book_hotel",
-        create_entry_node("Hotel Booking Assistant", "book_hotel"),
-    )
-    builder.add_node("book_hotel", Assistant(book_hotel_runnable))
-    builder.add_edge("enter_book_hotel", "book_hotel")
-    builder.add_node(
-        "book_hotel_safe_tools",
-        create_tool_node_with_fallback(book_hotel_safe_tools),
-    )
-    builder.add_node(
-        "book_hotel_sensitive_tools",
-        create_tool_node_with_fallback(book_hotel_sensitive_tools),
-    )
-
-    def route_book_hotel(state: State):
-        next_node = tools_condition(state)
-        if next_node == END:
-            return END
-        tool_calls = state["messages"][-1].tool_calls
-        if any(tc["name"] == CompleteOrEscalate.__name__ for tc in tool_calls):
-            return "leave_skill"
-        safe_names = {tool.name for tool in book_hotel_safe_tools}
-        if all(tc["name"] in safe_names for tc in tool_calls):
-            return "book_hotel_safe_tools"
-        return "book_hotel_sensitive_tools"
-
-    builder.add_edge("book_hotel_safe_tools", "book_hotel")
-    builder.add_edge("book_hotel_sensitive_tools", "book_hotel")
-    builder.add_conditional_edges(
-        "book_hotel",
-        route_book_hotel,
-        ["book_hotel_safe_tools", "book_hotel_sensitive_tools", "leave_skill", END],
-    )
-
-    builder.add_node(
-        "enter_book_excursion",
-        create_entry_node("Trip Recommendation Assistant", "book_excursion"),
-    )
-    builder.add_node("book_excursion", Assistant(book_excursion_runnable))
-    builder.add_edge("enter_book_excursion", "book_excursion")
-    builder.add_node(
-        "book_excursion_safe_tools",
-        create_tool_node_with_fallback(book_excursion_safe_tools),
-    )
-    builder.add_node(
-        "book_excursion_sensitive_tools",
-        create_tool_node_with_fallback(book_excursion_sensitive_tools),
-    )
-
-    def route_book_excursion(state: State):
-        next_node = tools_condition(state)
-        if next_node == END:
-            return END
-        tool_calls = state["messages"][-1].tool_calls
-        if any(tc["name"] == CompleteOrEscalate.__name__ for tc in tool_calls):
-            return "leave_skill"
-        safe_names = {tool.name for tool in book_excursion_safe_tools}
-        if all(tc["name"] in safe_names for tc in tool_calls):
-            return "book_excursion_safe_tools"
-        return "book_excursion_sensitive_tools"
-
-    builder.add_edge("book_excursion_safe_tools", "book_excursion")
-    builder.add_edge("book_excursion_sensitive_tools", "book_excursion")
-    builder.add_conditional_edges(
-        "book_excursion",
-        route_book_excursion,
-        ["book_excursion_safe_tools", "book_excursion_sensitive_tools", "leave_skill", END],
-    )
+    for skill in SKILLS:
+        builder.add_node(
+            skill.entry_node,
+            create_entry_node(
+                skill.assistant_name,
+                skill.name,
+                prefetch=skill.prefetch if prefetch_searches else None,
+            ),
+        )
+        builder.add_node(skill.name, create_assistant(skill.name))
+        builder.add_edge(skill.entry_node, skill.name)
+        safe_tools, sensitive_tools = _skill_tools(skill)
+        builder.add_node(skill.safe_node, _tool_node(skill.safe_node, safe_tools))
+        builder.add_node(skill.sensitive_node, _tool_node(skill.sensitive_node, sensitive_tools))
+        builder.add_edge(skill.safe_node, skill.name)
+        builder.add_edge(skill.sensitive_node, skill.name)
+        builder.add_conditional_edges(
+            skill.name,
+            _skill_router(skill),
+            [skill.safe_node, skill.sensitive_node, "leave_skill", END],
+        )
 
-    builder.add_node("primary_assistant", Assistant(primary_runnable))
+    builder.add_node("primary_assistant", create_assistant("primary_assistant"))
     builder.add_node(
         "primary_assistant_tools",
-        create_tool_node_with_fallback(primary_safe_tools),
+        _tool_node("primary_assistant_tools", _primary_tools()),
     )
-
-    def route_primary_assistant(state: State):
-        next_node = tools_condition(state)
-        if next_node == END:
-            return END
-        tool_calls = state["messages"][-1].tool_calls
-        if not tool_calls:
-            return "primary_assistant_tools"
-        first_call = tool_calls[0]["name"]
-        if first_call == ToFlightBookingAssistant.__name__:
-            return "enter_update_flight"
-        if first_call == ToBookCarRental.__name__:
-            return "enter_book_car_rental"
-        if first_call == ToHotelBookingAssistant.__name__:
-            return "enter_book_hotel"
-        if first_call == ToBookExcursion.__name__:
-            return "enter_book_excursion"
-        return "primary_assistant_tools"
-
     builder.add_conditional_edges(
         "primary_assistant",
         route_primary_assistant,
-        [
-            "enter_update_flight",
-            "enter_book_car_rental",
-            "enter_book_hotel",
-            "enter_book_excursion",
-            "primary_assistant_tools",
-            END,
-        ],
+        [*DELEGATION_ROUTES.values(), "primary_assistant_tools", END],
     )
     builder.add_edge("primary_assistant_tools", "primary_assistant")
 
     builder.add_node("leave_skill", pop_dialog_state)
     builder.add_edge("leave_skill", "primary_assistant")
 
-    def route_to_workflow(
-        state: State,
-    ) -> Literal[
-        "primary_assistant",
-        "update_flight",
-        "book_car_rental",
-        "book_hotel",
-        "book_excursion",
-    ]:
+    router = IntentRouter() if intent_router is True else intent_router or None
+    entry_node = "primary_assistant"
+    if router is not None:
+        entry_node = "route_intent"
+
+        def route_intent(state: State) -> dict:
+            message = state["messages"][-1]
+            if message.type != "human":
+                return {}
+            match = router.classify(message.text)
+            if match.intent is None:
+                return {}
+            delegation = SKILLS_BY_NAME[match.intent].delegation
+            return {"messages": [local_delegation(delegation, message.text, match)]}
+
+        def route_after_intent(state: State):
+            if state["messages"][-1].type == "ai":
+                return route_primary_assistant(state)
+            return "primary_assistant"
+
+        builder.add_node("route_intent", route_intent)
+        builder.add_conditional_edges(
+            "route_intent",
+            route_after_intent,
+            [*DELEGATION_ROUTES.values(), "primary_assistant"],
+        )
+
+    def route_to_workflow(state: State) -> str:
         dialog_state = state.get("dialog_state", [])
         if not dialog_state:
-            return "primary_assistant"
-        return dialog_state[-1]
+            return entry_node
+        workflow = dialog_state[-1]
+        if workflow in ("primary_assistant", ["primary_assistant"]):
+            return entry_node
+        return workflow
 
     builder.add_conditional_edges(
         "fetch_user_info",
         route_to_workflow,
-        [
-            "primary_assistant",
-            "update_flight",
-            "book_car_rental",
-            "book_hotel",
-            "book_excursion",
-        ],
+        [entry_node, *SKILLS_BY_NAME],
     )
 
     memory = checkpointer or InMemorySaver()
     return builder.compile(
         checkpointer=memory,
-        interrupt_before=[
-            "update_flight_sensitive_tools",
-            "book_car_rental_sensitive_tools",
-            "book_hotel_sensitive_tools",
-            "book_excursion_sensitive_tools",
-        ],
+        interrupt_before=[skill.sensitive_node for skill in SKILLS],
     )
-
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence
+
+import anthropic
+from langchain_anthropic import ChatAnthropic
+from langchain_core.callbacks import CallbackManager, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.constants import TAG_NOSTREAM
+
+from customer_support.deadline import DeadlineExceeded
+from customer_support.utils.http import get_http_client
+from customer_support.utils.latency import LLM_LATENCY
+
+logger = logging.getLogger(__name__)
+
+HEDGE_METADATA_KEY = "hedge"
+
+# Chat models hold no per-conversation state, so sessions share them (and whatever is cached
+# against them, such as part 4's tool-bound assistants).
+_models: Dict[tuple, BaseChatModel] = {}
+_models_lock = threading.Lock()
+
+
+def anthropic_http_package() -> str:
+    """The HTTP package the installed Anthropic SDK is built on: ``httpx``, or ``httpx2`` in
+    newer releases. It only accepts clients from that package."""
+    return anthropic.DefaultHttpxClient.__mro__[1].__module__.partition(".")[0]
+
+
+class PooledChatAnthropic(ChatAnthropic):
+    """``ChatAnthropic`` whose client sends requests through the shared connection pool."""
+
+    @cached_property
+    def _client(self) -> anthropic.Client:
+        http_client = get_http_client(anthropic_http_package())
+        return anthropic.Client(**self._client_params, http_client=http_client)
+
+
+def _shared_model(key: tuple, create) -> BaseChatModel:
+    with _models_lock:
+        chat_model = _models.get(key)
+    if chat_model is None:
+        chat_model = create()
+        with _models_lock:
+            chat_model = _models.setdefault(key, chat_model)
+    return chat_model
+
+
+def create_chat_model(provider: str, model: str, *, temperature: float = 1) -> BaseChatModel:
+    """Chat model for ``provider`` backed by the process-wide HTTP client.
+
+    Repeated calls with the same arguments return the same instance.
+    """
+
+    def create() -> BaseChatModel:
+        if provider == "openai":
+            from langchain_openai import ChatOpenAI
+
+            return ChatOpenAI(model=model, temperature=temperature, http_client=get_http_client())
+        return PooledChatAnthropic(model=model, temperature=temperature)
+
+    return _shared_model((provider, model, temperature), create)
+
+
+def _without_cache_control(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Drop Anthropic ``cache_control`` breakpoints, which other providers reject."""
+    stripped = []
+    for message in messages:
+        if isinstance(message.content, list) and any(
+            isinstance(block, dict) and "cache_control" in block for block in message.content
+        ):
+            content = [
+                {k: v for k, v in block.items() if k != "cache_control"}
+                if isinstance(block, dict)
+                else block
+                for block in message.content
+            ]
+            message = message.model_copy(update={"content": content})
+        stripped.append(message)
+    return stripped
+
+
+def _child_callbacks(run_manager: CallbackManagerForLLMRun) -> CallbackManager:
+    """Callbacks that trace the provider calls as children of the hedged call's run."""
+    manager = CallbackManager(handlers=[], parent_run_id=run_manager.run_id)
+    manager.set_handlers(run_manager.inheritable_handlers)
+    manager.add_tags(run_manager.inheritable_tags)
+    manager.add_metadata(run_manager.inheritable_metadata)
+    return manager
+
+
+class HedgedChatModel(BaseChatModel):
+    """Races a secondary provider against a slow or failing primary.
+
+    Each request goes to ``primary`` first. If it has not answered after the hedge delay, the
+    same request is also sent to ``secondary`` and whichever answers first wins; if the primary
+    fails, the secondary is asked straight away. The losing call is abandoned and its stream
+    closed as soon as it yields. The delay is ``hedge_after`` when set, otherwise the primary's
+    observed ``hedge_quantile`` latency, clamped to ``[min_hedge_delay, max_hedge_delay]``.
+
+    Inner calls run with LangGraph's ``nostream`` tag, so token streaming shows only the
+    winning message, once it is complete.
+    """
+
+    primary: Any
+    secondary: Any
+    primary_name: str = "primary"
+    secondary_name: str = "secondary"
+    hedge_after: Optional[float] = None
+    hedge_quantile: float = 0.95
+    min_hedge_delay: float = 1.0
+    max_hedge_delay: float = 20.0
+    # Used until the primary has ``min_samples`` completed calls.
+    default_hedge_delay: float = 8.0
+    min_samples: int = 20
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "HedgedChatModel":
+        return self.model_copy(
+            update={
+                "primary": self.primary.bind_tools(tools, **kwargs),
+                "secondary": self.secondary.bind_tools(tools, **kwargs),
+            }
+        )
+
+    def hedge_delay(self) -> float:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        histogram = LLM_LATENCY.get(self.primary_name)
+        if histogram.count < self.min_samples:
+            return self.default_hedge_delay
+        observed = histogram.quantile(self.hedge_quantile) or self.default_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, observed))
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if stop is not None:
+            kwargs["stop"] = stop
+        config = {
+            "callbacks": _child_callbacks(run_manager) if run_manager else None,
+            "tags": [TAG_NOSTREAM],
+        }
+        results: "queue.Queue[tuple]" = queue.Queue()
+        cancelled = threading.Event()
+        providers = {self.primary_name: self.primary, self.secondary_name: self.secondary}
+        started: List[str] = []
+        errors: Dict[str, BaseException] = {}
+        hedged = False
+
+        def start(name: str) -> None:
+            started.append(name)
+            provider_messages = messages
+            if name != "anthropic":
+                provider_messages = _without_cache_control(messages)
+            context = contextvars.copy_context()
+            threading.Thread(
+                target=context.run,
+                args=(
+                    self._call,
+                    name,
+                    providers[name],
+                    provider_messages,
+                    config,
+                    kwargs,
+                    cancelled,
+                    results,
+                ),
+                name=f"llm-{name}",
+                daemon=True,
+            ).start()
+
+        start(self.primary_name)
+        delay = self.hedge_delay()
+        while True:
+            waiting = len(started) - len(errors)
+            try:
+                timeout = delay if len(started) == 1 else None
+                name, message, error = results.get(timeout=timeout)
+            except queue.Empty:
+                logger.info("Hedging to %s after %.2fs", self.secondary_name, delay)
+                hedged = True
+                start(self.secondary_name)
+                continue
+            if error is None:
+                cancelled.set()
+                break
+            if isinstance(error, DeadlineExceeded):
+                cancelled.set()
+                raise error
+            errors[name] = error
+            logger.warning("%s call failed: %s", name, error)
+            if len(started) == 1:
+                start(self.secondary_name)
+            elif waiting == 1:
+                raise errors[self.primary_name] from errors.get(self.secondary_name)
+        message.response_metadata[HEDGE_METADATA_KEY] = {
+            "provider": name,
+            "hedged": hedged,
+            "failed_over": bool(errors),
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _call(
+        name: str,
+        model: Any,
+        messages: List[BaseMessage],
+        config: Dict[str, Any],
+        kwargs: Dict[str, Any],
+        cancelled: threading.Event,
+        results: "queue.Queue[tuple]",
+    ) -> None:
+        histogram = LLM_LATENCY.get(name)
+        start = time.monotonic()
+        aggregate = None
+        stream = model.stream(messages, config, **kwargs)
+        try:
+            for chunk in stream:
+                if cancelled.is_set():
+                    histogram.record_abandoned()
+                    return
+                aggregate = chunk if aggregate is None else aggregate + chunk
+        except (Exception, DeadlineExceeded) as exc:
+            histogram.record_error()
+            results.put((name, None, exc))
+            return
+        finally:
+            stream.close()
+        if cancelled.is_set():
+            histogram.record_abandoned()
+            return
+        histogram.record(time.monotonic() - start)
+        if aggregate is None:
+            results.put((name, None, ValueError(f"{name} returned an empty response.")))
+            return
+        results.put((name, message_chunk_to_message(aggregate), None))
+
+
+def create_hedged_chat_model(
+    primary: str,
+    models: Dict[str, str],
+    *,
+    hedge_after: Optional[float] = None,
+    temperature: float = 1,
+) -> HedgedChatModel:
+    """``primary``'s model, hedged and failed over to the other provider in ``models``."""
+    secondary = next(provider for provider in models if provider != primary)
+    key = ("hedged", primary, models[primary], secondary, models[secondary], hedge_after)
+    return _shared_model(
+        key + (temperature,),
+        lambda: HedgedChatModel(
+            primary=create_chat_model(primary, models[primary], temperature=temperature),
+            secondary=create_chat_model(secondary, models[secondary], temperature=temperature),
+            primary_name=primary,
+            secondary_name=secondary,
+            hedge_after=hedge_after,
+        ),
+    )
@@ -5,42 +5,27 @@ import logging
 import os
 import sys
 import uuid
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Any, Iterable, List, Sequence
-
-import fluxloop
-from dotenv import load_dotenv
-from langchain_anthropic import ChatAnthropic
-from langchain_openai import ChatOpenAI
+from typing import Any, Iterable, List, Mapping, Sequence
 
 from customer_support.data.travel_db import (
     DEFAULT_ENV_VAR,
     get_default_storage_dir,
+    get_snapshot,
     prepare_database,
 )
 from customer_support.utils.environment import ensure_env_vars
-from customer_support.graphs import (
-    PART1_TUTORIAL_QUESTIONS,
-    build_part1_graph,
-    build_part2_graph,
-    build_part3_graph,
-    build_part4_graph,
-)
-from customer_support.utils.console import interactive_turn, run_dialog
-
-
-GRAPH_BUILDERS = {
-    "part1": build_part1_graph,
-    "part2": build_part2_graph,
-    "part3": build_part3_graph,
-    "part4": build_part4_graph,
-}
+from customer_support.graphs import PART1_TUTORIAL_QUESTIONS, PART_MODULES, get_graph_builder
+from customer_support.utils.tracing import lazy_agent
+from customer_support.utils.usage import summarize_usage, summarize_usage_by_role
 
 SUPPORTED_PROVIDERS = {"anthropic", "openai"}
 DEFAULT_PROVIDER = "anthropic"
 PROVIDER_ENV_KEY = "CUSTOMER_SUPPORT_PROVIDER"
 OPENAI_MODEL = "gpt-5-mini"
 ANTHROPIC_MODEL = "claude-haiku-4-5-20251001"
+ROLE_MODELS_ENV_KEY = "CUSTOMER_SUPPORT_ROLE_MODELS"
 
 logger = logging.getLogger(__name__)
 
@@ -59,13 +44,46 @@ def resolve_provider(provider: str | None) -> str:
     return candidate
 
 
-def required_keys_for(provider: str) -> set[str]:
+def required_keys_for(provider: str, *, hedge: bool | float = False) -> set[str]:
     keys = {"OPENAI_API_KEY", "TAVILY_API_KEY"}
-    if provider == "anthropic":
+    if provider == "anthropic" or hedge is not False:
         keys.add("ANTHROPIC_API_KEY")
     return keys
 
 
+def parse_role_models(entries: Iterable[str] | str | None) -> dict[str, str]:
+    """``ROLE=[PROVIDER:]MODEL`` entries (also comma-separated) as a role-to-model mapping."""
+    if isinstance(entries, str):
+        entries = [entries]
+    role_models = {}
+    for entry in entries or ():
+        for item in entry.split(","):
+            if not item.strip():
+                continue
+            role, sep, spec = item.partition("=")
+            if not sep or not role.strip() or not spec.strip():
+                raise ValueError(f"Expected ROLE=[PROVIDER:]MODEL, got '{item.strip()}'.")
+            role_models[role.strip()] = spec.strip()
+    return role_models
+
+
+def resolve_model_spec(spec: str, default_provider: str) -> tuple[str, str]:
+    """Split ``[PROVIDER:]MODEL``; without a known provider prefix, ``default_provider``."""
+    prefix, sep, model = spec.partition(":")
+    if sep and prefix.lower() in SUPPORTED_PROVIDERS:
+        return prefix.lower(), model
+    return default_provider, spec
+
+
+def resolve_data_dir(data_dir: str | Path | None) -> Path:
+    if data_dir:
+        data_dir_path = Path(data_dir).expanduser()
+    else:
+        data_dir_path = get_default_storage_dir()
+    data_dir_path.mkdir(parents=True, exist_ok=True)
+    return data_dir_path
+
+
 def prepare_runtime(
     *,
     part: str,
@@ -75,33 +93,85 @@ def prepare_runtime(
     thread_id: str | None,
     overwrite_db: bool,
     prompt_for_env: bool,
+    db_path: Path | None = None,
+    broaden_searches: bool = False,
+    hedge: bool | float = False,
+    intent_router: bool = False,
+    role_models: Mapping[str, str] | None = None,
 ):
+    from dotenv import load_dotenv
+
     load_dotenv()
     resolved_provider = resolve_provider(provider)
-    required_keys = required_keys_for(resolved_provider)
+    if role_models is None and part == "part4":
+        role_models = parse_role_models(os.environ.get(ROLE_MODELS_ENV_KEY))
+    role_specs = {}
+    if role_models:
+        if part != "part4":
+            raise ValueError("Per-role models are only supported by part4.")
+        from customer_support.graphs.part4 import resolve_role
+
+        role_specs = {
+            resolve_role(role): resolve_model_spec(spec, resolved_provider)
+            for role, spec in role_models.items()
+        }
+    required_keys = required_keys_for(resolved_provider, hedge=hedge)
+    for role_provider, _ in role_specs.values():
+        required_keys |= required_keys_for(role_provider, hedge=hedge)
     if prompt_for_env:
         ensure_env_vars(required_keys)
 
-    if data_dir:
-        data_dir_path = Path(data_dir).expanduser()
-    else:
-        data_dir_path = get_default_storage_dir()
-    data_dir_path.mkdir(parents=True, exist_ok=True)
-    db_path = prepare_database(target_dir=data_dir_path, overwrite=overwrite_db)
+    if db_path is None:
+        db_path = prepare_database(target_dir=resolve_data_dir(data_dir), overwrite=overwrite_db)
 
-    def create_llm():
-        if resolved_provider == "openai":
-            return ChatOpenAI(model=OPENAI_MODEL, temperature=1)
-        return ChatAnthropic(model=ANTHROPIC_MODEL, temperature=1)
+    def create_llm(llm_provider: str, model: str | None = None):
+        from customer_support.llm import create_chat_model, create_hedged_chat_model
 
-    builder = GRAPH_BUILDERS[part]
-    graph = builder(str(db_path), llm=create_llm())
+        models = {"anthropic": ANTHROPIC_MODEL, "openai": OPENAI_MODEL}
+        if model is not None:
+            models[llm_provider] = model
+        if hedge is not False:
+            return create_hedged_chat_model(
+                llm_provider,
+                models,
+                hedge_after=None if hedge is True else float(hedge),
+            )
+        return create_chat_model(llm_provider, models[llm_provider])
+
+    builder = get_graph_builder(part)
+    builder_kwargs = {}
+    if part == "part4":
+        builder_kwargs["intent_router"] = intent_router
+        builder_kwargs["prompt_cache"] = resolved_provider == "anthropic"
+        if role_specs:
+            from customer_support.graphs.part4 import ASSISTANT_ROLES
+
+            # Cache breakpoints only go to the roles whose model is Anthropic's.
+            builder_kwargs["prompt_cache"] = {
+                role
+                for role in ASSISTANT_ROLES
+                if role_specs.get(role, (resolved_provider,))[0] == "anthropic"
+            }
+            builder_kwargs["role_llms"] = {
+                role: create_llm(role_provider, model)
+                for role, (role_provider, model) in role_specs.items()
+            }
+    graph = builder(str(db_path), llm=create_llm(resolved_provider), **builder_kwargs)
+
+    from customer_support.tools.broaden import BROADEN_CONFIG_KEY
+    from customer_support.tools.resolver import get_resolver
+    from customer_support.tools.routes import get_route_index
+
+    # Build the connecting-flight index and location resolver now instead of on first use.
+    get_route_index()
+    get_resolver()
 
     runtime_thread = thread_id or str(uuid.uuid4())
     config = {
         "configurable": {
             "passenger_id": passenger_id,
             "thread_id": runtime_thread,
+            BROADEN_CONFIG_KEY: broaden_searches,
         }
     }
     return graph, config, resolved_provider
@@ -113,7 +183,7 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
     )
     parser.add_argument(
         "--part",
-        choices=GRAPH_BUILDERS.keys(),
+        choices=PART_MODULES.keys(),
         default="part4",
         help="Which tutorial graph to run.",
     )
@@ -151,6 +221,35 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         type=Path,
         help="Optional path to a text file containing questions, one per line, for demo mode.",
     )
+    parser.add_argument(
+        "--auto-approve",
+        action="store_true",
+        help="Approve sensitive tool calls without prompting.",
+    )
+    parser.add_argument(
+        "--broaden-searches",
+        action="store_true",
+        help="Let search tools relax their filters themselves when nothing matches.",
+    )
+    parser.add_argument(
+        "--intent-router",
+        action="store_true",
+        help="Part 4: route clear booking requests to their assistant without an LLM call.",
+    )
+    parser.add_argument(
+        "--role-model",
+        action="append",
+        metavar="ROLE=[PROVIDER:]MODEL",
+        help=(
+            "Part 4: model for one assistant role (primary, flight, car_rental, hotel, "
+            f"excursion); repeatable. Defaults to ${ROLE_MODELS_ENV_KEY}."
+        ),
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Suppress event printing (useful for benchmark runs).",
+    )
     parser.add_argument(
         "--skip-env",
         action="store_true",
@@ -161,6 +260,11 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         choices=["anthropic", "openai"],
         help="LLM provider to use for chat completions (defaults to anthropic or .env override).",
     )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Also send slow or failed LLM calls to the other provider and use the first answer.",
+    )
     return parser.parse_args(argv)
 
 
@@ -263,7 +367,15 @@ def _extract_assistant_text(result: Any) -> str:
     return _render_message_content(message)
 
 
-@fluxloop.agent(name="customer_support_session")
+def _prefetch_delta(before: dict[str, Any], after: dict[str, Any]) -> dict[str, Any]:
+    delta = {key: round(after[key] - before[key], 1) for key in ("launched", "hits", "misses")}
+    delta["saved_ms"] = round(after["saved_ms"] - before["saved_ms"], 1)
+    claimed = delta["hits"] + delta["misses"]
+    delta["hit_rate"] = round(delta["hits"] / claimed, 3) if claimed else None
+    return delta
+
+
+@lazy_agent(name="customer_support_session")
 def run_customer_support_session(
     prompts: Iterable[str] | None = None,
     *,
@@ -274,9 +386,53 @@ def run_customer_support_session(
     data_dir: str | None = None,
     overwrite_db: bool = False,
     prompt_for_env: bool = False,
+    isolated_db: bool = True,
+    broaden_searches: bool = False,
+    approval_policy: Any = None,
+    auto_approve: bool | None = None,
+    max_turns: int | None = None,
+    max_steps: int | None = None,
+    timeout_seconds: float | None = None,
+    deadline: Any = None,
+    hedge: bool | float = False,
+    intent_router: bool = False,
+    role_models: Mapping[str, str] | None = None,
 ) -> dict[str, Any]:
+    """Run ``prompts`` as consecutive user turns and return the transcript.
+
+    Interrupts before sensitive tools are resolved in-process by ``approval_policy`` (see
+    ``utils.approval.resolve_policy``); ``auto_approve`` is the simulation.yaml shortcut for
+    approving (``True``) or denying (``False``) everything. Without either, a turn that hits an
+    interrupt ends there.
+
+    ``max_turns`` caps the user turns, ``max_steps`` the graph steps per turn, and
+    ``timeout_seconds`` (or a ``deadline.Deadline``, which callers may also ``cancel()``)
+    the whole session. Hitting any of them ends the session early; the result then carries
+    the transcript so far and ``stopped`` names the budget that ran out, or
+    ``"max_approval_rounds"`` when the approval policy kept running into interrupts.
+
+    ``hedge=True`` races the other provider against LLM calls slower than the provider's p95
+    latency (or failing); a number fixes the hedge delay in seconds instead. ``intent_router``
+    lets part 4 send unambiguous booking requests straight to their specialised assistant.
+    ``role_models`` maps part 4 assistant roles to ``[provider:]model`` specs (see
+    ``parse_role_models``); each turn's ``roles`` and the session's ``roles`` and
+    ``role_latency`` then report tokens and LLM latency per assistant.
+    """
     logger.debug("run_session prompts type=%s value=%r", type(prompts), prompts)
     try:
+        from customer_support.deadline import (
+            DEADLINE_CONFIG_KEY,
+            Deadline,
+            DeadlineExceeded,
+            use_deadline,
+        )
+
+        # Started before setup, so database and model preparation count against the budget.
+        if deadline is None and timeout_seconds is not None:
+            deadline = Deadline(timeout_seconds)
+        snapshot = None
+        if isolated_db:
+            snapshot = get_snapshot(target_dir=resolve_data_dir(data_dir), overwrite=overwrite_db)
         graph, config, resolved_provider = prepare_runtime(
             part=part,
             provider=provider,
@@ -285,19 +441,99 @@ def run_customer_support_session(
             thread_id=thread_id,
             overwrite_db=overwrite_db,
             prompt_for_env=prompt_for_env,
+            db_path=snapshot.source_path if snapshot else None,
+            broaden_searches=broaden_searches,
+            hedge=hedge,
+            intent_router=intent_router,
+            role_models=role_models,
         )
+        from langgraph.errors import GraphRecursionError
+
+        from customer_support.tools.prefetch import PREFETCH_STATS
+        from customer_support.utils.approval import (
+            ApprovalRoundsExceeded,
+            resolve_policy,
+            run_with_approvals,
+        )
+        from customer_support.utils.http import CONNECTION_STATS, stats_delta
+        from customer_support.utils.latency import LLM_LATENCY, ROLE_LATENCY
+
+        http_before = CONNECTION_STATS.snapshot()
+        prefetch_before = PREFETCH_STATS.snapshot()
+        llm_latency_before = LLM_LATENCY.counts()
+        role_latency_before = ROLE_LATENCY.counts()
+        policy = resolve_policy(approval_policy if approval_policy is not None else auto_approve)
         questions = _normalize_prompts(prompts)
         logger.debug("normalized questions (%d): %s", len(questions), questions)
+        stopped = None
+        if max_turns is not None and len(questions) > max_turns:
+            questions = questions[:max_turns]
+            stopped = "max_turns"
+        if max_steps is not None:
+            config["recursion_limit"] = max_steps
         transcript = []
-        for text in questions:
-            turn = {"user": text}
-            result = graph.invoke({"messages": ("user", text)}, config)
-            turn["assistant"] = _extract_assistant_text(result)
-            transcript.append(turn)
+        session_messages = []
+        seen_messages = 0
+        with ExitStack() as stack:
+            db_reset_ms = None
+            if snapshot is not None:
+                from customer_support.tools import use_database
+
+                session_db = stack.enter_context(snapshot.session())
+                stack.enter_context(use_database(session_db.path))
+                db_reset_ms = session_db.restore_ms
+            if deadline is not None:
+                config["configurable"][DEADLINE_CONFIG_KEY] = deadline
+                stack.enter_context(use_deadline(deadline))
+            for text in questions:
+                if deadline is not None and deadline.expired():
+                    stopped = "cancelled" if deadline.cancelled else "deadline"
+                    break
+                turn = {"user": text}
+                interrupted = None
+                try:
+                    result = graph.invoke({"messages": ("user", text)}, config)
+                    if policy is not None:
+                        turn["approvals"] = run_with_approvals(graph, config, policy)
+                        if turn["approvals"]:
+                            result = graph.get_state(config).values
+                except DeadlineExceeded:
+                    interrupted = "cancelled" if deadline.cancelled else "deadline"
+                except ApprovalRoundsExceeded as exc:
+                    turn["approvals"] = exc.records
+                    interrupted = "max_approval_rounds"
+                except GraphRecursionError:
+                    interrupted = "max_steps"
+                if interrupted is not None:
+                    logger.warning(
+                        "Session stopped early (%s) on turn %d", interrupted, len(transcript) + 1
+                    )
+                    result = graph.get_state(config).values
+                    turn["stopped"] = stopped = interrupted
+                turn["assistant"] = _extract_assistant_text(result)
+                messages = result.get("messages", []) if isinstance(result, dict) else []
+                if interrupted is not None and messages and messages[-1].type != "ai":
+                    turn["assistant"] = ""
+                turn_messages = messages[seen_messages:]
+                turn["usage"] = summarize_usage(turn_messages)
+                turn["roles"] = summarize_usage_by_role(turn_messages)
+                session_messages.extend(turn_messages)
+                seen_messages = len(messages)
+                transcript.append(turn)
+                if interrupted is not None:
+                    # The thread may end on unanswered tool calls, so it cannot take more turns.
+                    break
         return {
             "transcript": transcript,
             "thread_id": config["configurable"]["thread_id"],
             "provider": resolved_provider,
+            "db_reset_ms": db_reset_ms,
+            "stopped": stopped,
+            "http_connections": stats_delta(http_before, CONNECTION_STATS.snapshot()),
+            "llm_latency": LLM_LATENCY.snapshot(since=llm_latency_before),
+            "roles": summarize_usage_by_role(session_messages),
+            "role_latency": ROLE_LATENCY.snapshot(since=role_latency_before),
+            "prefetch": _prefetch_delta(prefetch_before, PREFETCH_STATS.snapshot()),
         }
     except Exception:
         logger.exception("run_customer_support_session failure")
@@ -307,6 +543,10 @@ def run_customer_support_session(
 def main(argv: Sequence[str] | None = None) -> int:
     args = parse_args(argv or sys.argv[1:])
 
+    from customer_support.utils.approval import ApproveAll
+    from customer_support.utils.console import interactive_turn, run_dialog
+    from customer_support.utils.langgraph import RecentlyPrinted
+
     graph, config, _ = prepare_runtime(
         part=args.part,
         provider=args.provider,
@@ -315,18 +555,23 @@ def main(argv: Sequence[str] | None = None) -> int:
         thread_id=args.thread_id,
         overwrite_db=args.overwrite_db,
         prompt_for_env=not args.skip_env,
+        broaden_searches=args.broaden_searches,
+        hedge=args.hedge,
+        intent_router=args.intent_router,
+        role_models=parse_role_models(args.role_model) if args.role_model else None,
     )
+    policy = ApproveAll() if args.auto_approve else None
 
     if args.demo:
         questions = load_questions(args.questions_file)
-        run_dialog(graph, questions, config)
+        run_dialog(graph, questions, config, quiet=args.quiet, policy=policy)
         return 0
 
     print(
         "Interactive mode. Type your question and press enter. "
         "Submit an empty line (or Ctrl-D) to exit."
     )
-    printed_set = set()
+    printed_set = RecentlyPrinted()
     while True:
         try:
             text = input("You: ").strip()
@@ -340,6 +585,8 @@ def main(argv: Sequence[str] | None = None) -> int:
             {"messages": ("user", text)},
             config,
             printed_set,
+            quiet=args.quiet,
+            policy=policy,
         )
     print("Goodbye!")
     return 0
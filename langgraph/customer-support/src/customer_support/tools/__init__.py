@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from .base import set_db_path
+from .base import set_db_path, use_database
 from .cars import (
     book_car_rental,
     cancel_car_rental,
@@ -20,13 +20,22 @@ from .flights import (
     update_ticket_to_new_flight,
 )
 from .hotels import book_hotel, cancel_hotel, search_hotels, update_hotel
+from .plan import make_write_plan_tool
 from .policies import lookup_policy
+from .resolver import resolve_location
+from .routes import search_connecting_flights
+from .web_search import get_web_search_tool
 
 __all__ = [
     "set_db_path",
+    "use_database",
+    "get_web_search_tool",
+    "make_write_plan_tool",
     "lookup_policy",
+    "resolve_location",
     "fetch_user_flight_information",
     "search_flights",
+    "search_connecting_flights",
     "update_ticket_to_new_flight",
     "cancel_ticket",
     "search_car_rentals",
@@ -1,15 +1,52 @@
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, time, timezone, tzinfo
 from pathlib import Path
-from typing import List, Sequence
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+from customer_support.deadline import SQLITE_PROGRESS_STEPS, current_deadline
 
 _DB_PATH: Path | None = None
+_DB_IMMUTABLE = False
+# Per-session override (e.g. an isolated copy of the snapshot); wins over ``_DB_PATH``.
+_SESSION_DB: ContextVar[str | None] = ContextVar("customer_support_session_db", default=None)
+
+READ_CACHE_KIB = 64 * 1024
+READ_MMAP_BYTES = 256 * 1024 * 1024
+BUSY_TIMEOUT_SECONDS = 5.0
+
+# Read-only file connections are kept per thread so their page cache survives between calls.
+_readers = threading.local()
+
+
+class _ClosingConnection(sqlite3.Connection):
+    """Connection whose ``with`` block closes it after committing or rolling back."""
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self.close()
+
 
+def set_db_path(path: Path | str, *, immutable: bool = False) -> None:
+    """Point the tools at ``path``.
 
-def set_db_path(path: Path | str) -> None:
-    global _DB_PATH
+    ``immutable`` promises that nothing writes the file while it is in use, which lets read
+    connections skip locking entirely (``immutable=1``).
+    """
+    global _DB_PATH, _DB_IMMUTABLE
     _DB_PATH = Path(path)
+    _DB_IMMUTABLE = immutable
+    if _DB_PATH.exists() and not immutable:
+        # WAL lets search tools keep reading while a booking commits.
+        with closing(sqlite3.connect(_DB_PATH)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
 
 
 def get_db_path() -> Path:
@@ -18,11 +55,127 @@ def get_db_path() -> Path:
     return _DB_PATH
 
 
-def connect() -> sqlite3.Connection:
-    return sqlite3.connect(get_db_path())
+@contextmanager
+def use_database(target: Path | str) -> Iterator[None]:
+    """Route tool connections in the current context to ``target`` (a path or ``file:`` URI)."""
+    token = _SESSION_DB.set(str(target))
+    try:
+        yield
+    finally:
+        _SESSION_DB.reset(token)
+        # The writer's connection would otherwise keep a finished session's database open.
+        from .writer import close_writer
+
+        close_writer(str(target))
+
+
+def current_target() -> str:
+    session_db = _SESSION_DB.get()
+    if session_db is not None:
+        return session_db
+    return str(get_db_path())
+
+
+def connect_writer() -> sqlite3.Connection:
+    """Open a standalone read-write connection; the booking tools go through ``writer``."""
+    target = current_target()
+    return sqlite3.connect(
+        target, uri=target.startswith("file:"), timeout=BUSY_TIMEOUT_SECONDS
+    )
+
+
+# Kept for callers that predate the reader/writer split.
+connect = connect_writer
+
+
+def connect_readonly() -> sqlite3.Connection:
+    """Return a query-only connection for the search and fetch tools; use it in ``with``.
+
+    The shared database file is opened with ``mode=ro`` (or ``immutable=1``) and reused per
+    thread with a large page cache and mmap. Session databases (``use_database``) get a fresh
+    connection each call that its ``with`` block closes, so no thread keeps a finished
+    session's file open.
+    """
+    target = current_target()
+    if _SESSION_DB.get() is not None or target.startswith("file:"):
+        if not target.startswith("file:"):
+            target = f"{Path(target).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(
+            target, uri=True, timeout=BUSY_TIMEOUT_SECONDS, factory=_ClosingConnection
+        )
+        conn.execute("PRAGMA query_only=1")
+        return _with_deadline(conn)
+
+    connections: Dict[str, Tuple[sqlite3.Connection, tuple]] = (
+        getattr(_readers, "connections", None) or {}
+    )
+    _readers.connections = connections
+    flag = "immutable=1" if _DB_IMMUTABLE and _SESSION_DB.get() is None else "mode=ro"
+    stat = os.stat(target)
+    # A replaced file (``os.replace`` on re-download) or a changed flag needs a new connection;
+    # the cached one would keep reading the old inode.
+    identity = (stat.st_dev, stat.st_ino, flag)
+    cached = connections.get(target)
+    if cached is not None and cached[1] == identity:
+        return _with_deadline(cached[0])
+    if cached is not None:
+        cached[0].close()
+    uri = f"{Path(target).resolve().as_uri()}?{flag}"
+    conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT_SECONDS)
+    conn.execute(f"PRAGMA cache_size=-{READ_CACHE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={READ_MMAP_BYTES}")
+    conn.execute("PRAGMA query_only=1")
+    connections[target] = (conn, identity)
+    return _with_deadline(conn)
+
+
+def _with_deadline(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Abort queries on ``conn`` once the current session deadline passes (or clear that)."""
+    deadline = current_deadline()
+    conn.set_progress_handler(
+        deadline.sqlite_progress if deadline is not None else None, SQLITE_PROGRESS_STEPS
+    )
+    return conn
+
+
+def flight_time_zone(conn: sqlite3.Connection) -> tzinfo:
+    """The UTC offset the flight timestamps are stored in (UTC if they carry none)."""
+    row = conn.execute(
+        "SELECT scheduled_departure FROM flights WHERE scheduled_departure IS NOT NULL LIMIT 1"
+    ).fetchone()
+    try:
+        return datetime.fromisoformat(row[0]).tzinfo or timezone.utc
+    except (TypeError, ValueError):
+        return timezone.utc
+
+
+def to_epoch(
+    value: Union[date, datetime, str], *, end_of_day: bool = False, tz: tzinfo = timezone.utc
+) -> int:
+    """Convert a tool argument to epoch seconds for the ``*_ts`` columns.
+
+    Naive values are wall-clock times in ``tz``: pass ``flight_time_zone`` for flight bounds,
+    so they mean what the listed departure times say. A bare date means the start of that day, or its last
+    second when ``end_of_day`` is set so that upper bounds include the whole day. Tool
+    argument parsing turns "2024-05-01" into a naive midnight datetime, which is treated as
+    a bare date for the same reason.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if (
+        end_of_day
+        and isinstance(value, datetime)
+        and value.tzinfo is None
+        and value.time() == time.min
+    ):
+        value = value.date()
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.max if end_of_day else time.min)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return int(value.timestamp())
 
 
 def rows_to_dicts(cursor: sqlite3.Cursor, rows: Sequence[sqlite3.Row]) -> List[dict]:
     column_names = [column[0] for column in cursor.description]
     return [dict(zip(column_names, row)) for row in rows]
-
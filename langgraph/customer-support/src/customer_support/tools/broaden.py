@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from langchain_core.runnables import RunnableConfig
+
+# ``configurable`` key that opts a run into server-side broadening of empty searches.
+BROADEN_CONFIG_KEY = "broaden_searches"
+DAY_SECONDS = 24 * 3600
+MIN_TERM_LENGTH = 3
+
+Criteria = Dict[str, Any]
+SearchResult = Union[List[dict], Dict[str, Any]]
+
+
+class Relaxation(NamedTuple):
+    """One broadening step: ``apply`` returns the relaxed criteria, or None if it does not apply."""
+
+    label: str
+    apply: Callable[[Criteria], Optional[Criteria]]
+
+
+def broadening_enabled(config: Optional[RunnableConfig]) -> bool:
+    return bool((config or {}).get("configurable", {}).get(BROADEN_CONFIG_KEY))
+
+
+def search_with_broadening(
+    search: Callable[[Criteria], List[dict]],
+    criteria: Criteria,
+    relaxations: Sequence[Relaxation],
+    config: Optional[RunnableConfig],
+) -> SearchResult:
+    """Run ``search`` and, if broadening is enabled and nothing matched, relax step by step.
+
+    Relaxations accumulate in order until a search returns rows. Broadened responses are
+    wrapped as ``{"relaxations_applied": [...], "results": [...]}`` so the model can tell the
+    user what changed instead of searching again itself.
+    """
+    results = search(criteria)
+    if results or not broadening_enabled(config):
+        return results
+    applied: List[str] = []
+    for relaxation in relaxations:
+        relaxed = relaxation.apply(criteria)
+        if relaxed is None or relaxed == criteria:
+            continue
+        criteria = relaxed
+        applied.append(relaxation.label)
+        results = search(criteria)
+        if results:
+            break
+    if not applied:
+        return results
+    return {"relaxations_applied": applied, "results": results}
+
+
+def widen_dates(days: int) -> Relaxation:
+    def apply(criteria: Criteria) -> Optional[Criteria]:
+        if criteria.get("start_ts") is None and criteria.get("end_ts") is None:
+            return None
+        return {**criteria, "slack_days": days}
+
+    unit = "day" if days == 1 else "days"
+    return Relaxation(f"widened the date window by {days} {unit} on each side", apply)
+
+
+def drop(key: str, label: str) -> Relaxation:
+    def apply(criteria: Criteria) -> Optional[Criteria]:
+        if not criteria.get(key):
+            return None
+        return {**criteria, key: None}
+
+    return Relaxation(label, apply)
+
+
+def match_any_term(key: str, label: str) -> Relaxation:
+    """Match any word of a multi-word value (e.g. "Basel, Switzerland") instead of all of it."""
+
+    def apply(criteria: Criteria) -> Optional[Criteria]:
+        value = criteria.get(key)
+        if not isinstance(value, str):
+            return None
+        terms = tuple(
+            term for term in re.split(r"[^\w]+", value) if len(term) >= MIN_TERM_LENGTH
+        )
+        if not terms or terms == (value,):
+            return None
+        return {**criteria, key: terms}
+
+    return Relaxation(label, apply)
+
+
+def like_clause(column: str, value: Union[str, Tuple[str, ...]]) -> Tuple[str, List[str]]:
+    """``column LIKE`` the value, or any of the terms when a relaxation split it."""
+    terms = (value,) if isinstance(value, str) else value
+    sql = " OR ".join(f"{column} LIKE ?" for _ in terms)
+    return f" AND ({sql})", [f"%{term}%" for term in terms]
+
+
+def slack_seconds(criteria: Criteria) -> int:
+    return criteria.get("slack_days", 0) * DAY_SECONDS
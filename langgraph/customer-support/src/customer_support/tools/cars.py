@@ -4,9 +4,63 @@ from datetime import date, datetime
 from typing import Optional, Union
 
 import fluxloop
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
-from .base import connect, rows_to_dicts
+from .base import connect_readonly, rows_to_dicts, to_epoch
+from .broaden import (
+    Criteria,
+    drop,
+    like_clause,
+    match_any_term,
+    search_with_broadening,
+    slack_seconds,
+    widen_dates,
+)
+from .resolver import resolve_location_name
+from .writer import WriteRejected, execute_write, write_tool
+
+
+# Stored columns only; the generated ``*_ts`` columns are for filtering, not for the LLM.
+CAR_RENTAL_COLUMNS = "id, name, location, price_tier, start_date, end_date, booked"
+_CAR_RENTAL_RELAXATIONS = (
+    widen_dates(1),
+    widen_dates(3),
+    drop("price_tier", "dropped the price tier"),
+    match_any_term("name", "matched any word of the name"),
+    drop("name", "dropped the name"),
+    match_any_term("location", "matched any word of the location"),
+)
+
+
+def _search_car_rentals(criteria: Criteria) -> list[dict]:
+    query = f"SELECT {CAR_RENTAL_COLUMNS} FROM car_rentals WHERE 1=1"
+    params: list = []
+    slack = slack_seconds(criteria)
+
+    if criteria["location"]:
+        clause, terms = like_clause("location", criteria["location"])
+        query += clause
+        params.extend(terms)
+    if criteria["name"]:
+        clause, terms = like_clause("name", criteria["name"])
+        query += clause
+        params.extend(terms)
+    if criteria["price_tier"]:
+        query += " AND price_tier = ?"
+        params.append(criteria["price_tier"])
+    if criteria["start_ts"] is not None:
+        query += " AND (start_date_ts IS NULL OR start_date_ts >= ?)"
+        params.append(criteria["start_ts"] - slack)
+    if criteria["end_ts"] is not None:
+        query += " AND (end_date_ts IS NULL OR end_date_ts <= ?)"
+        params.append(criteria["end_ts"] + slack)
+
+    with connect_readonly() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        return rows_to_dicts(cursor, rows)
 
 
 @tool
@@ -17,47 +71,36 @@ def search_car_rentals(
     price_tier: Optional[str] = None,
     start_date: Optional[Union[datetime, date]] = None,
     end_date: Optional[Union[datetime, date]] = None,
-) -> list[dict]:
+    *,
+    config: RunnableConfig,
+) -> Union[list[dict], dict]:
     """Search for car rentals based on location, name, and price tier."""
-    query = "SELECT * FROM car_rentals WHERE 1=1"
-    params: list = []
-
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    if name:
-        query += " AND name LIKE ?"
-        params.append(f"%{name}%")
-    if price_tier:
-        query += " AND price_tier = ?"
-        params.append(price_tier)
-    if start_date:
-        query += " AND (start_date IS NULL OR start_date >= ?)"
-        params.append(start_date)
-    if end_date:
-        query += " AND (end_date IS NULL OR end_date <= ?)"
-        params.append(end_date)
-
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        return rows_to_dicts(cursor, rows)
+    criteria = {
+        "location": resolve_location_name(location),
+        "name": name,
+        "price_tier": price_tier,
+        "start_ts": to_epoch(start_date) if start_date else None,
+        "end_ts": to_epoch(end_date, end_of_day=True) if end_date else None,
+    }
+    return search_with_broadening(
+        _search_car_rentals, criteria, _CAR_RENTAL_RELAXATIONS, config
+    )
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="book_car_rental")
 def book_car_rental(rental_id: int) -> str:
     """Book a car rental by its ID."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute("UPDATE car_rentals SET booked = 1 WHERE id = ?", (rental_id,))
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Car rental {rental_id} successfully booked."
-        return f"No car rental found with ID {rental_id}."
+    rowcount = execute_write(
+        ("UPDATE car_rentals SET booked = 1 WHERE id = ?", (rental_id,)),
+    )
+    if rowcount > 0:
+        return f"Car rental {rental_id} successfully booked."
+    raise WriteRejected(f"No car rental found with ID {rental_id}.")
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="update_car_rental")
 def update_car_rental(
@@ -66,33 +109,30 @@ def update_car_rental(
     end_date: Optional[Union[datetime, date]] = None,
 ) -> str:
     """Update a car rental's start and end dates."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        if start_date:
-            cursor.execute(
-                "UPDATE car_rentals SET start_date = ? WHERE id = ?",
-                (start_date, rental_id),
-            )
-        if end_date:
-            cursor.execute(
-                "UPDATE car_rentals SET end_date = ? WHERE id = ?",
-                (end_date, rental_id),
-            )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Car rental {rental_id} successfully updated."
-        return f"No car rental found with ID {rental_id}."
+    statements = []
+    if start_date:
+        statements.append(
+            ("UPDATE car_rentals SET start_date = ? WHERE id = ?", (start_date, rental_id))
+        )
+    if end_date:
+        statements.append(
+            ("UPDATE car_rentals SET end_date = ? WHERE id = ?", (end_date, rental_id))
+        )
+    rowcount = execute_write(*statements)
+    if rowcount > 0:
+        return f"Car rental {rental_id} successfully updated."
+    raise WriteRejected(f"No car rental found with ID {rental_id}.")
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="cancel_car_rental")
 def cancel_car_rental(rental_id: int) -> str:
     """Cancel a car rental by its ID."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute("UPDATE car_rentals SET booked = 0 WHERE id = ?", (rental_id,))
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Car rental {rental_id} successfully cancelled."
-        return f"No car rental found with ID {rental_id}."
+    rowcount = execute_write(
+        ("UPDATE car_rentals SET booked = 0 WHERE id = ?", (rental_id,)),
+    )
+    if rowcount > 0:
+        return f"Car rental {rental_id} successfully cancelled."
+    raise WriteRejected(f"No car rental found with ID {rental_id}.")
 
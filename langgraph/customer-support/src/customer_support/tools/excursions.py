@@ -1,87 +1,111 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Union
 
 import fluxloop
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
-from .base import connect, rows_to_dicts
+from .base import connect_readonly, rows_to_dicts
+from .broaden import (
+    Criteria,
+    drop,
+    like_clause,
+    match_any_term,
+    search_with_broadening,
+)
+from .resolver import resolve_location_name
+from .writer import WriteRejected, execute_write, write_tool
 
 
-@tool
-@fluxloop.trace(name="search_trip_recommendations")
-def search_trip_recommendations(
-    location: Optional[str] = None,
-    name: Optional[str] = None,
-    keywords: Optional[str] = None,
-) -> list[dict]:
-    """Search for trip recommendations based on location, name, and keywords."""
-    query = "SELECT * FROM trip_recommendations WHERE 1=1"
+EXCURSION_COLUMNS = "id, name, location, keywords, details, booked"
+_EXCURSION_RELAXATIONS = (
+    match_any_term("name", "matched any word of the name"),
+    drop("name", "dropped the name"),
+    match_any_term("location", "matched any word of the location"),
+    drop("keywords", "dropped the keywords"),
+)
+
+
+def _search_trip_recommendations(criteria: Criteria) -> list[dict]:
+    query = f"SELECT {EXCURSION_COLUMNS} FROM trip_recommendations WHERE 1=1"
     params: list = []
 
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    if name:
-        query += " AND name LIKE ?"
-        params.append(f"%{name}%")
-    if keywords:
-        keyword_list = [keyword.strip() for keyword in keywords.split(",")]
+    if criteria["location"]:
+        clause, terms = like_clause("location", criteria["location"])
+        query += clause
+        params.extend(terms)
+    if criteria["name"]:
+        clause, terms = like_clause("name", criteria["name"])
+        query += clause
+        params.extend(terms)
+    if criteria["keywords"]:
+        keyword_list = [keyword.strip() for keyword in criteria["keywords"].split(",")]
         keyword_conditions = " OR ".join(["keywords LIKE ?" for _ in keyword_list])
         query += f" AND ({keyword_conditions})"
         params.extend([f"%{keyword}%" for keyword in keyword_list])
 
-    with connect() as conn:
+    with connect_readonly() as conn:
         cursor = conn.cursor()
         cursor.execute(query, params)
         rows = cursor.fetchall()
         return rows_to_dicts(cursor, rows)
 
 
+@tool
+@fluxloop.trace(name="search_trip_recommendations")
+def search_trip_recommendations(
+    location: Optional[str] = None,
+    name: Optional[str] = None,
+    keywords: Optional[str] = None,
+    *,
+    config: RunnableConfig,
+) -> Union[list[dict], dict]:
+    """Search for trip recommendations based on location, name, and keywords."""
+    criteria = {"location": resolve_location_name(location), "name": name, "keywords": keywords}
+    return search_with_broadening(
+        _search_trip_recommendations, criteria, _EXCURSION_RELAXATIONS, config
+    )
+
+
+@write_tool
 @tool
 @fluxloop.trace(name="book_excursion")
 def book_excursion(recommendation_id: int) -> str:
     """Book an excursion by its recommendation ID."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE trip_recommendations SET booked = 1 WHERE id = ?",
-            (recommendation_id,),
-        )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Trip recommendation {recommendation_id} successfully booked."
-        return f"No trip recommendation found with ID {recommendation_id}."
+    rowcount = execute_write(
+        ("UPDATE trip_recommendations SET booked = 1 WHERE id = ?", (recommendation_id,)),
+    )
+    if rowcount > 0:
+        return f"Trip recommendation {recommendation_id} successfully booked."
+    raise WriteRejected(f"No trip recommendation found with ID {recommendation_id}.")
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="update_excursion")
 def update_excursion(recommendation_id: int, details: str) -> str:
     """Update a trip recommendation's details by its ID."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
+    rowcount = execute_write(
+        (
             "UPDATE trip_recommendations SET details = ? WHERE id = ?",
             (details, recommendation_id),
-        )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Trip recommendation {recommendation_id} successfully updated."
-        return f"No trip recommendation found with ID {recommendation_id}."
+        ),
+    )
+    if rowcount > 0:
+        return f"Trip recommendation {recommendation_id} successfully updated."
+    raise WriteRejected(f"No trip recommendation found with ID {recommendation_id}.")
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="cancel_excursion")
 def cancel_excursion(recommendation_id: int) -> str:
     """Cancel a trip recommendation by its ID."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE trip_recommendations SET booked = 0 WHERE id = ?",
-            (recommendation_id,),
-        )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Trip recommendation {recommendation_id} successfully cancelled."
-        return f"No trip recommendation found with ID {recommendation_id}."
+    rowcount = execute_write(
+        ("UPDATE trip_recommendations SET booked = 0 WHERE id = ?", (recommendation_id,)),
+    )
+    if rowcount > 0:
+        return f"Trip recommendation {recommendation_id} successfully cancelled."
+    raise WriteRejected(f"No trip recommendation found with ID {recommendation_id}.")
 
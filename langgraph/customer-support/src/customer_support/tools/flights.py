@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import sqlite3
+import time
 from datetime import date, datetime
 from typing import Optional, Union
 
 import fluxloop
-import pytz
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
-from .base import connect, rows_to_dicts
+from .base import connect_readonly, flight_time_zone, rows_to_dicts, to_epoch
+from .broaden import Criteria, search_with_broadening, slack_seconds, widen_dates
+from .resolver import resolve_airport
+from .writer import WriteRejected, run_write, write_tool
 
 
 @tool
@@ -20,66 +24,127 @@ def fetch_user_flight_information(config: RunnableConfig) -> list[dict]:
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
 
+    # ``passenger_itinerary`` is the tickets/flights/boarding-passes join, materialised and kept
+    # current by triggers when the database is prepared.
     query = """
-    SELECT 
-        t.ticket_no, t.book_ref,
-        f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
-        bp.seat_no, tf.fare_conditions
-    FROM 
-        tickets t
-        JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
-        JOIN flights f ON tf.flight_id = f.flight_id
-        JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
-    WHERE 
-        t.passenger_id = ?
+    SELECT
+        ticket_no, book_ref,
+        flight_id, flight_no, departure_airport, arrival_airport, scheduled_departure, scheduled_arrival,
+        seat_no, fare_conditions
+    FROM passenger_itinerary
+    WHERE passenger_id = ?
     """
 
-    with connect() as conn:
+    with connect_readonly() as conn:
         cursor = conn.cursor()
         cursor.execute(query, (passenger_id,))
         rows = cursor.fetchall()
         return rows_to_dicts(cursor, rows)
 
 
-@tool
-@fluxloop.trace(name="search_flights")
-def search_flights(
-    departure_airport: Optional[str] = None,
-    arrival_airport: Optional[str] = None,
-    start_time: Optional[Union[date, datetime]] = None,
-    end_time: Optional[Union[date, datetime]] = None,
-    limit: int = 20,
-) -> list[dict]:
-    """Search for flights based on departure airport, arrival airport, and departure time range."""
-    query = "SELECT * FROM flights WHERE 1 = 1"
+# Stored columns only; the generated ``*_ts`` columns are for filtering, not for the LLM.
+FLIGHT_COLUMNS = (
+    "flight_id, flight_no, scheduled_departure, scheduled_arrival, departure_airport, "
+    "arrival_airport, status, aircraft_code, actual_departure, actual_arrival"
+)
+_FLIGHT_RELAXATIONS = (widen_dates(1), widen_dates(3))
+
+
+def _search_flights(criteria: Criteria) -> list[dict]:
+    query = f"SELECT {FLIGHT_COLUMNS} FROM flights WHERE 1 = 1"
     params: list = []
+    slack = slack_seconds(criteria)
 
-    if departure_airport:
+    if criteria["departure_airport"]:
         query += " AND departure_airport = ?"
-        params.append(departure_airport)
+        params.append(criteria["departure_airport"])
 
-    if arrival_airport:
+    if criteria["arrival_airport"]:
         query += " AND arrival_airport = ?"
-        params.append(arrival_airport)
+        params.append(criteria["arrival_airport"])
 
-    if start_time:
-        query += " AND scheduled_departure >= ?"
-        params.append(start_time)
+    if criteria["start_ts"] is not None:
+        query += " AND scheduled_departure_ts >= ?"
+        params.append(criteria["start_ts"] - slack)
 
-    if end_time:
-        query += " AND scheduled_departure <= ?"
-        params.append(end_time)
+    if criteria["end_ts"] is not None:
+        query += " AND scheduled_departure_ts <= ?"
+        params.append(criteria["end_ts"] + slack)
 
     query += " LIMIT ?"
-    params.append(limit)
+    params.append(criteria["limit"])
 
-    with connect() as conn:
+    with connect_readonly() as conn:
         cursor = conn.cursor()
         cursor.execute(query, params)
         rows = cursor.fetchall()
         return rows_to_dicts(cursor, rows)
 
 
+@tool
+@fluxloop.trace(name="search_flights")
+def search_flights(
+    departure_airport: Optional[str] = None,
+    arrival_airport: Optional[str] = None,
+    start_time: Optional[Union[date, datetime]] = None,
+    end_time: Optional[Union[date, datetime]] = None,
+    limit: int = 20,
+    *,
+    config: RunnableConfig,
+) -> Union[list[dict], dict]:
+    """Search for flights based on departure airport, arrival airport, and departure time range."""
+    with connect_readonly() as conn:
+        tz = flight_time_zone(conn)
+    criteria = {
+        "departure_airport": resolve_airport(departure_airport),
+        "arrival_airport": resolve_airport(arrival_airport),
+        "start_ts": to_epoch(start_time, tz=tz) if start_time else None,
+        "end_ts": to_epoch(end_time, end_of_day=True, tz=tz) if end_time else None,
+        "limit": limit,
+    }
+    return search_with_broadening(_search_flights, criteria, _FLIGHT_RELAXATIONS, config)
+
+
+# Checks run in a single statement inside the writer's BEGIN IMMEDIATE transaction, so
+# nothing can change between validation and the conditional write that follows.
+_UPDATE_TICKET_CHECK = """
+SELECT
+    (SELECT scheduled_departure FROM flights WHERE flight_id = :new_flight_id),
+    (SELECT scheduled_departure_ts FROM flights WHERE flight_id = :new_flight_id),
+    EXISTS (SELECT 1 FROM ticket_flights WHERE ticket_no = :ticket_no),
+    EXISTS (
+        SELECT 1 FROM tickets WHERE ticket_no = :ticket_no AND passenger_id = :passenger_id
+    )
+"""
+_UPDATE_TICKET = """
+UPDATE ticket_flights SET flight_id = :new_flight_id
+WHERE ticket_no = :ticket_no
+  AND EXISTS (
+      SELECT 1 FROM tickets WHERE ticket_no = :ticket_no AND passenger_id = :passenger_id
+  )
+"""
+_CANCEL_TICKET_CHECK = """
+SELECT
+    EXISTS (SELECT 1 FROM ticket_flights WHERE ticket_no = :ticket_no),
+    EXISTS (
+        SELECT 1 FROM tickets WHERE ticket_no = :ticket_no AND passenger_id = :passenger_id
+    )
+"""
+_CANCEL_TICKET = """
+DELETE FROM ticket_flights
+WHERE ticket_no = :ticket_no
+  AND EXISTS (
+      SELECT 1 FROM tickets WHERE ticket_no = :ticket_no AND passenger_id = :passenger_id
+  )
+"""
+MIN_RESCHEDULE_SECONDS = 3 * 3600
+
+
+def _not_owner(passenger_id: str, ticket_no: str) -> str:
+    return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
+
+
+@write_tool
 @tool
 @fluxloop.trace(name="update_ticket_to_new_flight")
 def update_ticket_to_new_flight(
@@ -93,58 +158,34 @@ def update_ticket_to_new_flight(
     passenger_id = configuration.get("passenger_id")
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
-
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT departure_airport, arrival_airport, scheduled_departure FROM flights WHERE flight_id = ?",
-            (new_flight_id,),
-        )
-        new_flight = cursor.fetchone()
-        if not new_flight:
-            return "Invalid new flight ID provided."
-        column_names = [column[0] for column in cursor.description]
-        new_flight_dict = dict(zip(column_names, new_flight))
-        timezone = pytz.timezone("Etc/GMT-3")
-        current_time = datetime.now(tz=timezone)
-        departure_time = datetime.strptime(
-            new_flight_dict["scheduled_departure"], "%Y-%m-%d %H:%M:%S.%f%z"
-        )
-        time_until = (departure_time - current_time).total_seconds()
-        if time_until < (3 * 3600):
-            return (
+    params = {
+        "ticket_no": ticket_no,
+        "new_flight_id": new_flight_id,
+        "passenger_id": passenger_id,
+    }
+
+    def apply(conn: sqlite3.Connection) -> str:
+        scheduled_departure, departure_ts, has_ticket, is_owner = conn.execute(
+            _UPDATE_TICKET_CHECK, params
+        ).fetchone()
+        if scheduled_departure is None:
+            raise WriteRejected("Invalid new flight ID provided.")
+        if departure_ts is None or departure_ts - time.time() < MIN_RESCHEDULE_SECONDS:
+            raise WriteRejected(
                 "Not permitted to reschedule to a flight that is less than 3 hours "
-                f"from the current time. Selected flight is at {departure_time}."
-            )
-
-        cursor.execute(
-            "SELECT flight_id FROM ticket_flights WHERE ticket_no = ?",
-            (ticket_no,),
-        )
-        current_flight = cursor.fetchone()
-        if not current_flight:
-            return "No existing ticket found for the given ticket number."
-
-        cursor.execute(
-            "SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-            (ticket_no, passenger_id),
-        )
-        current_ticket = cursor.fetchone()
-        if not current_ticket:
-            return (
-                "Current signed-in passenger with ID "
-                f"{passenger_id} not the owner of ticket {ticket_no}"
+                f"from the current time. Selected flight is at {scheduled_departure}."
             )
+        if not has_ticket:
+            raise WriteRejected("No existing ticket found for the given ticket number.")
+        if not is_owner:
+            raise WriteRejected(_not_owner(passenger_id, ticket_no))
+        conn.execute(_UPDATE_TICKET, params)
+        return "Ticket successfully updated to new flight."
 
-        cursor.execute(
-            "UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?",
-            (new_flight_id, ticket_no),
-        )
-        conn.commit()
-
-    return "Ticket successfully updated to new flight."
+    return run_write(apply)
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="cancel_ticket")
 def cancel_ticket(ticket_no: str, *, config: RunnableConfig) -> str:
@@ -153,29 +194,15 @@ def cancel_ticket(ticket_no: str, *, config: RunnableConfig) -> str:
     passenger_id = configuration.get("passenger_id")
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
-
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (ticket_no,)
-        )
-        existing_ticket = cursor.fetchone()
-        if not existing_ticket:
-            return "No existing ticket found for the given ticket number."
-
-        cursor.execute(
-            "SELECT ticket_no FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-            (ticket_no, passenger_id),
-        )
-        current_ticket = cursor.fetchone()
-        if not current_ticket:
-            return (
-                "Current signed-in passenger with ID "
-                f"{passenger_id} not the owner of ticket {ticket_no}"
-            )
-
-        cursor.execute("DELETE FROM ticket_flights WHERE ticket_no = ?", (ticket_no,))
-        conn.commit()
-
-    return "Ticket successfully cancelled."
-
+    params = {"ticket_no": ticket_no, "passenger_id": passenger_id}
+
+    def apply(conn: sqlite3.Connection) -> str:
+        has_ticket, is_owner = conn.execute(_CANCEL_TICKET_CHECK, params).fetchone()
+        if not has_ticket:
+            raise WriteRejected("No existing ticket found for the given ticket number.")
+        if not is_owner:
+            raise WriteRejected(_not_owner(passenger_id, ticket_no))
+        conn.execute(_CANCEL_TICKET, params)
+        return "Ticket successfully cancelled."
+
+    return run_write(apply)
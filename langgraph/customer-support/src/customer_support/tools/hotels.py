@@ -4,9 +4,63 @@ from datetime import date, datetime
 from typing import Optional, Union
 
 import fluxloop
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
-from .base import connect, rows_to_dicts
+from .base import connect_readonly, rows_to_dicts, to_epoch
+from .broaden import (
+    Criteria,
+    drop,
+    like_clause,
+    match_any_term,
+    search_with_broadening,
+    slack_seconds,
+    widen_dates,
+)
+from .resolver import resolve_location_name
+from .writer import WriteRejected, execute_write, write_tool
+
+
+# Stored columns only; the generated ``*_ts`` columns are for filtering, not for the LLM.
+HOTEL_COLUMNS = "id, name, location, price_tier, checkin_date, checkout_date, booked"
+_HOTEL_RELAXATIONS = (
+    widen_dates(1),
+    widen_dates(3),
+    drop("price_tier", "dropped the price tier"),
+    match_any_term("name", "matched any word of the name"),
+    drop("name", "dropped the name"),
+    match_any_term("location", "matched any word of the location"),
+)
+
+
+def _search_hotels(criteria: Criteria) -> list[dict]:
+    query = f"SELECT {HOTEL_COLUMNS} FROM hotels WHERE 1=1"
+    params: list = []
+    slack = slack_seconds(criteria)
+
+    if criteria["location"]:
+        clause, terms = like_clause("location", criteria["location"])
+        query += clause
+        params.extend(terms)
+    if criteria["name"]:
+        clause, terms = like_clause("name", criteria["name"])
+        query += clause
+        params.extend(terms)
+    if criteria["price_tier"]:
+        query += " AND price_tier = ?"
+        params.append(criteria["price_tier"])
+    if criteria["start_ts"] is not None:
+        query += " AND (checkin_date_ts IS NULL OR checkin_date_ts >= ?)"
+        params.append(criteria["start_ts"] - slack)
+    if criteria["end_ts"] is not None:
+        query += " AND (checkout_date_ts IS NULL OR checkout_date_ts <= ?)"
+        params.append(criteria["end_ts"] + slack)
+
+    with connect_readonly() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        return rows_to_dicts(cursor, rows)
 
 
 @tool
@@ -17,47 +71,34 @@ def search_hotels(
     price_tier: Optional[str] = None,
     checkin_date: Optional[Union[datetime, date]] = None,
     checkout_date: Optional[Union[datetime, date]] = None,
-) -> list[dict]:
+    *,
+    config: RunnableConfig,
+) -> Union[list[dict], dict]:
     """Search for hotels based on location, name, and price tier."""
-    query = "SELECT * FROM hotels WHERE 1=1"
-    params: list = []
-
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    if name:
-        query += " AND name LIKE ?"
-        params.append(f"%{name}%")
-    if price_tier:
-        query += " AND price_tier = ?"
-        params.append(price_tier)
-    if checkin_date:
-        query += " AND (checkin_date IS NULL OR checkin_date >= ?)"
-        params.append(checkin_date)
-    if checkout_date:
-        query += " AND (checkout_date IS NULL OR checkout_date <= ?)"
-        params.append(checkout_date)
-
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        return rows_to_dicts(cursor, rows)
+    criteria = {
+        "location": resolve_location_name(location),
+        "name": name,
+        "price_tier": price_tier,
+        "start_ts": to_epoch(checkin_date) if checkin_date else None,
+        "end_ts": to_epoch(checkout_date, end_of_day=True) if checkout_date else None,
+    }
+    return search_with_broadening(_search_hotels, criteria, _HOTEL_RELAXATIONS, config)
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="book_hotel")
 def book_hotel(hotel_id: int) -> str:
     """Book a hotel by its ID."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute("UPDATE hotels SET booked = 1 WHERE id = ?", (hotel_id,))
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Hotel {hotel_id} successfully booked."
-        return f"No hotel found with ID {hotel_id}."
+    rowcount = execute_write(
+        ("UPDATE hotels SET booked = 1 WHERE id = ?", (hotel_id,)),
+    )
+    if rowcount > 0:
+        return f"Hotel {hotel_id} successfully booked."
+    raise WriteRejected(f"No hotel found with ID {hotel_id}.")
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="update_hotel")
 def update_hotel(
@@ -66,33 +107,30 @@ def update_hotel(
     checkout_date: Optional[Union[datetime, date]] = None,
 ) -> str:
     """Update a hotel's check-in and check-out dates."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        if checkin_date:
-            cursor.execute(
-                "UPDATE hotels SET checkin_date = ? WHERE id = ?",
-                (checkin_date, hotel_id),
-            )
-        if checkout_date:
-            cursor.execute(
-                "UPDATE hotels SET checkout_date = ? WHERE id = ?",
-                (checkout_date, hotel_id),
-            )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Hotel {hotel_id} successfully updated."
-        return f"No hotel found with ID {hotel_id}."
+    statements = []
+    if checkin_date:
+        statements.append(
+            ("UPDATE hotels SET checkin_date = ? WHERE id = ?", (checkin_date, hotel_id))
+        )
+    if checkout_date:
+        statements.append(
+            ("UPDATE hotels SET checkout_date = ? WHERE id = ?", (checkout_date, hotel_id))
+        )
+    rowcount = execute_write(*statements)
+    if rowcount > 0:
+        return f"Hotel {hotel_id} successfully updated."
+    raise WriteRejected(f"No hotel found with ID {hotel_id}.")
 
 
+@write_tool
 @tool
 @fluxloop.trace(name="cancel_hotel")
 def cancel_hotel(hotel_id: int) -> str:
     """Cancel a hotel by its ID."""
-    with connect() as conn:
-        cursor = conn.cursor()
-        cursor.execute("UPDATE hotels SET booked = 0 WHERE id = ?", (hotel_id,))
-        conn.commit()
-        if cursor.rowcount > 0:
-            return f"Hotel {hotel_id} successfully cancelled."
-        return f"No hotel found with ID {hotel_id}."
+    rowcount = execute_write(
+        ("UPDATE hotels SET booked = 0 WHERE id = ?", (hotel_id,)),
+    )
+    if rowcount > 0:
+        return f"Hotel {hotel_id} successfully cancelled."
+    raise WriteRejected(f"No hotel found with ID {hotel_id}.")
 
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import fluxloop
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, tool
+from pydantic import ValidationError
+
+from customer_support.deadline import check_deadline
+from customer_support.utils.tool_args import coerce_arguments, describe_validation_error
+from customer_support.utils.write_plan import PLAN_TOOL_NAME, PlanStep, WritePlan
+
+from .writer import WriteRejected, run_transaction, write_tool
+
+
+class PlanAborted(Exception):
+    def __init__(self, index: int, step: PlanStep, message: str):
+        super().__init__(message)
+        self.index = index
+        self.step = step
+
+
+def make_write_plan_tool(tools: Sequence[BaseTool]) -> BaseTool:
+    """Build the plan tool for ``tools``: several writes, approved once, one transaction.
+
+    Step arguments are coerced and validated like direct calls before anything runs. Steps
+    then run in order inside ``run_transaction``, each after a deadline check; if any step
+    raises or is rejected (``WriteRejected``), the whole plan is rolled back. A plan that is
+    not applied is itself answered as rejected, naming the step that failed.
+    """
+    by_name = {write_tool.name: write_tool for write_tool in tools}
+    description = (
+        "Make several changes at once, e.g. book a hotel and a car rental together. "
+        "The user approves the whole plan once, and either every step is applied or none is. "
+        "Prefer this over separate calls whenever the user asks for more than one change. "
+        f"Each step names one of these tools with its arguments: {', '.join(by_name)}."
+    )
+
+    @write_tool
+    @tool(PLAN_TOOL_NAME, args_schema=WritePlan, description=description)
+    @fluxloop.trace(name=PLAN_TOOL_NAME)
+    def execute_write_plan(steps: List[PlanStep], *, config: RunnableConfig) -> str:
+        steps = [PlanStep.model_validate(step) for step in steps]
+        for index, step in enumerate(steps, start=1):
+            if step.tool not in by_name:
+                raise WriteRejected(
+                    f"Plan not applied: step {index} uses unknown tool {step.tool!r}. "
+                    f"Available tools: {', '.join(by_name)}."
+                )
+            schema = by_name[step.tool].tool_call_schema
+            step.args, _ = coerce_arguments(schema, step.args)
+            try:
+                schema.model_validate(step.args)
+            except ValidationError as error:
+                raise WriteRejected(
+                    f"Plan not applied: step {index} ({step.tool}) has invalid arguments: "
+                    f"{describe_validation_error(error)}"
+                ) from error
+
+        def apply() -> List[str]:
+            results = []
+            for index, step in enumerate(steps, start=1):
+                check_deadline(config)
+                call = {
+                    "type": "tool_call",
+                    "name": step.tool,
+                    "args": step.args,
+                    "id": f"plan_step_{index}",
+                }
+                try:
+                    message = by_name[step.tool].invoke(call, config=config)
+                except Exception as exc:
+                    raise PlanAborted(index, step, repr(exc)) from exc
+                result = str(message.content)
+                if message.status == "error":
+                    raise PlanAborted(index, step, result)
+                results.append(result)
+            return results
+
+        try:
+            results = run_transaction(apply)
+        except PlanAborted as exc:
+            raise WriteRejected(
+                "Plan not applied, no changes were made. "
+                f"Step {exc.index} ({exc.step.tool}) failed: {exc}"
+            ) from exc
+        return "\n".join(
+            f"Step {index} ({step.tool}): {result}"
+            for index, (step, result) in enumerate(zip(steps, results), start=1)
+        )
+
+    return execute_write_plan
@@ -6,9 +6,10 @@ from typing import List
 import fluxloop
 import numpy as np
 import openai
-import requests
 from langchain_core.tools import tool
 
+from customer_support.utils.http import get_http_client
+
 FAQ_URL = "https://storage.googleapis.com/benchmarks-artifacts/travel-db/swiss_faq.md"
 
 
@@ -51,11 +52,12 @@ def _get_retriever() -> VectorStoreRetriever:
     if _retriever is not None:
         return _retriever
 
-    response = requests.get(FAQ_URL, timeout=30)
+    http_client = get_http_client()
+    response = http_client.get(FAQ_URL, timeout=30)
     response.raise_for_status()
     faq_text = response.text
     docs = [{"page_content": txt} for txt in re.split(r"(?=\n##)", faq_text)]
-    client = openai.Client()
+    client = openai.Client(http_client=http_client)
     _retriever = VectorStoreRetriever.from_docs(docs, client)
     return _retriever
 
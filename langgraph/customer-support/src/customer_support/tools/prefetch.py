@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import ValidationError
+
+from customer_support.deadline import deadline_from_config
+from customer_support.utils.tool_args import coerce_arguments
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 4
+# Threads whose speculation was never claimed (the user left, the session ended) are dropped
+# once this many newer ones are pending.
+MAX_PENDING = 256
+PREFETCH_TTL_SECONDS = 300.0
+# How often a claim waiting on a running search looks at the session deadline.
+_WAIT_SLICE_SECONDS = 0.25
+# Placeholder values that mean the delegation did not actually carry the argument.
+_MISSING = {"", "unspecified", "unknown", "n/a", "none"}
+
+
+class PrefetchStats:
+    """Process-wide counts of speculative searches and what became of them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {"launched": 0, "hits": 0, "misses": 0, "saved_ms": 0.0}
+
+    def record(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counts[key] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        claimed = counts["hits"] + counts["misses"]
+        counts["saved_ms"] = round(counts["saved_ms"], 1)
+        counts["hit_rate"] = round(counts["hits"] / claimed, 3) if claimed else None
+        return counts
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.update(launched=0, hits=0, misses=0, saved_ms=0.0)
+
+
+PREFETCH_STATS = PrefetchStats()
+
+
+class _Variant(NamedTuple):
+    key: Tuple
+    future: Future
+
+
+class Speculation:
+    """Search results launched ahead of the sub-assistant's first tool call in a thread."""
+
+    def __init__(self, tool_name: str, variants: List[_Variant]):
+        self.tool_name = tool_name
+        self.variants = variants
+        self.created = time.monotonic()
+
+    def cancel(self) -> None:
+        """Drop the searches that have not started yet."""
+        for variant in self.variants:
+            variant.future.cancel()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending: "OrderedDict[str, Speculation]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+def _canonical(tool: Any, args: Dict[str, Any]) -> Optional[Tuple]:
+    """Hashable form of validated ``args``, so "Basel" and "basel " or two spellings of a
+    date compare equal; ``None`` when the tool would reject them."""
+    schema = tool.tool_call_schema
+    coerced, _ = coerce_arguments(schema, args)
+    try:
+        parsed = schema.model_validate(coerced).model_dump(exclude_none=True)
+    except ValidationError:
+        return None
+    return tuple(
+        sorted(
+            (name, value.strip().casefold() if isinstance(value, str) else value)
+            for name, value in parsed.items()
+        )
+    )
+
+
+def _thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def _run(tool: Any, args: Dict[str, Any], config: RunnableConfig) -> Tuple[ToolMessage, float]:
+    start = time.monotonic()
+    message = tool.invoke(
+        {"name": tool.name, "args": args, "id": "prefetch", "type": "tool_call"}, config
+    )
+    return message, time.monotonic() - start
+
+
+def speculate(
+    tool: Any, delegation_args: Dict[str, Any], arg_names: Sequence[str], config: RunnableConfig
+) -> None:
+    """Start ``tool`` with the delegation's arguments (and with its location alone, the other
+    common first search) for the thread in ``config``."""
+    thread_id = _thread_id(config)
+    if thread_id is None:
+        return
+    full = {
+        name: delegation_args[name]
+        for name in arg_names
+        if isinstance(delegation_args.get(name), str)
+        and delegation_args[name].strip().lower() not in _MISSING
+    }
+    if "location" not in full:
+        return
+    # Only what the tools read from ``configurable``; LangGraph's internals stay behind.
+    tool_config: RunnableConfig = {
+        "configurable": {
+            key: value
+            for key, value in (config.get("configurable") or {}).items()
+            if not key.startswith("__")
+        }
+    }
+    variants: List[_Variant] = []
+    seen = set()
+    for args in (full, {"location": full["location"]}):
+        key = _canonical(tool, args)
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        context = contextvars.copy_context()
+        future = _get_executor().submit(context.run, _run, tool, args, tool_config)
+        variants.append(_Variant(key, future))
+        PREFETCH_STATS.record("launched")
+    if not variants:
+        return
+    with _lock:
+        previous = _pending.pop(thread_id, None)
+        if previous is not None:
+            previous.cancel()
+            PREFETCH_STATS.record("misses")
+        _pending[thread_id] = Speculation(tool.name, variants)
+        while len(_pending) > MAX_PENDING:
+            _, dropped = _pending.popitem(last=False)
+            dropped.cancel()
+            PREFETCH_STATS.record("misses")
+
+
+def _claim(
+    speculation: Speculation, tool: Any, args: Dict[str, Any], config: Optional[RunnableConfig]
+) -> Optional[Tuple]:
+    if speculation.tool_name != tool.name:
+        return None
+    if time.monotonic() - speculation.created > PREFETCH_TTL_SECONDS:
+        return None
+    key = _canonical(tool, args)
+    for variant in speculation.variants:
+        if variant.key != key:
+            continue
+        if variant.future.cancel():
+            # Still queued behind other searches: running it directly is no slower.
+            return None
+        deadline = deadline_from_config(config)
+        waited_from = time.monotonic()
+        try:
+            while True:
+                if deadline is not None:
+                    deadline.check()
+                try:
+                    message, duration = variant.future.result(
+                        timeout=None if deadline is None else _WAIT_SLICE_SECONDS
+                    )
+                    break
+                except FutureTimeout:
+                    continue
+        except Exception:
+            logger.debug("Speculative %s failed; running it again", tool.name, exc_info=True)
+            return None
+        return message, duration, time.monotonic() - waited_from
+    return None
+
+
+def use_prefetched(request, execute):
+    """``ToolNode`` wrapper step: answer the first tool call after a handover from the
+    speculative search when it asks for the same thing, otherwise drop the speculation."""
+    config = getattr(request.runtime, "config", None)
+    thread_id = _thread_id(config)
+    if thread_id is None or request.tool is None:
+        return execute(request)
+    with _lock:
+        speculation = _pending.pop(thread_id, None)
+    if speculation is None:
+        return execute(request)
+    tool_call = request.tool_call
+    try:
+        claimed = _claim(speculation, request.tool, tool_call.get("args") or {}, config)
+    finally:
+        speculation.cancel()
+    if claimed is None:
+        PREFETCH_STATS.record("misses")
+        return execute(request)
+    message, duration, waited = claimed
+    PREFETCH_STATS.record("hits")
+    PREFETCH_STATS.record("saved_ms", max(0.0, duration - waited) * 1000)
+    return message.model_copy(update={"tool_call_id": tool_call["id"]})
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Literal, NamedTuple, Optional, Set
+
+import fluxloop
+from langchain_core.tools import tool
+
+from .base import connect_readonly
+
+# Dice similarity of padded trigram sets needed before a fuzzy match replaces an argument.
+MIN_SCORE = 0.45
+CACHED_RESOLVERS = 2
+LOCATION_TABLES = ("hotels", "car_rentals", "trip_recommendations")
+AIRPORTS_TABLE = "airports_data"
+
+_FINGERPRINT_TABLES = ("flights", *LOCATION_TABLES)
+
+Kind = Literal["airport", "location"]
+
+
+class Candidate(NamedTuple):
+    value: str
+    kind: Kind
+    matched: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    """Casefold, strip accents and punctuation: "Zürich-Flughafen" -> "zurich flughafen"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.split(r"[^\w]+", stripped.casefold())).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _english(value: str) -> str:
+    """``airports_data`` may store names as JSON translations ({"en": ..., ...})."""
+    if value.startswith("{"):
+        try:
+            return json.loads(value).get("en") or value
+        except (ValueError, AttributeError):
+            return value
+    return value
+
+
+class LocationResolver:
+    """Trigram index over the airport codes and location names that exist in the database."""
+
+    def __init__(self, airports: Dict[str, Iterable[str]], locations: Iterable[str]) -> None:
+        self.codes = {code.upper(): code for code in airports}
+        # City and airport names naming exactly one airport; shared cities stay ambiguous.
+        named: Dict[str, Set[str]] = defaultdict(set)
+        for code, aliases in airports.items():
+            for alias in aliases:
+                named[normalize(alias)].add(code)
+        self.airport_names = {
+            key: next(iter(codes)) for key, codes in named.items() if key and len(codes) == 1
+        }
+        self.locations = {normalize(location): location for location in locations if location}
+        self._entries: List[tuple[str, Set[str], str, Kind]] = []
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        for code, aliases in airports.items():
+            for alias in {code, *aliases}:
+                self._add(alias, code, "airport")
+        for location in self.locations.values():
+            self._add(location, location, "location")
+
+    def _add(self, alias: str, value: str, kind: Kind) -> None:
+        key = normalize(alias)
+        if not key:
+            return
+        grams = trigrams(key)
+        entry = len(self._entries)
+        self._entries.append((alias, grams, value, kind))
+        for gram in grams:
+            self._index[gram].append(entry)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "LocationResolver":
+        tables = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+        airports: Dict[str, Set[str]] = {}
+        if "flights" in tables:
+            for (code,) in conn.execute(
+                "SELECT departure_airport FROM flights UNION SELECT arrival_airport FROM flights"
+            ):
+                if code:
+                    airports[code] = set()
+        if AIRPORTS_TABLE in tables:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({AIRPORTS_TABLE})")}
+            alias_columns = [column for column in ("airport_name", "city") if column in columns]
+            if "airport_code" in columns and alias_columns:
+                for code, *names in conn.execute(
+                    f"SELECT airport_code, {', '.join(alias_columns)} FROM {AIRPORTS_TABLE}"
+                ):
+                    if code in airports:
+                        airports[code].update(_english(name) for name in names if name)
+        locations: Set[str] = set()
+        for table in LOCATION_TABLES:
+            if table in tables:
+                locations.update(
+                    row[0] for row in conn.execute(f"SELECT DISTINCT location FROM {table}")
+                )
+        return cls(airports, locations)
+
+    def candidates(
+        self, query: str, kind: Optional[Kind] = None, limit: int = 5
+    ) -> List[Candidate]:
+        """Best matches for ``query`` (whole text or any of its words), highest score first."""
+        key = normalize(query)
+        if not key:
+            return []
+        probes = {key, *(word for word in key.split() if len(word) >= 3)}
+        best: Dict[tuple[str, str], Candidate] = {}
+        for probe in probes:
+            grams = trigrams(probe)
+            shared: Dict[int, int] = defaultdict(int)
+            for gram in grams:
+                for entry in self._index.get(gram, ()):
+                    shared[entry] += 1
+            for entry, count in shared.items():
+                alias, entry_grams, value, entry_kind = self._entries[entry]
+                if kind is not None and entry_kind != kind:
+                    continue
+                score = 2 * count / (len(grams) + len(entry_grams))
+                current = best.get((value, entry_kind))
+                if current is None or score > current.score:
+                    best[(value, entry_kind)] = Candidate(value, entry_kind, alias, round(score, 3))
+        ranked = sorted(best.values(), key=lambda candidate: (-candidate.score, candidate.value))
+        return ranked[:limit]
+
+    def airport(self, value: str) -> Optional[str]:
+        """Return the airport code for a code, city or airport name, or None if unknown.
+
+        Only exact matches count: a near-miss code ("BSX" for "BSL") is usually another
+        airport, so fuzzy matches are left to ``resolve_location``, which lists candidates.
+        """
+        code = self.codes.get(value.strip().upper())
+        if code is not None:
+            return code
+        return self.airport_names.get(normalize(value))
+
+    def location(self, value: str) -> Optional[str]:
+        """Return the stored spelling of a location, or None if ``value`` already matches one.
+
+        A value that is a substring of a known location is left alone, since ``LIKE`` already
+        finds it and may intentionally match several places.
+        """
+        key = normalize(value)
+        if not key or any(key in known for known in self.locations):
+            return None
+        matches = self.candidates(value, "location", limit=1)
+        if matches and matches[0].score >= MIN_SCORE:
+            return matches[0].value
+        return None
+
+    def mentioned_location(self, text: str) -> Optional[str]:
+        """The stored location ``text`` names word for word, longest first, if any."""
+        padded = f" {normalize(text)} "
+        for key in sorted(self.locations, key=len, reverse=True):
+            if f" {key} " in padded:
+                return self.locations[key]
+        return None
+
+
+_resolvers: "OrderedDict[tuple, LocationResolver]" = OrderedDict()
+_resolvers_lock = threading.Lock()
+
+
+def _fingerprint(conn: sqlite3.Connection) -> tuple:
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    return tuple(
+        conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0] if table in tables else None
+        for table in _FINGERPRINT_TABLES
+    )
+
+
+def get_resolver(conn: Optional[sqlite3.Connection] = None) -> LocationResolver:
+    """Return the resolver for the current database, building it on first use.
+
+    Like the route index it is keyed by a cheap fingerprint of the source tables, so
+    per-session copies of one database share a single resolver.
+    """
+    if conn is None:
+        with connect_readonly() as conn:
+            return get_resolver(conn)
+    fingerprint = _fingerprint(conn)
+    with _resolvers_lock:
+        resolver = _resolvers.get(fingerprint)
+        if resolver is None:
+            resolver = LocationResolver.load(conn)
+            _resolvers[fingerprint] = resolver
+            while len(_resolvers) > CACHED_RESOLVERS:
+                _resolvers.popitem(last=False)
+        else:
+            _resolvers.move_to_end(fingerprint)
+    return resolver
+
+
+def resolve_airport(value: Optional[str]) -> Optional[str]:
+    """Map an airport code, city or airport name to its code; other values pass through."""
+    if not value:
+        return value
+    return get_resolver().airport(value) or value
+
+
+def resolve_location_name(value: Optional[str]) -> Optional[str]:
+    """Correct a misspelled location to its stored spelling; other values pass through."""
+    if not value:
+        return value
+    return get_resolver().location(value) or value
+
+
+@tool
+@fluxloop.trace(name="resolve_location")
+def resolve_location(
+    query: str,
+    kind: Optional[Kind] = None,
+    limit: int = 5,
+) -> list[dict]:
+    """Find airport codes and location names in the database that match a city, airport or misspelling.
+
+    Use kind="airport" for flight searches and kind="location" for hotels, car rentals and
+    excursions. Results are ranked by similarity score (1.0 is an exact match).
+    """
+    return [candidate._asdict() for candidate in get_resolver().candidates(query, kind, limit)]
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import heapq
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple, Union
+
+import fluxloop
+from langchain_core.tools import tool
+
+from .base import connect_readonly, flight_time_zone, rows_to_dicts, to_epoch
+from .resolver import resolve_airport
+
+MIN_CONNECTION_MINUTES = 45
+MAX_CONNECTION_HOURS = 12
+DEFAULT_WINDOW_SECONDS = 24 * 3600
+MAX_STOPS = 2
+# Later departures on the same onward route rarely beat the earliest ones, so only the first
+# few per (connecting airport, next airport) are expanded.
+DEPARTURES_PER_ROUTE = 3
+# Indexes for schedules that were rebased away are dropped once this many newer ones exist.
+CACHED_INDEXES = 2
+
+_FINGERPRINT = """
+SELECT
+    (SELECT MAX(rowid) FROM flights),
+    (SELECT MIN(scheduled_departure_ts) FROM flights),
+    (SELECT MAX(scheduled_departure_ts) FROM flights)
+"""
+_SCHEDULE = """
+SELECT departure_airport, arrival_airport, scheduled_departure_ts, scheduled_arrival_ts, flight_id
+FROM flights
+WHERE scheduled_departure_ts IS NOT NULL AND scheduled_arrival_ts IS NOT NULL
+ORDER BY departure_airport, scheduled_departure_ts
+"""
+_LEG_DETAILS = """
+SELECT flight_id, flight_no, departure_airport, arrival_airport, scheduled_departure, scheduled_arrival
+FROM flights
+WHERE flight_id IN ({placeholders})
+"""
+
+
+class _Departures:
+    """Flights leaving one airport, sorted by departure time, in compact parallel arrays."""
+
+    __slots__ = ("departs", "arrives", "flight_ids", "destinations")
+
+    def __init__(self) -> None:
+        self.departs = array("q")
+        self.arrives = array("q")
+        self.flight_ids = array("q")
+        self.destinations: List[str] = []
+
+
+class _Itinerary(NamedTuple):
+    duration: int
+    stops: int
+    departs: int
+    flight_ids: Tuple[int, ...]
+    arrivals: Tuple[int, ...]
+    departures: Tuple[int, ...]
+
+
+class RouteIndex:
+    """In-memory adjacency index over ``flights`` for multi-leg itinerary search."""
+
+    def __init__(self, rows) -> None:
+        self.departures: Dict[str, _Departures] = {}
+        successors: Dict[str, Set[str]] = {}
+        for origin, destination, departs, arrives, flight_id in rows:
+            entry = self.departures.get(origin)
+            if entry is None:
+                entry = self.departures[origin] = _Departures()
+            entry.departs.append(departs)
+            entry.arrives.append(arrives)
+            entry.flight_ids.append(flight_id)
+            entry.destinations.append(destination)
+            successors.setdefault(origin, set()).add(destination)
+        inbound: Dict[str, Set[str]] = {}
+        for origin, destinations in successors.items():
+            for destination in destinations:
+                inbound.setdefault(destination, set()).add(origin)
+        self.predecessors: Dict[str, FrozenSet[str]] = {
+            airport: frozenset(origins) for airport, origins in inbound.items()
+        }
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "RouteIndex":
+        return cls(conn.execute(_SCHEDULE))
+
+    def _reachable(self, destination: str, max_legs: int) -> List[FrozenSet[str]]:
+        """``reachable[n]`` holds the airports that can reach ``destination`` in at most n legs."""
+        reachable = [frozenset({destination})]
+        for _ in range(max_legs):
+            previous = reachable[-1]
+            expanded = set(previous)
+            for airport in previous:
+                expanded.update(self.predecessors.get(airport, ()))
+            reachable.append(frozenset(expanded))
+        return reachable
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        earliest: int,
+        latest: int,
+        *,
+        max_stops: int = MAX_STOPS,
+        min_connection: int = MIN_CONNECTION_MINUTES * 60,
+        max_connection: int = MAX_CONNECTION_HOURS * 3600,
+        limit: int = 10,
+    ) -> List[_Itinerary]:
+        """Return up to ``limit`` itineraries departing in ``[earliest, latest]``, fastest first."""
+        if origin == destination or limit <= 0:
+            return []
+        reachable = self._reachable(destination, max_stops + 1)
+        # Max-heap (negated) of the best ``limit`` itineraries found so far.
+        best: List[Tuple[int, int, int, _Itinerary]] = []
+
+        def worst_duration() -> Optional[int]:
+            return -best[0][0] if len(best) >= limit else None
+
+        def expand(
+            airport: str,
+            window: Tuple[int, int],
+            start: Optional[int],
+            legs: Tuple[Tuple[int, int, int], ...],
+            visited: FrozenSet[str],
+            legs_left: int,
+        ) -> None:
+            entry = self.departures.get(airport)
+            if entry is None:
+                return
+            lo = bisect_left(entry.departs, window[0])
+            hi = bisect_right(entry.departs, window[1])
+            per_route: Dict[str, int] = {}
+            for k in range(lo, hi):
+                next_airport = entry.destinations[k]
+                if next_airport in visited or next_airport not in reachable[legs_left - 1]:
+                    continue
+                if start is not None:
+                    seen = per_route.get(next_airport, 0)
+                    if seen >= DEPARTURES_PER_ROUTE:
+                        continue
+                    per_route[next_airport] = seen + 1
+                first_departure = entry.departs[k] if start is None else start
+                arrives = entry.arrives[k]
+                cutoff = worst_duration()
+                if cutoff is not None and arrives - first_departure >= cutoff:
+                    continue
+                path = legs + ((entry.flight_ids[k], entry.departs[k], arrives),)
+                if next_airport == destination:
+                    itinerary = _Itinerary(
+                        duration=arrives - first_departure,
+                        stops=len(path) - 1,
+                        departs=first_departure,
+                        flight_ids=tuple(leg[0] for leg in path),
+                        departures=tuple(leg[1] for leg in path),
+                        arrivals=tuple(leg[2] for leg in path),
+                    )
+                    key = (-itinerary.duration, -itinerary.stops, -itinerary.departs, itinerary)
+                    if len(best) < limit:
+                        heapq.heappush(best, key)
+                    else:
+                        heapq.heappushpop(best, key)
+                elif legs_left > 1:
+                    expand(
+                        next_airport,
+                        (arrives + min_connection, arrives + max_connection),
+                        first_departure,
+                        path,
+                        visited | {next_airport},
+                        legs_left - 1,
+                    )
+
+        expand(origin, (earliest, latest), None, (), frozenset({origin}), max_stops + 1)
+        return sorted(
+            (entry[3] for entry in best),
+            key=lambda itinerary: (itinerary.duration, itinerary.stops, itinerary.departs),
+        )
+
+
+_indexes: "OrderedDict[tuple, RouteIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_route_index(conn: Optional[sqlite3.Connection] = None) -> RouteIndex:
+    """Return the route index for the current database, building it on first use.
+
+    Indexes are keyed by a cheap fingerprint of ``flights`` (highest rowid and departure range)
+    rather than by path, so rebasing the dates rebuilds the index while per-session copies of
+    the same database share one.
+    """
+    if conn is None:
+        with connect_readonly() as conn:
+            return get_route_index(conn)
+    fingerprint = tuple(conn.execute(_FINGERPRINT).fetchone())
+    with _indexes_lock:
+        index = _indexes.get(fingerprint)
+        if index is None:
+            index = RouteIndex.load(conn)
+            _indexes[fingerprint] = index
+            while len(_indexes) > CACHED_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(fingerprint)
+    return index
+
+
+@tool
+@fluxloop.trace(name="search_connecting_flights")
+def search_connecting_flights(
+    departure_airport: str,
+    arrival_airport: str,
+    start_time: Optional[Union[date, datetime]] = None,
+    end_time: Optional[Union[date, datetime]] = None,
+    max_stops: int = MAX_STOPS,
+    min_connection_minutes: int = MIN_CONNECTION_MINUTES,
+    limit: int = 10,
+) -> list[dict]:
+    """Search direct, one-stop and two-stop itineraries between two airports in one call.
+
+    Use this when there is no suitable direct flight. The first leg departs between start_time
+    and end_time (default: the next 24 hours). Results are ranked by total travel time and
+    list every leg with its flight_id and the layover at each connection.
+    """
+    max_stops = max(0, min(max_stops, MAX_STOPS))
+    departure_airport = resolve_airport(departure_airport)
+    arrival_airport = resolve_airport(arrival_airport)
+
+    with connect_readonly() as conn:
+        tz = flight_time_zone(conn)
+        earliest = to_epoch(start_time, tz=tz) if start_time else int(time.time())
+        latest = (
+            to_epoch(end_time, end_of_day=True, tz=tz)
+            if end_time
+            else earliest + DEFAULT_WINDOW_SECONDS
+        )
+        index = get_route_index(conn)
+        itineraries = index.search(
+            departure_airport,
+            arrival_airport,
+            earliest,
+            latest,
+            max_stops=max_stops,
+            min_connection=max(0, min_connection_minutes) * 60,
+            limit=limit,
+        )
+        flight_ids = sorted({fid for itinerary in itineraries for fid in itinerary.flight_ids})
+        if not flight_ids:
+            return []
+        cursor = conn.cursor()
+        cursor.execute(
+            _LEG_DETAILS.format(placeholders=", ".join("?" * len(flight_ids))), flight_ids
+        )
+        legs = {row["flight_id"]: row for row in rows_to_dicts(cursor, cursor.fetchall())}
+
+    results = []
+    for itinerary in itineraries:
+        itinerary_legs = [legs[fid] for fid in itinerary.flight_ids]
+        results.append(
+            {
+                "stops": itinerary.stops,
+                "departure_airport": departure_airport,
+                "arrival_airport": arrival_airport,
+                "scheduled_departure": itinerary_legs[0]["scheduled_departure"],
+                "scheduled_arrival": itinerary_legs[-1]["scheduled_arrival"],
+                "duration_minutes": itinerary.duration // 60,
+                "connection_minutes": [
+                    (departs - arrives) // 60
+                    for arrives, departs in zip(itinerary.arrivals, itinerary.departures[1:])
+                ],
+                "legs": itinerary_legs,
+            }
+        )
+    return results
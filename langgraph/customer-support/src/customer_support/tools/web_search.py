@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional
+
+from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_community.utilities.tavily_search import TAVILY_API_URL, TavilySearchAPIWrapper
+
+from customer_support.utils.http import get_http_client
+
+
+class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    """Tavily wrapper that posts through the shared HTTP client instead of bare ``requests``."""
+
+    def raw_results(
+        self,
+        query: str,
+        max_results: Optional[int] = 5,
+        search_depth: Optional[str] = "advanced",
+        include_domains: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        include_answer: Optional[bool] = False,
+        include_raw_content: Optional[bool] = False,
+        include_images: Optional[bool] = False,
+    ) -> Dict:
+        params = {
+            "api_key": self.tavily_api_key.get_secret_value(),
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_domains": include_domains or [],
+            "exclude_domains": exclude_domains or [],
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content,
+            "include_images": include_images,
+        }
+        response = get_http_client().post(f"{TAVILY_API_URL}/search", json=params)
+        response.raise_for_status()
+        return response.json()
+
+
+_web_search: TavilySearchResults | None = None
+_web_search_lock = threading.Lock()
+
+
+def get_web_search_tool() -> TavilySearchResults:
+    """The Tavily tool shared by every graph build in the process."""
+    global _web_search
+    with _web_search_lock:
+        if _web_search is None:
+            _web_search = TavilySearchResults(
+                max_results=1, api_wrapper=PooledTavilySearchAPIWrapper()
+            )
+        return _web_search
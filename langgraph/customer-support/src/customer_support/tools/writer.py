@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import atexit
+import contextvars
+import queue
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from langchain_core.tools import BaseTool, ToolException
+
+from customer_support.deadline import (
+    SQLITE_PROGRESS_STEPS,
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+)
+
+from .base import BUSY_TIMEOUT_SECONDS, current_target
+
+T = TypeVar("T")
+
+MAX_BATCH = 256
+
+# Writer connection of the transaction ``run_transaction`` is running, if any.
+_TRANSACTION: contextvars.ContextVar[Optional[sqlite3.Connection]] = contextvars.ContextVar(
+    "customer_support_write_transaction", default=None
+)
+
+
+class WriteRejected(ToolException):
+    """A write tool refused the request and changed nothing; the message says why."""
+
+
+def write_tool(write: BaseTool) -> BaseTool:
+    """Answer ``WriteRejected`` from ``write`` with its message as an error ``ToolMessage``.
+
+    The model reads the message as before, while ``status="error"`` tells callers such as
+    the write plan that nothing was applied.
+    """
+    write.handle_tool_error = True
+    return write
+
+
+class _WriteJob:
+    __slots__ = ("fn", "deadline", "done", "result", "error")
+
+    def __init__(self, fn: Callable[[sqlite3.Connection], Any]):
+        self.fn = fn
+        # The submitting session's deadline; the writer thread cannot see its context.
+        self.deadline: Optional[Deadline] = current_deadline()
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SerialWriter:
+    """Owns the only write connection to a database and applies mutations in order.
+
+    Jobs that queue up while a transaction is committing are applied together in the next
+    transaction (group commit), each inside its own savepoint so one failing job does not
+    undo the others.
+    """
+
+    def __init__(self, target: str, *, max_batch: int = MAX_BATCH):
+        self.target = target
+        self.max_batch = max_batch
+        self._queue: "queue.SimpleQueue[Optional[_WriteJob]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="booking-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        job = _WriteJob(fn)
+        self._queue.put(job)
+        job.done.wait()
+        if job.error is not None:
+            if isinstance(job.error, sqlite3.OperationalError) and _expired(job.deadline):
+                raise DeadlineExceeded("The deadline passed during a write.") from job.error
+            raise job.error
+        return job.result
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(
+            self.target,
+            uri=self.target.startswith("file:"),
+            timeout=BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+        )
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                batch = [job]
+                closing = False
+                while len(batch) < self.max_batch:
+                    try:
+                        pending = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if pending is None:
+                        closing = True
+                        break
+                    batch.append(pending)
+                self._apply(conn, batch)
+                if closing:
+                    return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, batch: List[_WriteJob]) -> None:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job in batch:
+                if _expired(job.deadline):
+                    job.error = DeadlineExceeded("The deadline passed before the write started.")
+                    continue
+                # Aborts this job's statements (not the batch's commit) once its deadline passes.
+                conn.set_progress_handler(
+                    job.deadline.sqlite_progress if job.deadline is not None else None,
+                    SQLITE_PROGRESS_STEPS,
+                )
+                conn.execute("SAVEPOINT booking_write")
+                try:
+                    job.result = job.fn(conn)
+                except BaseException as exc:
+                    conn.execute("ROLLBACK TO booking_write")
+                    job.error = exc
+                finally:
+                    conn.set_progress_handler(None, SQLITE_PROGRESS_STEPS)
+                conn.execute("RELEASE booking_write")
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for job in batch:
+                if job.error is None:
+                    job.result = None
+                    job.error = exc
+        finally:
+            for job in batch:
+                job.done.set()
+
+
+def _expired(deadline: Optional[Deadline]) -> bool:
+    return deadline is not None and deadline.expired()
+
+
+_writers: Dict[str, SerialWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer() -> SerialWriter:
+    target = current_target()
+    with _writers_lock:
+        writer = _writers.get(target)
+        if writer is None:
+            writer = SerialWriter(target)
+            _writers[target] = writer
+    return writer
+
+
+def close_writer(target: str) -> None:
+    with _writers_lock:
+        writer = _writers.pop(target, None)
+    if writer is not None:
+        writer.close()
+
+
+@atexit.register
+def close_all_writers() -> None:
+    for target in list(_writers):
+        close_writer(target)
+
+
+def run_write(fn: Callable[[sqlite3.Connection], T]) -> T:
+    """Run ``fn`` on the writer connection inside the current group-commit transaction.
+
+    ``fn`` must not commit or roll back itself. Inside ``run_transaction`` it joins the
+    enclosing transaction instead of queueing a job of its own.
+    """
+    conn = _TRANSACTION.get()
+    if conn is not None:
+        return fn(conn)
+    return get_writer().submit(fn)
+
+
+def run_transaction(fn: Callable[[], T]) -> T:
+    """Run ``fn`` as a single write job: every ``run_write`` it makes commits or rolls back
+    together, and an exception from ``fn`` undoes all of them.
+
+    ``fn`` runs on the writer thread but in a copy of the caller's context, so session
+    database overrides and tracing callbacks still apply.
+    """
+    context = contextvars.copy_context()
+
+    def apply(conn: sqlite3.Connection) -> T:
+        def run() -> T:
+            _TRANSACTION.set(conn)
+            return fn()
+
+        return context.run(run)
+
+    return run_write(apply)
+
+
+def execute_write(*statements: Tuple[str, Sequence[Any]]) -> int:
+    """Execute ``statements`` atomically and return the rowcount of the last one."""
+
+    def apply(conn: sqlite3.Connection) -> int:
+        rowcount = 0
+        for sql, params in statements:
+            rowcount = conn.execute(sql, params).rowcount
+        return rowcount
+
+    return run_write(apply)
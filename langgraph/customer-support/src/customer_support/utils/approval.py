@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import abc
+import fnmatch
+import itertools
+import logging
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Union
+
+from langchain_core.messages import ToolMessage
+
+from .write_plan import PLAN_TOOL_NAME, plan_steps
+
+logger = logging.getLogger(__name__)
+
+# Safety net for automatic policies that keep approving calls that lead straight back to an
+# interrupt; a person at the console decides for themselves when to stop.
+MAX_APPROVAL_ROUNDS = 10
+
+ToolCall = Dict[str, Any]
+
+
+class Decision(NamedTuple):
+    approved: bool
+    reason: str = ""
+
+
+APPROVED = Decision(True)
+
+
+class ApprovalRoundsExceeded(Exception):
+    """Interrupts were still pending after the policy's last allowed round."""
+
+    def __init__(self, rounds: int, records: List[Dict[str, Any]]):
+        super().__init__(f"Tool calls still awaited approval after {rounds} approval rounds.")
+        self.rounds = rounds
+        self.records = records
+
+
+class ApprovalPolicy(abc.ABC):
+    """Decides whether the tool calls pending at an interrupt may run.
+
+    Subclasses implement ``decide`` for a single call; ``review`` is the hook used at an
+    interrupt and may be overridden to look at all pending calls at once. A write plan is
+    judged step by step, so rules written for single tools also cover plans.
+    """
+
+    source = "policy"
+    # Interrupts resolved per turn before giving up; ``None`` for no limit.
+    max_rounds: Optional[int] = MAX_APPROVAL_ROUNDS
+
+    @abc.abstractmethod
+    def decide(self, tool_call: ToolCall) -> Decision:
+        """Approve or deny one tool call (or one step of a write plan)."""
+
+    def review(self, tool_calls: Sequence[ToolCall]) -> List[Decision]:
+        return [self.decide_plan_or_call(tool_call) for tool_call in tool_calls]
+
+    def decide_plan_or_call(self, tool_call: ToolCall) -> Decision:
+        if tool_call["name"] != PLAN_TOOL_NAME:
+            return self.decide(tool_call)
+        denied = [
+            decision
+            for decision in (self.decide(step) for step in plan_steps(tool_call))
+            if not decision.approved
+        ]
+        if denied:
+            return Decision(False, " ".join(decision.reason for decision in denied))
+        return APPROVED
+
+
+class ApproveAll(ApprovalPolicy):
+    def decide(self, tool_call: ToolCall) -> Decision:
+        return APPROVED
+
+
+class DenyAll(ApprovalPolicy):
+    def __init__(self, reason: str = "Changes are not permitted in this session."):
+        self.reason = reason
+
+    def decide(self, tool_call: ToolCall) -> Decision:
+        return Decision(False, self.reason)
+
+
+class ApprovalRule(NamedTuple):
+    """Matches calls by tool name (glob) and optionally by argument values or a predicate."""
+
+    tool: str
+    approve: bool
+    args: Mapping[str, Any] = {}
+    when: Optional[Callable[[Dict[str, Any]], bool]] = None
+    reason: str = ""
+
+    def matches(self, tool_call: ToolCall) -> bool:
+        if not fnmatch.fnmatchcase(tool_call["name"], self.tool):
+            return False
+        args = tool_call.get("args") or {}
+        if any(args.get(key) != value for key, value in self.args.items()):
+            return False
+        return self.when is None or bool(self.when(args))
+
+
+class RuleBasedPolicy(ApprovalPolicy):
+    """First matching rule wins; calls that match no rule get ``default``."""
+
+    def __init__(self, rules: Sequence[ApprovalRule], *, default: bool = False):
+        self.rules = list(rules)
+        self.default = default
+
+    def decide(self, tool_call: ToolCall) -> Decision:
+        for rule in self.rules:
+            if rule.matches(tool_call):
+                reason = rule.reason or (
+                    "" if rule.approve else f"{tool_call['name']} is not allowed by policy."
+                )
+                return Decision(rule.approve, reason)
+        if self.default:
+            return APPROVED
+        return Decision(False, f"{tool_call['name']} is not allowed by policy.")
+
+
+class PromptPolicy(ApprovalPolicy):
+    """Asks the person at the console once per interrupt (EOF counts as approval)."""
+
+    source = "user"
+    max_rounds = None
+
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+
+    def decide(self, tool_call: ToolCall) -> Decision:
+        return self.review([tool_call])[0]
+
+    def review(self, tool_calls: Sequence[ToolCall]) -> List[Decision]:
+        try:
+            user_input = input(self.prompt)
+        except EOFError:
+            user_input = "y"
+        if user_input.strip().lower() in {"y", "yes", ""}:
+            return [APPROVED] * len(tool_calls)
+        return [Decision(False, user_input)] * len(tool_calls)
+
+
+PolicySpec = Union[None, bool, str, Mapping[str, Any], ApprovalPolicy]
+
+
+def resolve_policy(spec: PolicySpec) -> Optional[ApprovalPolicy]:
+    """Build a policy from a runner argument.
+
+    Accepts a policy instance, ``True``/``"approve_all"``, ``False``/``"deny_all"``, or a
+    mapping such as ``{"default": "deny", "rules": [{"tool": "search_*", "decision":
+    "approve"}, {"tool": "cancel_*", "decision": "deny", "reason": "..."}]}`` as it would
+    appear in ``simulation.yaml``. ``None`` means no policy (interrupts are left pending).
+    """
+    if spec is None or isinstance(spec, ApprovalPolicy):
+        return spec
+    if spec is True or spec == "approve_all":
+        return ApproveAll()
+    if spec is False or spec == "deny_all":
+        return DenyAll()
+    if isinstance(spec, Mapping):
+        rules = [
+            ApprovalRule(
+                tool=rule.get("tool", "*"),
+                approve=rule.get("decision", "deny") == "approve",
+                args=rule.get("args") or {},
+                reason=rule.get("reason", ""),
+            )
+            for rule in spec.get("rules", ())
+        ]
+        return RuleBasedPolicy(rules, default=spec.get("default", "deny") == "approve")
+    raise ValueError(f"Unsupported approval policy: {spec!r}")
+
+
+def pending_tool_calls(graph, config) -> List[ToolCall]:
+    """Tool calls the graph is interrupted on, or an empty list if it is not waiting."""
+    snapshot = graph.get_state(config)
+    if not snapshot.next:
+        return []
+    return list(getattr(snapshot.values["messages"][-1], "tool_calls", None) or [])
+
+
+def resume_payload(
+    tool_calls: Sequence[ToolCall], decisions: Sequence[Decision], source: str = "policy"
+) -> Optional[Dict[str, Any]]:
+    """``None`` resumes the interrupted tools; otherwise a denial message for every call.
+
+    A partly denied step is not executed at all: the approved calls are answered with a note
+    so the assistant can re-plan them together with the denied ones.
+    """
+    if all(decision.approved for decision in decisions):
+        return None
+    messages = []
+    for tool_call, decision in zip(tool_calls, decisions):
+        if decision.approved:
+            content = "Not executed because another action in the same step was denied."
+        else:
+            content = (
+                f"API call denied by {source}. Reasoning: '{decision.reason}'. "
+                "Continue assisting, accounting for the user's input."
+            )
+        messages.append(ToolMessage(tool_call_id=tool_call["id"], content=content))
+    return {"messages": messages}
+
+
+def run_with_approvals(
+    graph,
+    config,
+    policy: ApprovalPolicy,
+    *,
+    resume: Optional[Callable[[Optional[Dict[str, Any]]], Any]] = None,
+    max_rounds: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Resolve pending interrupts with ``policy`` until the graph stops waiting.
+
+    ``resume`` continues the graph with a payload (default: ``graph.invoke``). Returns one
+    record per reviewed call, for transcripts. ``max_rounds`` defaults to the policy's own;
+    when the graph is still waiting after that many rounds, ``ApprovalRoundsExceeded``
+    carries the records so far.
+    """
+    resume = resume or (lambda payload: graph.invoke(payload, config))
+    rounds = max_rounds if max_rounds is not None else policy.max_rounds
+    records: List[Dict[str, Any]] = []
+    for _ in range(rounds) if rounds is not None else itertools.count():
+        tool_calls = pending_tool_calls(graph, config)
+        if not tool_calls:
+            return records
+        decisions = policy.review(tool_calls)
+        for tool_call, decision in zip(tool_calls, decisions):
+            records.append(
+                {
+                    "tool": tool_call["name"],
+                    "args": tool_call.get("args", {}),
+                    "approved": decision.approved,
+                    "reason": decision.reason,
+                }
+            )
+        resume(resume_payload(tool_calls, decisions, policy.source))
+    if not pending_tool_calls(graph, config):
+        return records
+    logger.warning("Stopped resolving interrupts after %d rounds", rounds)
+    raise ApprovalRoundsExceeded(rounds, records)
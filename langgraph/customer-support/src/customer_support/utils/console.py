@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Set
+from collections.abc import MutableSet
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
 
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import AIMessage
+from langchain_core.messages.base import get_msg_title_repr
 
-from .langgraph import print_event
+from .approval import ApprovalPolicy, ApprovalRoundsExceeded, PromptPolicy, run_with_approvals
+from .langgraph import RecentlyPrinted, print_event
 
 
 APPROVAL_PROMPT = (
@@ -13,51 +16,144 @@ APPROVAL_PROMPT = (
 )
 
 
-def stream_events(graph, payload, config, printed: Set[str]) -> None:
-    events = graph.stream(payload, config, stream_mode="values")
-    for event in events:
-        print_event(event, printed)
-
-
-def handle_interrupts(graph, config, printed: Set[str], prompt: str = APPROVAL_PROMPT):
-    snapshot = graph.get_state(config)
-    while snapshot.next:
-        ai_message = snapshot.values["messages"][-1]
-        tool_calls = getattr(ai_message, "tool_calls", None)
-        if not tool_calls:
-            break
-        try:
-            user_input = input(prompt)
-        except EOFError:
-            user_input = "y"
-        if user_input.strip().lower() in {"y", "yes", ""}:
-            payload = None
-        else:
-            payload = {
-                "messages": [
-                    ToolMessage(
-                        tool_call_id=tool_calls[0]["id"],
-                        content=(
-                            "API call denied by user. "
-                            f"Reasoning: '{user_input}'. Continue assisting, accounting for the user's input."
-                        ),
-                    )
-                ]
-            }
-        stream_events(graph, payload, config, printed)
-        snapshot = graph.get_state(config)
+STREAM_MODES = ("messages", "updates")
+
+
+def stream_turn(graph, payload, config) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(mode, chunk)`` pairs for one graph run.
+
+    ``messages`` chunks are ``(message, metadata)`` tuples: one per LLM token, plus whole
+    messages (tool results among them) that nodes return without streaming;
+    ``updates`` chunks map a node name to the partial state it returned.
+    """
+    yield from graph.stream(payload, config, stream_mode=list(STREAM_MODES))
+
+
+def iter_tokens(graph, payload, config) -> Iterator[Tuple[str, str]]:
+    """Yield ``(node, text)`` for each LLM token produced while running the graph."""
+    for mode, chunk in stream_turn(graph, payload, config):
+        if mode != "messages":
+            continue
+        message, metadata = chunk
+        if not isinstance(message, AIMessage):
+            continue
+        text = chunk_text(message)
+        if text:
+            yield metadata.get("langgraph_node", ""), text
+
+
+def chunk_text(message: Any) -> str:
+    content = getattr(message, "content", None)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            element.get("text", "")
+            for element in content
+            if isinstance(element, dict) and element.get("type", "text") == "text"
+        )
+    return ""
+
+
+def _print_dialog_update(value: Any) -> None:
+    if isinstance(value, list):
+        value = value[-1] if value else None
+    if value is None:
+        return
+    if value == "pop":
+        print("Leaving current workflow")
+    else:
+        print("Currently in: ", value)
+
+
+def _finish_streamed_message(message: AIMessage) -> None:
+    print()
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        print(f"Tool Call: {tool_call['name']} ({tool_call['id']})")
+        print(f" Args: {tool_call['args']}")
+
+
+def stream_events(
+    graph,
+    payload,
+    config,
+    printed: MutableSet[str],
+    *,
+    quiet: bool = False,
+) -> None:
+    if quiet:
+        for _ in graph.stream(payload, config, stream_mode="updates"):
+            pass
+        return
+
+    streamed: Set[str] = set()
+    for mode, chunk in stream_turn(graph, payload, config):
+        if mode == "messages":
+            message, _ = chunk
+            # Tool results and handover messages arrive here too; ``print_event`` renders
+            # (and truncates) those from the update below.
+            if not isinstance(message, AIMessage):
+                continue
+            text = chunk_text(message)
+            if not text:
+                continue
+            if message.id not in streamed:
+                streamed.add(message.id)
+                print(get_msg_title_repr("Ai Message", bold=True))
+            print(text, end="", flush=True)
+            continue
+
+        for update in chunk.values():
+            if not isinstance(update, dict):
+                continue
+            if "dialog_state" in update:
+                _print_dialog_update(update["dialog_state"])
+            messages = update.get("messages")
+            if messages is None:
+                continue
+            if not isinstance(messages, list):
+                messages = [messages]
+            for message in messages:
+                if getattr(message, "id", None) in streamed:
+                    _finish_streamed_message(message)
+                    printed.add(message.id)
+                    continue
+                print_event({"messages": message}, printed)
+
+
+def handle_interrupts(
+    graph,
+    config,
+    printed: MutableSet[str],
+    prompt: str = APPROVAL_PROMPT,
+    *,
+    quiet: bool = False,
+    policy: Optional[ApprovalPolicy] = None,
+):
+    """Resolve pending approvals with ``policy``, asking at the console when there is none."""
+    try:
+        run_with_approvals(
+            graph,
+            config,
+            policy or PromptPolicy(prompt),
+            resume=lambda payload: stream_events(graph, payload, config, printed, quiet=quiet),
+        )
+    except ApprovalRoundsExceeded as exc:
+        print(f"\n{exc} The pending tool calls were not run.")
 
 
 def interactive_turn(
     graph,
     message: Dict[str, Any],
     config: Dict[str, Any],
-    printed: Set[str],
+    printed: MutableSet[str],
     *,
     approval_prompt: str = APPROVAL_PROMPT,
+    quiet: bool = False,
+    policy: Optional[ApprovalPolicy] = None,
 ) -> None:
-    stream_events(graph, message, config, printed)
-    handle_interrupts(graph, config, printed, approval_prompt)
+    stream_events(graph, message, config, printed, quiet=quiet)
+    handle_interrupts(graph, config, printed, approval_prompt, quiet=quiet, policy=policy)
 
 
 def run_dialog(
@@ -66,15 +162,20 @@ def run_dialog(
     config: Dict[str, Any],
     *,
     approval_prompt: str = APPROVAL_PROMPT,
+    quiet: bool = False,
+    policy: Optional[ApprovalPolicy] = None,
 ) -> None:
-    printed: Set[str] = set()
+    printed = RecentlyPrinted()
     for text in messages:
-        print(f"\n=== User ===\n{text}")
+        if not quiet:
+            print(f"\n=== User ===\n{text}")
         interactive_turn(
             graph,
             {"messages": ("user", text)},
             config,
             printed,
             approval_prompt=approval_prompt,
+            quiet=quiet,
+            policy=policy,
         )
 
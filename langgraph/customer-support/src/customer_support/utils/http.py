@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import atexit
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import httpx
+
+from .rate_limit import limiter_for_host, record_queue_time
+
+# One keep-alive pool per process, shared by the chat models, embeddings and web search.
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 40
+# Long enough to span the think time between turns, so sessions rarely re-handshake.
+KEEPALIVE_EXPIRY_SECONDS = 90.0
+DEFAULT_TIMEOUT_SECONDS = 60.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+
+_NEW_CONNECTION_EVENT = "connection.connect_tcp.started"
+
+
+class ConnectionStats:
+    """Process-wide per-host counts of requests and of connections opened for them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, host: str, *, new_connection: bool) -> None:
+        with self._lock:
+            counts = self._hosts.setdefault(host, {"requests": 0, "new_connections": 0})
+            counts["requests"] += 1
+            counts["new_connections"] += int(new_connection)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                host: {**counts, "reused": counts["requests"] - counts["new_connections"]}
+                for host, counts in self._hosts.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+CONNECTION_STATS = ConnectionStats()
+
+
+def stats_delta(
+    before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]
+) -> Dict[str, Dict[str, int]]:
+    """Per-host counts accumulated between two ``CONNECTION_STATS.snapshot()`` calls."""
+    delta = {}
+    for host, counts in after.items():
+        previous = before.get(host, {})
+        changed = {key: value - previous.get(key, 0) for key, value in counts.items()}
+        if changed["requests"]:
+            delta[host] = changed
+    return delta
+
+
+class _ReleasingStream:
+    """Response body wrapper that frees the rate-limiter slot once the body is closed."""
+
+    def __init__(self, stream: Any, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class _Metered:
+    """Transport mixin: per-provider rate limiting and connection reuse accounting.
+
+    The limiter slot is held until the response body is closed, so streamed completions
+    count as in flight for as long as they are being read.
+    """
+
+    stream_class: type = _ReleasingStream
+
+    def handle_request(self, request):
+        limiter = limiter_for_host(request.url.host)
+        if limiter is not None:
+            queued = limiter.acquire()
+            if queued > 0:
+                record_queue_time(queued)
+        opened = []
+        outer: Optional[Callable[[str, Dict[str, Any]], None]] = request.extensions.get("trace")
+
+        def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == _NEW_CONNECTION_EVENT:
+                opened.append(True)
+            if outer is not None:
+                outer(event_name, info)
+
+        request.extensions["trace"] = trace
+        start = time.monotonic()
+        try:
+            response = super().handle_request(request)
+        except BaseException:
+            if limiter is not None:
+                limiter.complete(None, time.monotonic() - start, None)
+                limiter.release()
+            raise
+        CONNECTION_STATS.record(request.url.host, new_connection=bool(opened))
+        if limiter is not None:
+            limiter.complete(
+                response.status_code,
+                time.monotonic() - start,
+                response.headers.get("retry-after"),
+            )
+            response.stream = self.stream_class(response.stream, limiter.release)
+        return response
+
+
+def _transport_class(http) -> type:
+    stream_class = type("ReleasingStream", (_ReleasingStream, http.SyncByteStream), {})
+    return type(
+        "MeteredTransport", (_Metered, http.HTTPTransport), {"stream_class": stream_class}
+    )
+
+
+def _build_client(package: str):
+    http = httpx if package == "httpx" else importlib.import_module(package)
+    limits = http.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+    )
+    return http.Client(
+        transport=_transport_class(http)(limits=limits),
+        limits=limits,
+        timeout=http.Timeout(DEFAULT_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+        follow_redirects=True,
+    )
+
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(package: str = "httpx"):
+    """The process-wide client for ``package``, passed to SDKs as ``http_client``.
+
+    The OpenAI SDK, web search and downloads use ``httpx``. Newer Anthropic SDKs are built on
+    the API-compatible ``httpx2`` and only accept its clients, so they get a pool of their own
+    (see ``llm.anthropic_http_package``).
+    """
+    with _clients_lock:
+        client = _clients.get(package)
+        if client is None or client.is_closed:
+            client = _clients[package] = _build_client(package)
+        return client
+
+
+@atexit.register
+def close_http_clients() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
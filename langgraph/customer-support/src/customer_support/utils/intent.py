@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import difflib
+import re
+from typing import Dict, FrozenSet, NamedTuple, Optional
+
+# Marks AI messages the router wrote in place of an LLM delegation.
+LOCAL_ROUTE_KEY = "intent_router"
+
+# Evidence per specialised workflow (part 4 dialog states); multi-word cues match as phrases.
+INTENT_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "update_flight": {
+        "flight": 1.5,
+        "flights": 1.5,
+        "ticket": 1.5,
+        "rebook": 1.5,
+        "reschedule": 1.5,
+        "departure": 0.5,
+        "seat": 0.5,
+    },
+    "book_hotel": {
+        "hotel": 2.0,
+        "hotels": 2.0,
+        "lodging": 1.5,
+        "accommodation": 1.5,
+        "motel": 1.5,
+        "hostel": 1.5,
+        "room": 1.0,
+        "check in": 0.5,
+    },
+    "book_car_rental": {
+        "car": 2.0,
+        "cars": 2.0,
+        "rental car": 2.0,
+        "vehicle": 1.5,
+        "transportation": 1.0,
+        "rent": 1.0,
+    },
+    "book_excursion": {
+        "excursion": 2.0,
+        "excursions": 2.0,
+        "tour": 1.5,
+        "tours": 1.5,
+        "sightseeing": 1.5,
+        "attraction": 1.5,
+        "attractions": 1.5,
+        "activities": 1.5,
+        "things to do": 1.5,
+        "trip recommendations": 1.5,
+    },
+}
+# The request must ask for a change, not information: "what time is my flight" stays with
+# the primary assistant, which answers it from the passenger's itinerary. Nouns such as
+# "booking" are left out ("my booking number").
+ACTION_WORDS: FrozenSet[str] = frozenset(
+    {
+        "book",
+        "reserve",
+        "reservation",
+        "rent",
+        "change",
+        "update",
+        "move",
+        "switch",
+        "rebook",
+        "reschedule",
+        "modify",
+        "upgrade",
+        "cancel",
+        "extend",
+    }
+)
+# Policy and eligibility questions need ``lookup_policy``, which only the primary has.
+ABSTAIN_WORDS: FrozenSet[str] = frozenset(
+    {"allowed", "policy", "policies", "permitted", "rules", "fee", "fees", "refund", "baggage"}
+)
+MIN_SCORE = 1.5
+MIN_CONFIDENCE = 0.9
+FUZZY_CUTOFF = 0.8
+MAX_CORRECTIONS = 4096
+
+_WORD = re.compile(r"[a-z]+")
+
+
+class IntentMatch(NamedTuple):
+    intent: Optional[str]
+    score: float
+    confidence: float
+
+
+class IntentRouter:
+    """Keyword classifier that picks a part 4 workflow for unambiguous booking requests.
+
+    Words are matched exactly, or to a keyword of the same initial within a small edit
+    distance ("fligth", "hotle"). ``classify`` returns ``intent=None`` whenever the request
+    should go to the LLM: no change is asked for, a policy question is involved, or more than
+    one workflow has evidence.
+    """
+
+    def __init__(self, min_score: float = MIN_SCORE, min_confidence: float = MIN_CONFIDENCE):
+        self.min_score = min_score
+        self.min_confidence = min_confidence
+        cues = {cue for keywords in INTENT_KEYWORDS.values() for cue in keywords}
+        self._vocabulary = {word for cue in cues for word in cue.split()}
+        self._vocabulary |= ACTION_WORDS | ABSTAIN_WORDS
+        self._corrections: Dict[str, str] = {}
+
+    def _correct(self, word: str) -> str:
+        if len(word) < 4 or word in self._vocabulary:
+            return word
+        corrected = self._corrections.get(word)
+        if corrected is None:
+            candidates = [v for v in self._vocabulary if v[0] == word[0]]
+            matches = difflib.get_close_matches(word, candidates, n=1, cutoff=FUZZY_CUTOFF)
+            corrected = matches[0] if matches else word
+            if len(self._corrections) >= MAX_CORRECTIONS:
+                self._corrections.clear()
+            self._corrections[word] = corrected
+        return corrected
+
+    def classify(self, text: str) -> IntentMatch:
+        words = [self._correct(word) for word in _WORD.findall(text.lower())]
+        if not ACTION_WORDS.intersection(words) or ABSTAIN_WORDS.intersection(words):
+            return IntentMatch(None, 0.0, 0.0)
+        padded = f" {' '.join(words)} "
+        scores = {
+            intent: sum((w for cue, w in keywords.items() if f" {cue} " in padded), 0.0)
+            for intent, keywords in INTENT_KEYWORDS.items()
+        }
+        intent, best = max(scores.items(), key=lambda item: item[1])
+        total = sum(scores.values())
+        confidence = best / total if total else 0.0
+        if best < self.min_score or confidence < self.min_confidence:
+            return IntentMatch(None, best, confidence)
+        return IntentMatch(intent, best, confidence)
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from typing import Iterable, Set
+from collections import OrderedDict
+from collections.abc import MutableSet
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, List, Optional
 
 from langchain_core.messages import ToolMessage
+from langchain_core.messages.base import get_msg_title_repr
 from langchain_core.runnables import RunnableLambda
 from langgraph.prebuilt import ToolNode
 
+from customer_support.deadline import check_deadline
+
+from .tool_args import validate_tool_call
+
 
 def handle_tool_error(state) -> dict:
     error = state.get("error")
@@ -21,25 +29,121 @@ def handle_tool_error(state) -> dict:
     }
 
 
-def create_tool_node_with_fallback(tools: Iterable) -> ToolNode:
-    return ToolNode(tools).with_fallbacks(
+# A ``ToolNode`` ``wrap_tool_call`` step: ``(request, execute) -> ToolMessage``.
+ToolCallWrapper = Callable[[Any, Callable[[Any], Any]], Any]
+
+
+def guarded_tool_call(request, execute, wrap: Optional[ToolCallWrapper] = None):
+    """Refuse to start a tool once the session deadline has passed, then validate arguments.
+
+    Valid calls go through ``wrap`` when given, otherwise straight to ``execute``.
+    """
+    check_deadline(getattr(request.runtime, "config", None))
+    if wrap is not None:
+        return validate_tool_call(request, lambda checked: wrap(checked, execute))
+    return validate_tool_call(request, execute)
+
+
+def create_tool_node_with_fallback(
+    tools: Iterable, wrap: Optional[ToolCallWrapper] = None
+) -> ToolNode:
+    """Tool node that fixes malformed arguments locally before anything reaches the LLM again.
+
+    ``validate_tool_call`` coerces common formats and bounces only calls that stay invalid;
+    exceptions raised by the tools themselves still fall back to ``handle_tool_error``.
+    ``wrap`` runs around each valid call (part 4 answers searches it prefetched this way).
+    """
+    wrap_tool_call = guarded_tool_call if wrap is None else partial(guarded_tool_call, wrap=wrap)
+    return ToolNode(tools, wrap_tool_call=wrap_tool_call).with_fallbacks(
         [RunnableLambda(handle_tool_error)], exception_key="error"
     )
 
 
-def print_event(event: dict, printed: Set[str], max_length: int = 1500) -> None:
+class RecentlyPrinted(MutableSet):
+    """Set of message ids that forgets the oldest entries beyond ``maxlen``."""
+
+    def __init__(self, maxlen: int = 256):
+        self.maxlen = maxlen
+        self._ids: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, item: str) -> None:
+        self._ids[item] = None
+        self._ids.move_to_end(item)
+        while len(self._ids) > self.maxlen:
+            self._ids.popitem(last=False)
+
+    def discard(self, item: str) -> None:
+        self._ids.pop(item, None)
+
+
+def _message_lines(message: Any, html: bool) -> Iterator[str]:
+    title = f"{message.type.title()} Message"
+    yield get_msg_title_repr(title, bold=html)
+    name = getattr(message, "name", None)
+    if name is not None:
+        yield f"\nName: {name}"
+    yield "\n\n"
+    content = message.content
+    if isinstance(content, str):
+        yield content
+    else:
+        for element in content:
+            if isinstance(element, dict):
+                text = element.get("text")
+                yield text if text is not None else str(element)
+            else:
+                yield str(element)
+    tool_calls = getattr(message, "tool_calls", None) or []
+    if tool_calls:
+        yield "\nTool Calls:"
+    for tool_call in tool_calls:
+        yield f"\n  {tool_call.get('name')} ({tool_call.get('id')})"
+        yield f"\n Call ID: {tool_call.get('id')}\n  Args:"
+        args = tool_call.get("args") or {}
+        for arg, value in args.items():
+            yield f"\n    {arg}: {value}"
+
+
+def render_message(message: Any, max_length: int = 1500, *, html: bool = True) -> str:
+    """Format ``message`` like ``pretty_repr`` but stop once ``max_length`` is reached."""
+    parts: List[str] = []
+    remaining = max_length
+    for piece in _message_lines(message, html):
+        if len(piece) > remaining:
+            parts.append(piece[:remaining])
+            parts.append(" ... (truncated)")
+            break
+        parts.append(piece)
+        remaining -= len(piece)
+    return "".join(parts)
+
+
+def print_event(
+    event: dict,
+    printed: MutableSet[str],
+    max_length: int = 1500,
+    *,
+    quiet: bool = False,
+) -> None:
     current_state = event.get("dialog_state")
-    if current_state:
-        print("Currently in: ", current_state[-1])
     message = event.get("messages")
-    if message:
-        if isinstance(message, list):
-            message = message[-1]
-        if message.id in printed:
-            return
-        msg_repr = message.pretty_repr(html=True)
-        if len(msg_repr) > max_length:
-            msg_repr = msg_repr[:max_length] + " ... (truncated)"
-        print(msg_repr)
+    if message and isinstance(message, list):
+        message = message[-1]
+    if message and message.id is not None and message.id in printed:
+        message = None
+    if not quiet:
+        if current_state:
+            print("Currently in: ", current_state[-1])
+        if message:
+            print(render_message(message, max_length))
+    if message and message.id is not None:
         printed.add(message.id)
-
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Log-spaced bucket bounds from 50 ms to ~2 minutes: fine enough to place a hedge within
+# 25% of the true quantile, small enough to keep per provider for the life of the process.
+_BUCKET_GROWTH = 1.25
+_BUCKET_BOUNDS: List[float] = [0.05 * _BUCKET_GROWTH**i for i in range(36)]
+
+
+class LatencyCounts(NamedTuple):
+    buckets: Tuple[int, ...]
+    count: int
+    total: float
+    max: float
+    errors: int
+    abandoned: int
+
+
+def _quantile(counts: LatencyCounts, q: float) -> Optional[float]:
+    if not counts.count:
+        return None
+    rank = q * counts.count
+    seen = 0
+    for index, count in enumerate(counts.buckets):
+        seen += count
+        if seen >= rank and count:
+            return _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else counts.max
+    return counts.max
+
+
+def _subtract(after: LatencyCounts, before: LatencyCounts) -> LatencyCounts:
+    buckets = tuple(a - b for a, b in zip(after.buckets, before.buckets))
+    # Unless the maximum grew in between, only the bucket of the slowest new call is known.
+    peak = after.max
+    top = max((index for index, count in enumerate(buckets) if count), default=None)
+    if after.max <= before.max and top is not None and top < len(_BUCKET_BOUNDS):
+        peak = min(_BUCKET_BOUNDS[top], after.max)
+    return LatencyCounts(
+        buckets,
+        after.count - before.count,
+        after.total - before.total,
+        peak,
+        after.errors - before.errors,
+        after.abandoned - before.abandoned,
+    )
+
+
+class LatencyHistogram:
+    """Bucketed latencies of one provider's (or assistant role's) completed LLM calls."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._errors = 0
+        self._abandoned = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._buckets[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+            self._count += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def record_abandoned(self) -> None:
+        """A call dropped because the other provider answered first; its latency is unknown."""
+        with self._lock:
+            self._abandoned += 1
+
+    def counts(self) -> LatencyCounts:
+        """The raw counters, to pass back to ``snapshot(since=...)`` later."""
+        with self._lock:
+            return LatencyCounts(
+                tuple(self._buckets),
+                self._count,
+                self._total,
+                self._max,
+                self._errors,
+                self._abandoned,
+            )
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile, or ``None`` without samples."""
+        return _quantile(self.counts(), q)
+
+    def snapshot(self, since: Optional[LatencyCounts] = None) -> Dict[str, float]:
+        """Summary of every call, or only of the calls recorded after the ``since`` counts."""
+        counts = self.counts()
+        if since is not None:
+            counts = _subtract(counts, since)
+        p50, p95, p99 = (_quantile(counts, q) for q in (0.5, 0.95, 0.99))
+        return {
+            "count": counts.count,
+            "errors": counts.errors,
+            "abandoned": counts.abandoned,
+            "mean_ms": round(counts.total / counts.count * 1000, 1) if counts.count else None,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "max_ms": round(counts.max * 1000, 1) if counts.count else None,
+        }
+
+
+class LatencyRegistry:
+    """Process-wide histograms keyed by name (a provider, or a part 4 assistant role)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def get(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            return histogram
+
+    def counts(self) -> Dict[str, LatencyCounts]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.counts() for name, histogram in histograms.items()}
+
+    def snapshot(
+        self, since: Optional[Dict[str, LatencyCounts]] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Summary per name, or with ``since`` (from ``counts()``), of the calls made after it.
+
+        A delta leaves out names without calls or errors in between.
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+        if since is None:
+            return {name: histogram.snapshot() for name, histogram in histograms.items()}
+        delta = {}
+        for name, histogram in histograms.items():
+            previous = since.get(name)
+            if previous is not None and previous.count > histogram.count:
+                previous = None  # reset in between
+            summary = histogram.snapshot(since=previous)
+            if summary["count"] or summary["errors"] or summary["abandoned"]:
+                delta[name] = summary
+        return delta
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+LLM_LATENCY = LatencyRegistry()
+
+# Whole assistant LLM calls (including any hedge) per part 4 role.
+ROLE_LATENCY = LatencyRegistry()
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from customer_support.deadline import DeadlineExceeded, current_deadline
+
+logger = logging.getLogger(__name__)
+
+# Opt-in, e.g. "anthropic=50,openai=500,tavily=100" (requests per minute). Providers not
+# listed here or passed to ``configure_rate_limit`` are not paced.
+RATE_LIMITS_ENV = "CUSTOMER_SUPPORT_RATE_LIMITS"
+THROTTLE_STATUSES = {429, 503, 529}
+DECREASE_FACTOR = 0.5
+# Latency well above the running baseline means the provider is queueing our requests.
+LATENCY_TOLERANCE = 3.0
+LATENCY_DECREASE_FACTOR = 0.9
+BASELINE_ALPHA = 0.05
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+WAIT_METADATA_KEY = "rate_limit_wait_ms"
+
+
+class LimitConfig(NamedTuple):
+    requests_per_minute: float
+    initial_concurrency: int = 8
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+
+
+PROVIDER_HOSTS: Dict[str, str] = {
+    "api.anthropic.com": "anthropic",
+    "api.openai.com": "openai",
+    "api.tavily.com": "tavily",
+}
+
+
+class TokenBucket:
+    """Request-rate limit; callers reserve a token and sleep off any debt outside the lock."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before it may be used."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request back for ``seconds`` (a provider's Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight: halve on throttling, grow by one per window."""
+
+    def __init__(self, config: LimitConfig):
+        self.limit = float(config.initial_concurrency)
+        self.min_limit = config.min_concurrency
+        self.max_limit = config.max_concurrency
+        self.in_flight = 0
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def on_response(self, *, throttled: bool, latency: float) -> None:
+        with self._cond:
+            now = time.monotonic()
+            # Requests already in flight were sent under the old limit, so cut at most once
+            # per round trip.
+            can_decrease = now - self._last_decrease >= (self._baseline or latency)
+            if throttled:
+                if can_decrease:
+                    self._decrease(DECREASE_FACTOR, now)
+                return
+            if self._baseline is None:
+                self._baseline = latency
+            elif latency > self._baseline * LATENCY_TOLERANCE and can_decrease:
+                self._decrease(LATENCY_DECREASE_FACTOR, now)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self._cond.notify_all()
+            self._baseline += BASELINE_ALPHA * (latency - self._baseline)
+
+    def _decrease(self, factor: float, now: float) -> None:
+        self.limit = max(self.min_limit, self.limit * factor)
+        self._last_decrease = now
+
+
+class ProviderLimiter:
+    """Token bucket plus adaptive concurrency for one provider, shared by all sessions."""
+
+    def __init__(self, name: str, config: LimitConfig):
+        self.name = name
+        rate = config.requests_per_minute / 60
+        # A burst as large as the starting concurrency, so parallel calls are not serialized.
+        self.bucket = TokenBucket(rate, capacity=max(1.0, float(config.initial_concurrency)))
+        self.concurrency = AdaptiveConcurrency(config)
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "throttled": 0, "queued_ms": 0.0, "max_queued_ms": 0.0}
+
+    def acquire(self) -> float:
+        """Wait for a slot and a token; returns the seconds spent queueing."""
+        start = time.monotonic()
+        deadline = current_deadline()
+        remaining = deadline.remaining() if deadline is not None else None
+        if not self.concurrency.acquire(timeout=remaining):
+            raise DeadlineExceeded(f"The deadline passed while queued for {self.name}.")
+        wait = self.bucket.reserve()
+        if remaining is not None and wait > deadline.remaining():
+            self.concurrency.release()
+            raise DeadlineExceeded(f"The deadline passed while queued for {self.name}.")
+        if wait > 0:
+            time.sleep(wait)
+        queued = time.monotonic() - start
+        with self._lock:
+            self._counts["requests"] += 1
+            self._counts["queued_ms"] += queued * 1000
+            self._counts["max_queued_ms"] = max(self._counts["max_queued_ms"], queued * 1000)
+        return queued
+
+    def complete(self, status: Optional[int], latency: float, retry_after: Optional[str]) -> None:
+        """Feed a response (or ``None`` for a transport error) back into the limits."""
+        throttled = status in THROTTLE_STATUSES
+        if throttled:
+            with self._lock:
+                self._counts["throttled"] += 1
+            self.bucket.pause(_retry_after_seconds(retry_after))
+        if status is not None:
+            self.concurrency.on_response(throttled=throttled, latency=latency)
+
+    def release(self) -> None:
+        self.concurrency.release()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            **counts,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+        }
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    try:
+        return max(0.0, float(value)) if value else DEFAULT_RETRY_AFTER_SECONDS
+    except ValueError:
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
+def _limits_from_env() -> Dict[str, LimitConfig]:
+    limits: Dict[str, LimitConfig] = {}
+    for item in os.environ.get(RATE_LIMITS_ENV, "").split(","):
+        provider, _, value = item.partition("=")
+        provider, value = provider.strip(), value.strip()
+        if not provider or not value:
+            continue
+        try:
+            rpm = float(value)
+        except ValueError:
+            logger.warning("Ignoring invalid %s entry %r", RATE_LIMITS_ENV, item)
+            continue
+        limits[provider] = LimitConfig(rpm)
+    return limits
+
+
+_limiters: Dict[str, Optional[ProviderLimiter]] = {}
+_hosts: Dict[str, str] = dict(PROVIDER_HOSTS)
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(
+    provider: str, config: Optional[LimitConfig], *, hosts: Iterable[str] = ()
+) -> None:
+    """Replace ``provider``'s limits (``None`` disables them) and map extra hosts to it."""
+    with _limiters_lock:
+        _limiters[provider] = ProviderLimiter(provider, config) if config else None
+        for host in hosts:
+            _hosts[host] = provider
+
+
+def limiter_for_host(host: str) -> Optional[ProviderLimiter]:
+    provider = _hosts.get(host)
+    if provider is None:
+        return None
+    with _limiters_lock:
+        if provider not in _limiters:
+            config = _limits_from_env().get(provider)
+            _limiters[provider] = ProviderLimiter(provider, config) if config else None
+        return _limiters[provider]
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    with _limiters_lock:
+        limiters = [limiter for limiter in _limiters.values() if limiter is not None]
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
+
+
+def record_queue_time(seconds: float) -> None:
+    """Add queueing delay to the innermost FluxLoop observation as ``rate_limit_wait_ms``."""
+    import fluxloop
+
+    context = fluxloop.get_current_context()
+    if context is None or not context.observation_stack:
+        return
+    observation = context.observation_stack[-1]
+    if observation.metadata is None:
+        observation.metadata = {}
+    previous = observation.metadata.get(WAIT_METADATA_KEY, 0.0)
+    observation.metadata[WAIT_METADATA_KEY] = round(previous + seconds * 1000, 3)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import types
+import typing
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from langchain_core.messages import ToolMessage
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+UNIT_DAYS = {"day": 1, "week": 7, "fortnight": 14}
+DATE_FORMATS = (
+    "%Y/%m/%d",
+    "%Y.%m.%d",
+    "%d.%m.%Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%B %d %Y",
+    "%b %d %Y",
+)
+DATETIME_FORMATS = ("%Y/%m/%d %H:%M", "%Y-%m-%d %I:%M %p", "%Y-%m-%d %I %p")
+TRUE_WORDS = {"true", "yes", "y", "1"}
+FALSE_WORDS = {"false", "no", "n", "0"}
+
+_RELATIVE = re.compile(
+    r"^(?:in\s+)?(?P<count>\d+|a|an|one|two|three)\s+(?P<unit>day|week|fortnight)s?"
+    r"(?:\s+(?P<direction>from now|later|ago))?$"
+)
+_WORD_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3}
+
+
+class ToolArgCounters:
+    """Process-wide counts of tool calls that passed, were fixed locally, or were bounced."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {"passed": 0, "fixed": 0, "bounced": 0}
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            for key in self._counts:
+                self._counts[key] = 0
+
+
+TOOL_ARG_COUNTERS = ToolArgCounters()
+
+
+def parse_date_text(text: str, now: Optional[datetime] = None) -> Optional[date | datetime]:
+    """Parse relative ("tomorrow", "in 3 days", "next friday") and common written dates."""
+    now = now or datetime.now()
+    today = now.date()
+    value = " ".join(text.strip().casefold().split())
+    if value == "now":
+        return now
+    simple = {"today": 0, "tomorrow": 1, "yesterday": -1, "day after tomorrow": 2}
+    if value in simple:
+        return today + timedelta(days=simple[value])
+    if value == "next week":
+        return today + timedelta(days=7)
+    match = _RELATIVE.match(value)
+    if match:
+        count = match["count"]
+        count = int(count) if count.isdigit() else _WORD_NUMBERS[count]
+        days = count * UNIT_DAYS[match["unit"]]
+        return today + timedelta(days=-days if match["direction"] == "ago" else days)
+    words = value.split()
+    if words and words[-1] in WEEKDAYS and (
+        len(words) == 1 or (len(words) == 2 and words[0] in ("next", "this"))
+    ):
+        ahead = (WEEKDAYS.index(words[-1]) - today.weekday()) % 7
+        if words[0] == "next" and ahead == 0:
+            ahead = 7
+        return today + timedelta(days=ahead)
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def _accepted_types(annotation: Any) -> Tuple[Any, ...]:
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union or origin is types.UnionType:
+        return tuple(t for arg in typing.get_args(annotation) for t in _accepted_types(arg))
+    return (annotation,)
+
+
+def _coerce_value(value: Any, annotation: Any) -> Any:
+    """Best-effort conversion of a value pydantic rejected; returns ``value`` if nothing fits."""
+    accepted = _accepted_types(annotation)
+    if isinstance(value, str):
+        text = value.strip()
+        if datetime in accepted or date in accepted:
+            parsed = parse_date_text(text)
+            if parsed is not None:
+                return parsed.isoformat()
+        if int in accepted:
+            number = text.lstrip("#").replace(",", "").replace("_", "")
+            try:
+                as_float = float(number)
+            except ValueError:
+                pass
+            else:
+                if as_float.is_integer():
+                    return int(as_float)
+        if float in accepted:
+            try:
+                return float(text.replace(",", ""))
+            except ValueError:
+                pass
+        if bool in accepted:
+            if text.casefold() in TRUE_WORDS:
+                return True
+            if text.casefold() in FALSE_WORDS:
+                return False
+        for option in accepted:
+            if typing.get_origin(option) is typing.Literal:
+                for literal in typing.get_args(option):
+                    if isinstance(literal, str) and literal.casefold() == text.casefold():
+                        return literal
+    if isinstance(value, float) and int in accepted and value.is_integer():
+        return int(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and str in accepted:
+        return str(value)
+    return value
+
+
+_adapters: Dict[Tuple[type, str], TypeAdapter] = {}
+
+
+def _adapter(schema: type[BaseModel], field: str) -> TypeAdapter:
+    key = (schema, field)
+    adapter = _adapters.get(key)
+    if adapter is None:
+        adapter = _adapters[key] = TypeAdapter(schema.model_fields[field].annotation)
+    return adapter
+
+
+def coerce_arguments(
+    schema: type[BaseModel], args: Dict[str, Any]
+) -> Tuple[Dict[str, Any], list]:
+    """Return ``args`` with fields the schema would reject converted where possible.
+
+    Only values that fail validation are touched, so well-formed calls pass through as-is.
+    The second element lists the fields that were changed.
+    """
+    coerced = dict(args)
+    fixed = []
+    for name, value in args.items():
+        if name not in schema.model_fields or value is None:
+            continue
+        adapter = _adapter(schema, name)
+        try:
+            adapter.validate_python(value)
+            continue
+        except ValidationError:
+            pass
+        candidate = _coerce_value(value, schema.model_fields[name].annotation)
+        if candidate is value:
+            continue
+        try:
+            adapter.validate_python(candidate)
+        except ValidationError:
+            continue
+        coerced[name] = candidate
+        fixed.append(name)
+    return coerced, fixed
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'arguments'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def validate_tool_call(request, execute: Callable):
+    """``ToolNode`` wrapper: coerce arguments locally and bounce only calls that stay invalid."""
+    tool = request.tool
+    schema = getattr(tool, "tool_call_schema", None)
+    if tool is None or not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        return execute(request)
+    tool_call = request.tool_call
+    args, fixed = coerce_arguments(schema, tool_call.get("args") or {})
+    try:
+        schema.model_validate(args)
+    except ValidationError as error:
+        TOOL_ARG_COUNTERS.record("bounced")
+        logger.info("Bounced %s call: %s", tool.name, describe_validation_error(error))
+        return ToolMessage(
+            content=(
+                f"Error: invalid arguments for {tool.name}: {describe_validation_error(error)}\n"
+                " please fix your mistakes."
+            ),
+            name=tool.name,
+            tool_call_id=tool_call["id"],
+            status="error",
+        )
+    if not fixed:
+        TOOL_ARG_COUNTERS.record("passed")
+        return execute(request)
+    TOOL_ARG_COUNTERS.record("fixed")
+    logger.info("Coerced %s arguments locally: %s", tool.name, ", ".join(fixed))
+    return execute(request.override(tool_call={**tool_call, "args": args}))
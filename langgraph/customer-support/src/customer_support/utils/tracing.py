@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import functools
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _lazy_decorator(kind: str, **options: Any) -> Callable[[F], F]:
+    """Apply ``fluxloop.<kind>(**options)`` on first call instead of at import time."""
+
+    def decorator(func: F) -> F:
+        traced: Callable[..., Any] | None = None
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            nonlocal traced
+            if traced is None:
+                import fluxloop
+
+                traced = getattr(fluxloop, kind)(**options)(func)
+            return traced(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def lazy_trace(name: str) -> Callable[[F], F]:
+    return _lazy_decorator("trace", name=name)
+
+
+def lazy_agent(name: str) -> Callable[[F], F]:
+    return _lazy_decorator("agent", name=name)
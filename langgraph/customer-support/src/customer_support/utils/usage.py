@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable
+
+from .intent import LOCAL_ROUTE_KEY
+
+# Set by ``Assistant`` nodes that have a role: which one wrote the message, and how long
+# its LLM calls took and how many tokens they used.
+ROLE_METADATA_KEY = "assistant"
+
+USAGE_KEYS = (
+    "input_tokens",
+    "cached_input_tokens",
+    "cache_creation_input_tokens",
+    "uncached_input_tokens",
+    "output_tokens",
+)
+
+
+def message_usage(message: Any) -> Dict[str, int]:
+    """Split a message's input tokens into cache reads, cache writes and uncached tokens.
+
+    The three parts add up to ``input_tokens``; cache writes are not counted as uncached.
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    input_tokens = usage.get("input_tokens", 0)
+    cached = details.get("cache_read", 0) or 0
+    cache_creation = details.get("cache_creation", 0) or 0
+    return {
+        "input_tokens": input_tokens,
+        "cached_input_tokens": cached,
+        "cache_creation_input_tokens": cache_creation,
+        "uncached_input_tokens": max(0, input_tokens - cached - cache_creation),
+        "output_tokens": usage.get("output_tokens", 0),
+    }
+
+
+def summarize_usage(messages: Iterable[Any]) -> Dict[str, int]:
+    """Sum token usage over the AI messages and count them as ``llm_calls`` (round trips).
+
+    Delegations written by the intent router made no LLM call and count as ``local_routes``.
+    """
+    totals = dict.fromkeys(USAGE_KEYS, 0)
+    totals["llm_calls"] = 0
+    totals["local_routes"] = 0
+    for message in messages:
+        if getattr(message, "type", None) != "ai":
+            continue
+        if LOCAL_ROUTE_KEY in (getattr(message, "response_metadata", None) or {}):
+            totals["local_routes"] += 1
+            continue
+        totals["llm_calls"] += 1
+        for key, value in message_usage(message).items():
+            totals[key] += value
+    return totals
+
+
+def summarize_usage_by_role(messages: Iterable[Any]) -> Dict[str, Dict[str, float]]:
+    """Token usage, ``llm_calls`` and LLM ``latency_ms`` per assistant role.
+
+    Calls, latency and tokens include the assistant's retries.
+    """
+    roles: Dict[str, Dict[str, float]] = {}
+    for message in messages:
+        if getattr(message, "type", None) != "ai":
+            continue
+        info = (getattr(message, "response_metadata", None) or {}).get(ROLE_METADATA_KEY)
+        if not info:
+            continue
+        totals = roles.get(info["role"])
+        if totals is None:
+            totals = roles[info["role"]] = dict.fromkeys(USAGE_KEYS, 0)
+            totals.update(llm_calls=0, latency_ms=0.0)
+        totals["llm_calls"] += info.get("llm_calls", 1)
+        totals["latency_ms"] = round(totals["latency_ms"] + info["latency_ms"], 1)
+        usage = info.get("usage") or message_usage(message)
+        for key in USAGE_KEYS:
+            totals[key] += usage.get(key, 0)
+    return roles
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+# The plan tool and its arguments, shared by ``tools.plan`` (which runs plans) and
+# ``utils.approval`` (which reviews them step by step).
+PLAN_TOOL_NAME = "execute_write_plan"
+MAX_PLAN_STEPS = 10
+
+
+class PlanStep(BaseModel):
+    tool: str = Field(description="Name of the write tool to call, e.g. book_hotel.")
+    args: Dict[str, Any] = Field(
+        default_factory=dict, description="Arguments for that tool, as for a direct call."
+    )
+
+
+class WritePlan(BaseModel):
+    steps: List[PlanStep] = Field(
+        min_length=1,
+        max_length=MAX_PLAN_STEPS,
+        description="The changes to make, in order.",
+    )
+
+
+def plan_steps(tool_call: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The steps of an ``execute_write_plan`` call as plain tool calls (name and args)."""
+    calls = []
+    for step in (tool_call.get("args") or {}).get("steps") or []:
+        if isinstance(step, PlanStep):
+            step = step.model_dump()
+        if isinstance(step, dict):
+            calls.append({"name": str(step.get("tool", "")), "args": step.get("args") or {}})
+    return calls